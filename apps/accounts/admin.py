@@ -5,7 +5,7 @@ Customizes the Django admin interface for User management
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import User, AuditLog
+from .models import User, AuditLog, SyncRequest
 
 
 @admin.register(User)
@@ -75,3 +75,18 @@ class AuditLogAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         """Audit logs cannot be deleted"""
         return False
+
+
+@admin.register(SyncRequest)
+class SyncRequestAdmin(admin.ModelAdmin):
+    """Admin for stored sync responses - read only"""
+    
+    list_display = ['user', 'endpoint', 'key', 'status_code', 'created_at']
+    list_filter = ['endpoint', 'created_at']
+    search_fields = ['user__username', 'key']
+    readonly_fields = ['user', 'endpoint', 'key', 'status_code', 'response', 'created_at']
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        """Sync responses are only recorded by the sync API"""
+        return False
@@ -0,0 +1,58 @@
+"""
+REST API for offline sync: the delta feed devices pull changes from
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from apps.attendance.api import AttendanceSerializer
+from apps.attendance.models import Attendance
+from apps.results.api import ResultSyncSerializer, result_scope
+from apps.results.models import Result
+from config.api import student_scope
+from .sync import changed_since, decode_token, encode_token, get_safety_lag
+
+MAX_CHANGES_PAGE_SIZE = 2000
+
+
+def _feeds(user, class_id):
+    """Querysets the feed pages through, keyed by the name used in tokens and responses"""
+    attendance = Attendance.objects.filter(student_scope(user, 'student__')).select_related('student__user', 'class_room')
+    results = Result.objects.filter(result_scope(user)).select_related('student__user', 'exam', 'subject')
+    if class_id:
+        attendance = attendance.filter(class_room_id=class_id)
+        results = results.filter(student__class_assigned_id=class_id)
+    return {
+        'attendance': (attendance, AttendanceSerializer),
+        'results': (results, ResultSyncSerializer),
+    }
+
+
+@api_view(['GET'])
+def sync_changes_view(request):
+    """
+    Attendance and results changed since a token:
+    ?since=<next_token from the previous pull>&limit=&class_id=
+    Without since the feed starts from the beginning. Keep pulling with
+    next_token while has_more is true. Deleted rows are not reported.
+    """
+    try:
+        positions = decode_token(request.query_params.get('since'))
+        limit = int(request.query_params.get('limit') or settings.SYNC_CHANGES_PAGE_SIZE)
+        class_id = int(request.query_params.get('class_id') or 0)
+    except ValueError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, MAX_CHANGES_PAGE_SIZE))
+    until = timezone.now() - get_safety_lag()
+
+    data, has_more = {}, False
+    for feed, (queryset, serializer_class) in _feeds(request.user, class_id).items():
+        rows, more = changed_since(queryset, positions.get(feed), until, limit)
+        if rows:
+            positions[feed] = (rows[-1].updated_at, rows[-1].pk)
+        data[feed] = serializer_class(rows, many=True, context={'request': request}).data
+        has_more = has_more or more
+    data['next_token'] = encode_token(positions)
+    data['has_more'] = has_more
+    return Response(data)
@@ -0,0 +1,186 @@
+"""
+Dashboard Metrics
+Builds the dashboard statistics with a few conditional-aggregation queries
+and caches each snapshot for a short time. Signals on the models the
+dashboard counts bump a version key, which retires every cached snapshot.
+"""
+from datetime import timedelta
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+from apps.attendance.models import Attendance, AttendanceSummary
+from apps.attendance.rollups import attendance_totals
+from apps.classes.models import ClassRoom
+from apps.exams.models import Exam, ExamSchedule
+from apps.fees.models import Payment
+from apps.parents.models import Parent
+from apps.promotions.models import Promotion
+from apps.results.models import Result
+from apps.students.models import Student
+from apps.teachers.models import Teacher
+from config.cache import VersionedCache
+from .models import User
+
+
+DASHBOARD_CACHE = VersionedCache('dashboard', 'DASHBOARD_CACHE_TTL', 60)
+
+
+def invalidate_dashboard():
+    """Retire every cached dashboard snapshot (admin and per-user)"""
+    DASHBOARD_CACHE.invalidate()
+
+
+def admin_snapshot(today):
+    """School-wide statistics for admin and staff dashboards"""
+    last_30_days = today - timedelta(days=30)
+    stats = {}
+
+    stats.update(Student.objects.annotate(
+        has_payment=Exists(Payment.objects.filter(student=OuterRef('pk')))
+    ).aggregate(
+        total_students=Count('id'),
+        active_students=Count('id', filter=Q(is_active=True)),
+        male_students=Count('id', filter=Q(gender='M')),
+        female_students=Count('id', filter=Q(gender='F')),
+        pending_payments=Count('id', filter=Q(is_active=True, has_payment=False)),
+    ))
+    # Teacher and parent profiles are one-to-one with users, so one pass covers all three
+    stats.update(User.objects.aggregate(
+        total_users=Count('id'),
+        total_staff=Count('id', filter=Q(role='STAFF')),
+        total_teachers=Count('teacher_profile'),
+        active_teachers=Count('teacher_profile', filter=Q(is_active=True)),
+        total_parents=Count('parent_profile'),
+    ))
+    stats.update(ClassRoom.objects.aggregate(
+        total_classes=Count('id'),
+        active_classes=Count('id', filter=Q(is_active=True)),
+    ))
+    stats.update(Exam.objects.aggregate(
+        total_exams=Count('id'),
+        upcoming_exams=Count('id', filter=Q(start_date__gte=today)),
+        completed_exams=Count('id', filter=Q(end_date__lt=today)),
+    ))
+    stats.update(Attendance.objects.filter(date=today).aggregate(
+        today_attendance=Count('id', filter=Q(status='Present')),
+        today_absent=Count('id', filter=Q(status='Absent')),
+        today_late=Count('id', filter=Q(status='Late')),
+        today_excused=Count('id', filter=Q(status='Excused')),
+        total_marked_today=Count('id'),
+    ))
+    stats.update(Result.objects.aggregate(total_results=Count('id'), avg_score=Avg('marks_obtained')))
+    stats.update(Payment.objects.aggregate(
+        total_payments=Count('id'),
+        total_revenue_30days=Sum('amount_paid', filter=Q(payment_date__gte=last_30_days)),
+    ))
+    stats['total_revenue_30days'] = stats['total_revenue_30days'] or 0
+    stats['avg_score'] = round(stats['avg_score'] or 0, 2)
+    stats['total_promotions'] = Promotion.objects.count()
+
+    stats.update({
+        'recent_payments': list(Payment.objects.select_related('student__user').order_by('-payment_date')[:5]),
+        'recent_results': list(Result.objects.select_related('student__user', 'exam', 'subject').order_by('-created_at')[:5]),
+        'recent_students': list(Student.objects.select_related('user', 'class_assigned').order_by('-created_at')[:5]),
+        'recent_promotions': list(
+            Promotion.objects.select_related('student__user', 'from_class', 'to_class').order_by('-promoted_on')[:5]
+        ),
+    })
+    return stats
+
+
+def teacher_snapshot(teacher, today):
+    """Classes, subjects and today's work for one teacher"""
+    classes_assigned = list(
+        ClassRoom.objects.filter(class_teacher=teacher).annotate(student_count=Count('students'))
+    )
+    class_ids = [class_room.id for class_room in classes_assigned]
+    subjects = list(teacher.subjects.all())
+    return {
+        'teacher': teacher,
+        'subjects': subjects,
+        'classes_assigned': classes_assigned,
+        'total_students': sum(class_room.student_count for class_room in classes_assigned),
+        'attendance_marked_today': Attendance.objects.filter(
+            class_room_id__in=class_ids, date=today
+        ).values('class_room').distinct().count(),
+        'upcoming_exams': ExamSchedule.objects.filter(subject__in=subjects, exam_date__gte=today).count(),
+    }
+
+
+def student_snapshot(student, today):
+    """Recent results and the last 30 days of attendance for one student"""
+    totals = attendance_totals(today - timedelta(days=30), today, student=student)
+    attendance_stats = {
+        'present': totals['present_days'],
+        'absent': totals['absent_days'],
+        'late': totals['late_days'],
+    }
+    total_days = sum(attendance_stats.values())
+    attendance_percentage = (attendance_stats['present'] / total_days * 100) if total_days > 0 else 0
+    avg_score = Result.objects.filter(student=student).aggregate(avg=Avg('marks_obtained'))['avg'] or 0
+    return {
+        'student': student,
+        'class_room': student.class_assigned,
+        'recent_results': list(
+            Result.objects.filter(student=student).select_related('exam', 'subject').order_by('-exam__start_date')[:5]
+        ),
+        'avg_score': round(avg_score, 2),
+        'attendance_stats': attendance_stats,
+        'attendance_percentage': round(attendance_percentage, 1),
+    }
+
+
+def parent_snapshot(parent):
+    """Children, their recent results and combined attendance for one parent"""
+    children = list(Student.objects.filter(parent=parent).select_related('user', 'class_assigned'))
+    average_performance = '-'
+    attendance_this_term = '-'
+    recent_results = []
+    if children:
+        recent_results = list(
+            Result.objects.filter(student__in=children)
+            .select_related('student__user', 'exam', 'subject')
+            .order_by('-exam__start_date')[:10]
+        )
+        average = Result.objects.filter(student__in=children).aggregate(avg=Avg('marks_obtained'))['avg']
+        if average is not None:
+            average_performance = round(average, 1)
+        attendance = AttendanceSummary.objects.filter(student__in=children).aggregate(
+            present=Sum('present_days'),
+            total=Sum('total_days'),
+        )
+        if attendance['total']:
+            attendance_this_term = f"{attendance['present']} / {attendance['total']}"
+    return {
+        'parent': parent,
+        'children': children,
+        'recent_results': recent_results,
+        'average_performance': average_performance,
+        'attendance_this_term': attendance_this_term,
+    }
+
+
+def get_admin_dashboard():
+    today = timezone.now().date()
+    return DASHBOARD_CACHE.get_or_build(lambda: admin_snapshot(today), 'admin', today)
+
+
+def get_teacher_dashboard(user):
+    """Cached teacher dashboard; raises Teacher.DoesNotExist without a teacher profile"""
+    today = timezone.now().date()
+    return DASHBOARD_CACHE.get_or_build(
+        lambda: teacher_snapshot(Teacher.objects.get(user=user), today), 'teacher', user.pk, today
+    )
+
+
+def get_student_dashboard(user):
+    """Cached student dashboard; raises Student.DoesNotExist without a student profile"""
+    today = timezone.now().date()
+    return DASHBOARD_CACHE.get_or_build(
+        lambda: student_snapshot(Student.objects.select_related('class_assigned').get(user=user), today),
+        'student', user.pk, today,
+    )
+
+
+def get_parent_dashboard(user):
+    """Cached parent dashboard; raises Parent.DoesNotExist without a parent profile"""
+    return DASHBOARD_CACHE.get_or_build(lambda: parent_snapshot(Parent.objects.get(user=user)), 'parent', user.pk)
@@ -0,0 +1,14 @@
+"""
+Management command to remove old stored sync responses
+Usage: python manage.py purge_sync_requests
+"""
+from django.core.management.base import BaseCommand
+from apps.accounts.sync import purge_old_sync_requests
+
+
+class Command(BaseCommand):
+    help = 'Deletes stored sync responses older than SYNC_REQUEST_RETENTION_HOURS'
+
+    def handle(self, *args, **options):
+        removed = purge_old_sync_requests()
+        self.stdout.write(self.style.SUCCESS(f'✅ Removed {removed} old sync response(s)'))
@@ -127,3 +127,25 @@ class AuditLog(models.Model):
     
     def __str__(self):
         return f"{self.user} - {self.action} at {self.timestamp}"
+
+
+class SyncRequest(models.Model):
+    """
+    Response to a batch sync request, kept by the client's idempotency key
+    so a device retrying after a dropped connection gets the same answer
+    instead of applying the batch twice
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sync_requests')
+    key = models.CharField(max_length=64)
+    endpoint = models.CharField(max_length=50)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        unique_together = ['user', 'key']
+        verbose_name = 'Sync Request'
+        verbose_name_plural = 'Sync Requests'
+    
+    def __str__(self):
+        return f"{self.user} - {self.endpoint} - {self.key}"
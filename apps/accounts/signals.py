@@ -0,0 +1,23 @@
+"""
+Signal handlers for User Accounts
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.attendance.models import Attendance
+from apps.fees.models import Payment
+from apps.results.models import Result
+from apps.students.models import Student
+from .dashboard import invalidate_dashboard
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def refresh_dashboard(sender, **kwargs):
+    """Retire cached dashboard statistics when the records they count change"""
+    invalidate_dashboard()
@@ -0,0 +1,140 @@
+"""
+Offline Sync
+Shared pieces of the batch sync API used by mobile clients that work
+offline: idempotency keys, version-based conflict detection and the
+opaque change tokens handed out by the delta feed.
+
+Conflicts: each record a client uploads may carry the server `updated_at`
+its local copy was based on. If the server row has changed since then (or
+the client never saw it) and holds a different value, the server copy
+wins and is returned to the client instead of being overwritten.
+"""
+import base64
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.response import Response
+from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
+from .models import SyncRequest
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+
+def get_idempotency_key(request):
+    """The client's key from the Idempotency-Key header or an idempotency_key body field"""
+    key = request.META.get(IDEMPOTENCY_HEADER) or (
+        request.data.get('idempotency_key') if hasattr(request.data, 'get') else None
+    )
+    return str(key)[:64] if key else None
+
+
+def _json_default(value):
+    # Full isoformat: versions are compared to the microsecond, which DjangoJSONEncoder drops
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def purge_old_sync_requests():
+    """Delete stored sync responses older than SYNC_REQUEST_RETENTION_HOURS"""
+    cutoff = timezone.now() - timedelta(hours=settings.SYNC_REQUEST_RETENTION_HOURS)
+    deleted, _ = SyncRequest.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def run_idempotent(request, endpoint, handler):
+    """
+    Call handler() -> (payload, status) once per idempotency key. A repeat
+    of a key that succeeded returns the stored response; failed attempts
+    are not stored, so the client can retry them with the same key. A key
+    already used on another endpoint is refused (422) rather than replayed.
+    """
+    key = get_idempotency_key(request)
+    if key:
+        previous = SyncRequest.objects.filter(user=request.user, key=key).first()
+        if previous and previous.endpoint != endpoint:
+            return Response(
+                {'detail': f'Idempotency key already used for {previous.endpoint} sync.'},
+                status=HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if previous:
+            response = Response(previous.response, status=previous.status_code)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+    payload, status = handler()
+    payload = json.loads(json.dumps(payload, default=_json_default))
+    if key and status < 300:
+        purge_old_sync_requests()
+        try:
+            with transaction.atomic():
+                SyncRequest.objects.create(
+                    user=request.user, key=key, endpoint=endpoint, status_code=status, response=payload
+                )
+        except IntegrityError:
+            # A concurrent retry of the same batch stored its answer first
+            pass
+    return Response(payload, status=status)
+
+
+def parse_version(value):
+    """The server updated_at a client record was based on, or None"""
+    if not value:
+        return None
+    version = parse_datetime(str(value))
+    if version is not None and timezone.is_naive(version):
+        version = timezone.make_aware(version, timezone.utc)
+    return version
+
+
+def is_conflict(server_updated_at, client_version, same_value):
+    """True when a server row changed since the client's copy and the upload would overwrite it"""
+    if server_updated_at is None or same_value:
+        return False
+    return client_version is None or server_updated_at > client_version
+
+
+def get_safety_lag():
+    # Rows newer than this are left for the next pull, so a write whose
+    # transaction commits late (with an older updated_at) is not skipped
+    return timedelta(seconds=settings.SYNC_SAFETY_LAG_SECONDS)
+
+
+def encode_token(positions):
+    """Opaque change token from {feed: (updated_at, id)}"""
+    data = {feed: [updated_at.isoformat(), pk] for feed, (updated_at, pk) in positions.items() if updated_at}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """{feed: (updated_at, id)} from a change token. Raises ValueError if it is malformed."""
+    if not token:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        positions = {feed: (parse_version(updated_at), int(pk)) for feed, (updated_at, pk) in data.items()}
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError('Invalid change token.')
+    if any(updated_at is None for updated_at, pk in positions.values()):
+        raise ValueError('Invalid change token.')
+    return positions
+
+
+def changed_since(queryset, position, until, limit):
+    """
+    Up to limit rows of queryset changed after position ((updated_at, id) or
+    None) and no later than until, in (updated_at, id) order. Returns
+    (rows, has_more).
+    """
+    if position:
+        updated_at, pk = position
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+    rows = list(queryset.filter(updated_at__lte=until).order_by('updated_at', 'pk')[:limit + 1])
+    return rows[:limit], len(rows) > limit
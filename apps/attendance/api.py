@@ -0,0 +1,113 @@
+"""
+REST API for Attendance
+"""
+import django_filters
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from apps.accounts.sync import is_conflict, parse_version, run_idempotent
+from apps.classes.models import ClassRoom
+from config.api import DefaultCursorPagination, OptimizedReadOnlyViewSet, SparseModelSerializer, student_scope
+from .marking import mark_class_attendance
+from .models import Attendance
+
+
+class AttendanceSerializer(SparseModelSerializer):
+    admission_number = serializers.CharField(source='student.admission_number', read_only=True)
+    student_name = serializers.SerializerMethodField()
+    class_name = serializers.CharField(source='class_room.name', read_only=True, default=None)
+
+    class Meta:
+        model = Attendance
+        fields = [
+            'id', 'student', 'admission_number', 'student_name', 'class_room', 'class_name',
+            'date', 'status', 'remarks', 'marked_by', 'marked_at', 'updated_at',
+        ]
+
+    def get_student_name(self, obj):
+        return obj.student.user.get_full_name()
+
+
+class AttendanceFilter(django_filters.FilterSet):
+    date_from = django_filters.DateFilter(field_name='date', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='date', lookup_expr='lte')
+
+    class Meta:
+        model = Attendance
+        fields = ['student', 'class_room', 'date', 'status']
+
+
+class AttendancePagination(DefaultCursorPagination):
+    ordering = ('-date', '-id')
+
+
+class AttendanceViewSet(OptimizedReadOnlyViewSet):
+    serializer_class = AttendanceSerializer
+    filterset_class = AttendanceFilter
+    pagination_class = AttendancePagination
+
+    def get_queryset(self):
+        return Attendance.objects.filter(student_scope(self.request.user, 'student__')).select_related(
+            'student__user', 'class_room'
+        )
+
+
+@api_view(['POST'])
+def attendance_sync_view(request):
+    """
+    Upload a class register marked offline:
+    {"idempotency_key", "class_id", "date", "records": [{"student_id", "status", "remarks", "updated_at"}]}
+    updated_at is the server version the device last saw; records the
+    server has changed since are returned as conflicts (unless "force").
+    """
+    user = request.user
+    if not (user.is_teacher or user.is_admin or user.is_superuser):
+        return Response({'detail': 'Only teachers can sync attendance.'}, status=status.HTTP_403_FORBIDDEN)
+    date = parse_date(str(request.data.get('date') or ''))
+    records = request.data.get('records')
+    if date is None or not isinstance(records, list):
+        return Response({'detail': 'A date (YYYY-MM-DD) and a list of records are required.'}, status=status.HTTP_400_BAD_REQUEST)
+    class_room = get_object_or_404(ClassRoom, pk=request.data.get('class_id'))
+    teacher = getattr(user, 'teacher_profile', None)
+    if teacher and class_room.class_teacher_id != teacher.id:
+        return Response({'detail': 'You do not have permission to mark attendance for this class.'}, status=status.HTTP_403_FORBIDDEN)
+    return run_idempotent(request, 'attendance', lambda: _sync_register(class_room, date, records, user))
+
+
+def _sync_register(class_room, date, records, user):
+    student_ids = [record.get('student_id') for record in records if isinstance(record, dict)]
+    server = {
+        row['student_id']: row
+        for row in Attendance.objects.filter(date=date, student_id__in=[
+            student_id for student_id in student_ids if str(student_id).isdigit()
+        ]).values('student_id', 'status', 'remarks', 'updated_at')
+    }
+
+    entries, positions, conflicts = [], [], []
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            return {'success': False, 'errors': [{'row': index, 'errors': ['Record must be an object.']}]}, status.HTTP_400_BAD_REQUEST
+        current = server.get(int(record['student_id'])) if str(record.get('student_id')).isdigit() else None
+        if current and not record.get('force'):
+            same = current['status'] == record.get('status') and record.get('remarks') in (None, current['remarks'])
+            if is_conflict(current['updated_at'], parse_version(record.get('updated_at')), same):
+                conflicts.append({'row': index, 'server': current})
+                continue
+        entries.append({'student': record.get('student_id'), 'status': record.get('status'), 'remarks': record.get('remarks')})
+        positions.append(index)
+
+    report = mark_class_attendance(class_room, date, entries, user)
+    for error in report['errors']:
+        error['row'] = positions[error['row']]
+    if not report['success']:
+        return report, status.HTTP_400_BAD_REQUEST
+
+    report['conflicts'] = conflicts
+    # The versions the device should base its next edits on
+    report['versions'] = list(Attendance.objects.filter(
+        date=date, student_id__in=[entry['student'] for entry in entries]
+    ).values('student_id', 'updated_at'))
+    return report, status.HTTP_200_OK
+
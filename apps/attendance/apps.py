@@ -5,3 +5,6 @@ class AttendanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.attendance'
     verbose_name = 'Attendance Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
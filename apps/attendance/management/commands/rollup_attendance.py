@@ -0,0 +1,41 @@
+"""
+Management command to keep monthly attendance summaries up to date
+Usage: python manage.py rollup_attendance [--backfill [--start YYYY-MM] [--end YYYY-MM]] [--batch-size N]
+"""
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from apps.attendance.rollups import backfill, catch_up
+
+
+def _month(value):
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}'. Use YYYY-MM.")
+
+
+class Command(BaseCommand):
+    help = 'Rolls attendance records changed since the last run into AttendanceSummary, or rebuilds past months'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true', help='Rebuild summaries month by month instead of catching up')
+        parser.add_argument('--start', help='First month to backfill (YYYY-MM). Defaults to the earliest record.')
+        parser.add_argument('--end', help='Last month to backfill (YYYY-MM). Defaults to the latest record.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Students (or student-months) refreshed per batch')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['backfill']:
+            start = _month(options['start']) if options['start'] else None
+            end = _month(options['end']) if options['end'] else None
+
+            def progress(month, students):
+                self.stdout.write(f"  {month.strftime('%B %Y')}: {students} student(s)")
+
+            count = backfill(start, end, batch_size=options['batch_size'], progress=progress)
+        else:
+            count = catch_up(batch_size=options['batch_size'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Refreshed {count} monthly summar{"y" if count == 1 else "ies"} in {elapsed:.1f}s'))
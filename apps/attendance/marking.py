@@ -0,0 +1,120 @@
+"""
+Bulk Attendance Marking
+Validates a whole class register and upserts it in one statement,
+reporting which students' records were created or changed
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.accounts.dashboard import invalidate_dashboard
+from .models import Attendance
+from .rollups import refresh_summaries
+
+
+UPSERT_FIELDS = ['status', 'class_room', 'remarks', 'marked_by', 'updated_at']
+VALID_STATUSES = {code for code, label in Attendance.STATUS_CHOICES}
+
+
+def validate_entry(entry, class_student_ids):
+    """
+    Validate one register entry.
+    Returns (cleaned, errors); cleaned is None when no status was given and the entry should be skipped.
+    """
+    try:
+        student_id = int(entry.get('student'))
+    except (TypeError, ValueError):
+        return None, ['Invalid student id.']
+    errors = []
+    if student_id not in class_student_ids:
+        errors.append('Student is not an active member of this class.')
+    status = entry.get('status')
+    if not status:
+        return None, errors
+    if status not in VALID_STATUSES:
+        errors.append(f"Status '{status}' is not valid.")
+    remarks = entry.get('remarks')
+    return {'student_id': student_id, 'status': status, 'remarks': None if remarks is None else str(remarks)}, errors
+
+
+def mark_class_attendance(class_room, date, entries, marked_by):
+    """
+    Validate and save attendance for a class on one date.
+    Nothing is written unless every entry is valid. Unchanged records are
+    left alone; the rest are upserted on (student, date) in one statement and
+    the affected monthly summaries are refreshed.
+    Returns a report dict with 'success', 'created', 'updated', 'unchanged',
+    'skipped', a 'changed' list of {'student', 'previous', 'status'} and a
+    per-entry 'errors' list.
+    """
+    class_student_ids = set(class_room.students.filter(is_active=True).values_list('id', flat=True))
+
+    cleaned_entries, errors, seen = [], [], set()
+    skipped = 0
+    for index, entry in enumerate(entries):
+        cleaned, entry_errors = validate_entry(entry, class_student_ids)
+        student_id = cleaned['student_id'] if cleaned else entry.get('student')
+        if cleaned and student_id in seen:
+            entry_errors.append('Student appears more than once in this register.')
+        if entry_errors:
+            errors.append({'row': index, 'student': student_id, 'errors': entry_errors})
+            continue
+        if cleaned is None:
+            skipped += 1
+            continue
+        seen.add(student_id)
+        cleaned_entries.append(cleaned)
+
+    report = {
+        'success': not errors, 'created': 0, 'updated': 0, 'unchanged': 0,
+        'skipped': skipped, 'changed': [], 'errors': errors,
+    }
+    if errors or not cleaned_entries:
+        return report
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            student_id: (record_id, status, class_room_id, remarks)
+            for record_id, student_id, status, class_room_id, remarks in Attendance.objects.filter(
+                date=date, student_id__in=seen
+            ).order_by().values_list('id', 'student_id', 'status', 'class_room_id', 'remarks')
+        }
+        objs = []
+        for entry in cleaned_entries:
+            record_id, previous, previous_class_id, previous_remarks = existing.get(
+                entry['student_id'], (None, None, None, '')
+            )
+            remarks = previous_remarks if entry['remarks'] is None else entry['remarks']
+            if record_id and (previous, previous_class_id, previous_remarks) == (entry['status'], class_room.id, remarks):
+                report['unchanged'] += 1
+                continue
+            report['created' if record_id is None else 'updated'] += 1
+            report['changed'].append({'student': entry['student_id'], 'previous': previous, 'status': entry['status']})
+            objs.append(Attendance(
+                id=record_id,
+                student_id=entry['student_id'],
+                class_room=class_room,
+                date=date,
+                status=entry['status'],
+                remarks=remarks,
+                marked_by=marked_by,
+                updated_at=now,
+            ))
+
+        if objs and connection.features.supports_update_conflicts_with_target:
+            for obj in objs:
+                obj.id = None
+            Attendance.objects.bulk_create(
+                objs,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['student', 'date'],
+                update_fields=UPSERT_FIELDS,
+            )
+        elif objs:
+            Attendance.objects.bulk_update([o for o in objs if o.id], UPSERT_FIELDS, batch_size=500)
+            Attendance.objects.bulk_create([o for o in objs if not o.id], batch_size=500)
+        refresh_summaries((change['student'], date) for change in report['changed'])
+
+    if objs:
+        invalidate_dashboard()
+    return report
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceRollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_processed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Attendance Rollup Watermark',
+            },
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
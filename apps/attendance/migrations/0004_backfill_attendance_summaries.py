@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncMonth
+
+
+def backfill_summaries(apps, schema_editor):
+    """
+    Reports now read totals from AttendanceSummary, so build it from the
+    existing records (the same grouped counts as rollups.refresh_summaries)
+    and start the catch-up watermark after them.
+    """
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceSummary = apps.get_model('attendance', 'AttendanceSummary')
+    AttendanceRollupWatermark = apps.get_model('attendance', 'AttendanceRollupWatermark')
+
+    rows = (
+        Attendance.objects.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('student_id', 'month')
+        .annotate(
+            total_days=Count('id'),
+            present_days=Count('id', filter=Q(status='Present')),
+            absent_days=Count('id', filter=Q(status='Absent')),
+            late_days=Count('id', filter=Q(status='Late')),
+            excused_days=Count('id', filter=Q(status='Excused')),
+        )
+    )
+    AttendanceSummary.objects.all().delete()
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(AttendanceSummary(**row))
+        if len(batch) >= 2000:
+            AttendanceSummary.objects.bulk_create(batch)
+            batch = []
+    AttendanceSummary.objects.bulk_create(batch)
+
+    latest = Attendance.objects.aggregate(latest=Max('updated_at'))['latest']
+    AttendanceRollupWatermark.objects.update_or_create(pk=1, defaults={'last_processed_at': latest})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_updated_at_rollup_watermark'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -39,6 +39,7 @@ class Attendance(models.Model):
         null=True
     )
     marked_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date', 'student']
@@ -83,3 +84,17 @@ class AttendanceSummary(models.Model):
         if self.total_days == 0:
             return 0
         return (self.present_days / self.total_days) * 100
+
+
+class AttendanceRollupWatermark(models.Model):
+    """
+    How far the AttendanceSummary catch-up has processed Attendance.updated_at
+    """
+    last_processed_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Attendance Rollup Watermark'
+    
+    def __str__(self):
+        return f"Attendance rollup up to {self.last_processed_at or 'the beginning'}"
@@ -0,0 +1,194 @@
+"""
+Attendance Rollups
+Keeps AttendanceSummary (one row per student per month) in step with the
+raw Attendance rows, and answers report totals from it
+"""
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Count, Exists, Max, Min, OuterRef, Q, Sum
+from django.db.models.functions import TruncMonth
+from .models import Attendance, AttendanceSummary, AttendanceRollupWatermark
+
+
+SUMMARY_FIELDS = ['total_days', 'present_days', 'absent_days', 'late_days', 'excused_days']
+STATUS_COUNTS = {
+    'total_days': Count('id'),
+    'present_days': Count('id', filter=Q(status='Present')),
+    'absent_days': Count('id', filter=Q(status='Absent')),
+    'late_days': Count('id', filter=Q(status='Late')),
+    'excused_days': Count('id', filter=Q(status='Excused')),
+}
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def refresh_summaries(pairs):
+    """
+    Recompute AttendanceSummary rows for the given (student_id, month) pairs
+    from the raw records, with one grouped query and one upsert.
+    Pairs that no longer have any attendance lose their summary row.
+    """
+    pairs = {(student_id, month_start(month)) for student_id, month in pairs}
+    if not pairs:
+        return 0
+    student_ids = {student_id for student_id, month in pairs}
+    months = {month for student_id, month in pairs}
+    rows = (
+        Attendance.objects.filter(
+            student_id__in=student_ids,
+            date__gte=min(months),
+            date__lt=next_month(max(months)),
+        )
+        .order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('student_id', 'month')
+        .annotate(**STATUS_COUNTS)
+    )
+    summaries = [
+        AttendanceSummary(**row)
+        for row in rows
+        if (row['student_id'], row['month']) in pairs
+    ]
+    emptied = pairs - {(summary.student_id, summary.month) for summary in summaries}
+
+    with transaction.atomic():
+        if connection.features.supports_update_conflicts_with_target:
+            AttendanceSummary.objects.bulk_create(
+                summaries,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['student', 'month'],
+                update_fields=SUMMARY_FIELDS,
+            )
+        else:
+            existing = {
+                (student_id, month): summary_id
+                for summary_id, student_id, month in AttendanceSummary.objects.filter(
+                    student_id__in=student_ids, month__in=months
+                ).values_list('id', 'student_id', 'month')
+            }
+            for summary in summaries:
+                summary.id = existing.get((summary.student_id, summary.month))
+            AttendanceSummary.objects.bulk_update([s for s in summaries if s.id], SUMMARY_FIELDS, batch_size=500)
+            AttendanceSummary.objects.bulk_create([s for s in summaries if not s.id], batch_size=500)
+        if emptied:
+            stale = Q()
+            for student_id, month in emptied:
+                stale |= Q(student_id=student_id, month=month)
+            AttendanceSummary.objects.filter(stale).delete()
+    return len(pairs)
+
+
+def get_watermark():
+    watermark, created = AttendanceRollupWatermark.objects.get_or_create(pk=1)
+    return watermark
+
+
+def catch_up(batch_size=1000):
+    """
+    Refresh summaries for every record changed since the watermark, in batches
+    of (student, month) pairs, then advance the watermark. Returns the number
+    of pairs refreshed.
+    """
+    watermark = get_watermark()
+    changed = Attendance.objects.order_by()
+    if watermark.last_processed_at:
+        changed = changed.filter(updated_at__gt=watermark.last_processed_at)
+    high_water = changed.aggregate(latest=Max('updated_at'))['latest']
+    if high_water is None:
+        watermark.save(update_fields=['last_run_at'])
+        return 0
+
+    pairs = (
+        changed.filter(updated_at__lte=high_water)
+        .annotate(month=TruncMonth('date'))
+        .values_list('student_id', 'month')
+        .distinct()
+    )
+    refreshed = 0
+    batch = []
+    for pair in pairs.iterator(chunk_size=batch_size):
+        batch.append(pair)
+        if len(batch) >= batch_size:
+            refreshed += refresh_summaries(batch)
+            batch = []
+    refreshed += refresh_summaries(batch)
+
+    watermark.last_processed_at = high_water
+    watermark.save()
+    return refreshed
+
+
+def backfill(start=None, end=None, batch_size=500, progress=None):
+    """
+    Rebuild summaries month by month for every student with attendance,
+    refreshing batch_size students at a time. Returns the number of pairs.
+    """
+    bounds = Attendance.objects.aggregate(first=Min('date'), last=Max('date'), latest=Max('updated_at'))
+    if bounds['first'] is None:
+        return 0
+    month = month_start(start or bounds['first'])
+    last = month_start(end or bounds['last'])
+    refreshed = 0
+    while month <= last:
+        student_ids = list(
+            Attendance.objects.filter(date__gte=month, date__lt=next_month(month))
+            .order_by('student_id')
+            .values_list('student_id', flat=True)
+            .distinct()
+        )
+        for offset in range(0, len(student_ids), batch_size):
+            refreshed += refresh_summaries((student_id, month) for student_id in student_ids[offset:offset + batch_size])
+        # Drop summaries left behind for students who no longer have records that month
+        AttendanceSummary.objects.filter(month=month).exclude(Exists(
+            Attendance.objects.filter(student=OuterRef('student'), date__gte=month, date__lt=next_month(month))
+        )).delete()
+        if progress:
+            progress(month, len(student_ids))
+        month = next_month(month)
+
+    if start is None and end is None:
+        watermark = get_watermark()
+        watermark.last_processed_at = bounds['latest']
+        watermark.save()
+    return refreshed
+
+
+def attendance_totals(start_date, end_date, student=None, class_id=None):
+    """
+    Present/absent/late/excused/total counts between two dates (inclusive).
+    Whole months come from AttendanceSummary; the partial months at either
+    end are counted from the raw records.
+    """
+    summaries = AttendanceSummary.objects.all()
+    records = Attendance.objects.order_by()
+    if student is not None:
+        summaries = summaries.filter(student=student)
+        records = records.filter(student=student)
+    if class_id:
+        summaries = summaries.filter(student__class_assigned_id=class_id)
+        records = records.filter(student__class_assigned_id=class_id)
+
+    first_full = start_date if start_date.day == 1 else next_month(start_date)
+    after_last_full = month_start(end_date + timedelta(days=1))
+    totals = dict.fromkeys(SUMMARY_FIELDS, 0)
+
+    if first_full < after_last_full:
+        rolled = summaries.filter(month__gte=first_full, month__lt=after_last_full).aggregate(
+            **{field: Sum(field) for field in SUMMARY_FIELDS}
+        )
+        edges = Q(date__gte=start_date, date__lt=first_full) | Q(date__gte=after_last_full, date__lte=end_date)
+    else:
+        rolled = {}
+        edges = Q(date__gte=start_date, date__lte=end_date)
+    raw = records.filter(edges).aggregate(**STATUS_COUNTS)
+
+    for field in SUMMARY_FIELDS:
+        totals[field] = (rolled.get(field) or 0) + (raw[field] or 0)
+    return totals
@@ -0,0 +1,14 @@
+"""
+Signal handlers for Attendance Management
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Attendance
+from .rollups import refresh_summaries
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def refresh_attendance_summary(sender, instance, **kwargs):
+    """Keep the student's monthly summary in step with single-record edits"""
+    refresh_summaries([(instance.student_id, instance.date)])
@@ -8,5 +8,7 @@ urlpatterns = [
     path('mark/<int:class_id>/', views.mark_attendance_view, name='mark_attendance'),
     path('report/', views.attendance_report_view, name='attendance_report'),
     path('report/<int:student_id>/', views.attendance_report_view, name='student_attendance_report'),
+    path('report/export/', views.attendance_export_view, name='attendance_export'),
+    path('report/<int:student_id>/export/', views.attendance_export_view, name='student_attendance_export'),
     path('api/mark/', views.mark_attendance_ajax, name='mark_attendance_ajax'),
 ]
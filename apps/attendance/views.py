@@ -5,10 +5,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from apps.accounts.decorators import teacher_required
 from .models import Attendance
+from config.exports import EXPORT_FORMATS
+from .exports import export_response, export_rows
+from .marking import mark_class_attendance
+from .rollups import attendance_totals
 from apps.students.models import Student
 from apps.classes.models import ClassRoom
 import json
@@ -59,20 +64,21 @@ def mark_attendance_view(request, class_id):
         existing_attendance[record.student_id] = record.status
 
     if request.method == 'POST':
-        # Process attendance marking
-        for student in students:
-            status = request.POST.get(f'status_{student.id}')
-            if status:
-                Attendance.objects.update_or_create(
-                    student=student,
-                    date=today,
-                    defaults={
-                        'status': status,
-                        'class_room': class_room,
-                        'marked_by': request.user
-                    }
-                )
-        messages.success(request, 'Attendance marked successfully!')
+        entries = [
+            {'student': student_id, 'status': request.POST.get(f'status_{student_id}')}
+            for student_id in students.values_list('id', flat=True)
+        ]
+        report = mark_class_attendance(class_room, today, entries, request.user)
+        if report['success']:
+            messages.success(
+                request,
+                f"Attendance marked successfully! {report['created']} new, {report['updated']} changed, "
+                f"{report['unchanged']} unchanged."
+            )
+        else:
+            messages.error(request, 'Attendance was not saved: ' + '; '.join(
+                f"student {error['student']}: {' '.join(error['errors'])}" for error in report['errors']
+            ))
         return redirect('attendance:mark_attendance', class_id=class_id)
     
     context = {
@@ -84,17 +90,14 @@ def mark_attendance_view(request, class_id):
     return render(request, 'attendance/mark_attendance.html', context)
 
 
-@login_required
-def attendance_report_view(request, student_id=None):
-    """View attendance report"""
+def _report_filters(request):
+    """Read start_date, end_date (default: the last 30 days) and class from the query string"""
     from datetime import datetime, timedelta
     
-    # Get date filters
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
     class_filter = request.GET.get('class')
     
-    # Default date range (last 30 days)
     if not end_date:
         end_date = timezone.now().date()
     else:
@@ -104,6 +107,13 @@ def attendance_report_view(request, student_id=None):
         start_date = end_date - timedelta(days=30)
     else:
         start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+    return start_date, end_date, class_filter
+
+
+@login_required
+def attendance_report_view(request, student_id=None):
+    """View attendance report"""
+    start_date, end_date, class_filter = _report_filters(request)
     
     # Get attendance records
     if student_id:
@@ -123,12 +133,13 @@ def attendance_report_view(request, student_id=None):
         attendance_records = attendance_records.order_by('-date')
         student = None
     
-    # Calculate statistics
-    total_days = attendance_records.count()
-    present_count = attendance_records.filter(status='Present').count()
-    absent_count = attendance_records.filter(status='Absent').count()
-    late_count = attendance_records.filter(status='Late').count()
-    excused_count = attendance_records.filter(status='Excused').count()
+    # Calculate statistics from the monthly rollups
+    totals = attendance_totals(start_date, end_date, student=student, class_id=class_filter)
+    total_days = totals['total_days']
+    present_count = totals['present_days']
+    absent_count = totals['absent_days']
+    late_count = totals['late_days']
+    excused_count = totals['excused_days']
     
     attendance_percentage = (present_count / total_days * 100) if total_days > 0 else 0
     
@@ -150,29 +161,61 @@ def attendance_report_view(request, student_id=None):
     return render(request, 'attendance/attendance_report.html', context)
 
 
+@login_required
+@teacher_required
+def attendance_export_view(request, student_id=None):
+    """Stream attendance records for the report filters as CSV or XLSX"""
+    try:
+        start_date, end_date, class_filter = _report_filters(request)
+    except ValueError:
+        messages.error(request, 'Invalid date. Use YYYY-MM-DD.')
+        return redirect('attendance:attendance_report')
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        messages.error(request, f"Unknown export format '{export_format}'.")
+        return redirect('attendance:attendance_report')
+    
+    rows = export_rows(start_date, end_date, student_id=student_id, class_id=class_filter)
+    return export_response(rows, export_format, f"attendance_{start_date:%Y%m%d}_{end_date:%Y%m%d}")
+
+
 @require_POST
 @login_required
 @teacher_required
 def mark_attendance_ajax(request):
-    """Mark attendance via AJAX"""
+    """
+    Mark attendance via AJAX.
+    Accepts one record ({student_id, status, date}) or a whole class
+    ({class_id, date, records: [{student_id, status, remarks}]}).
+    """
     try:
         data = json.loads(request.body)
-        student_id = data.get('student_id')
-        status = data.get('status')
-        date = data.get('date', timezone.now().date())
-        
-        student = Student.objects.get(pk=student_id)
-        
-        Attendance.objects.update_or_create(
-            student=student,
-            date=date,
-            defaults={
-                'status': status,
-                'class_room': student.class_assigned,
-                'marked_by': request.user
-            }
-        )
-        
-        return JsonResponse({'success': True, 'message': 'Attendance marked'})
+        date = parse_date(str(data.get('date') or timezone.now().date()))
+        if date is None:
+            return JsonResponse({'success': False, 'error': 'Invalid date.'}, status=400)
+
+        if 'records' in data:
+            class_room = ClassRoom.objects.get(pk=data.get('class_id'))
+            records = data['records']
+        else:
+            student = Student.objects.select_related('class_assigned').get(pk=data.get('student_id'))
+            class_room = student.class_assigned
+            records = [data]
+            if class_room is None:
+                return JsonResponse({'success': False, 'error': 'Student is not assigned to a class.'}, status=400)
+
+        if hasattr(request.user, 'teacher_profile') and class_room.class_teacher_id != request.user.teacher_profile.id:
+            return JsonResponse({'success': False, 'error': 'You do not have permission to mark attendance for this class.'}, status=403)
+
+        entries = [
+            {'student': record.get('student_id'), 'status': record.get('status'), 'remarks': record.get('remarks')}
+            for record in records
+        ]
+        report = mark_class_attendance(class_room, date, entries, request.user)
+        if not report['success']:
+            return JsonResponse({**report, 'error': 'Some records are invalid. Nothing was saved.'}, status=400)
+        return JsonResponse({**report, 'message': 'Attendance marked'})
+    except (Student.DoesNotExist, ClassRoom.DoesNotExist):
+        return JsonResponse({'success': False, 'error': 'Student or class not found.'}, status=404)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
@@ -0,0 +1,38 @@
+"""
+REST API for Classes
+"""
+import django_filters
+from rest_framework import serializers
+from config.api import OptimizedReadOnlyViewSet, SparseModelSerializer
+from .models import ClassRoom
+
+
+class ClassRoomSerializer(SparseModelSerializer):
+    academic_year_name = serializers.CharField(source='academic_year.name', read_only=True)
+    class_teacher_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ClassRoom
+        fields = [
+            'id', 'name', 'level', 'stream', 'capacity', 'room_number', 'academic_year',
+            'academic_year_name', 'class_teacher', 'class_teacher_name', 'is_active',
+        ]
+
+    def get_class_teacher_name(self, obj):
+        return obj.class_teacher.user.get_full_name() if obj.class_teacher else None
+
+
+class ClassRoomFilter(django_filters.FilterSet):
+    class Meta:
+        model = ClassRoom
+        fields = {
+            'academic_year': ['exact'],
+            'level': ['exact'],
+            'is_active': ['exact'],
+        }
+
+
+class ClassRoomViewSet(OptimizedReadOnlyViewSet):
+    serializer_class = ClassRoomSerializer
+    filterset_class = ClassRoomFilter
+    queryset = ClassRoom.objects.select_related('academic_year', 'class_teacher__user')
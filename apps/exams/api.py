@@ -0,0 +1,52 @@
+"""
+REST API for Exams
+"""
+import django_filters
+from django.db.models import Prefetch
+from rest_framework import serializers
+from config.api import OptimizedReadOnlyViewSet, SparseModelSerializer, wants_field
+from .models import Exam, ExamSchedule
+
+
+class ExamScheduleSerializer(serializers.ModelSerializer):
+    class_name = serializers.CharField(source='class_room.name', read_only=True)
+    subject_name = serializers.CharField(source='subject.name', read_only=True)
+
+    class Meta:
+        model = ExamSchedule
+        fields = [
+            'id', 'class_room', 'class_name', 'subject', 'subject_name', 'exam_date',
+            'start_time', 'end_time', 'room_number', 'max_marks', 'pass_marks',
+        ]
+
+
+class ExamSerializer(SparseModelSerializer):
+    academic_year_name = serializers.CharField(source='academic_year.name', read_only=True)
+    schedules = ExamScheduleSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Exam
+        fields = [
+            'id', 'name', 'exam_type', 'academic_year', 'academic_year_name', 'term',
+            'start_date', 'end_date', 'status', 'is_published', 'schedules',
+        ]
+
+
+class ExamFilter(django_filters.FilterSet):
+    class Meta:
+        model = Exam
+        fields = ['academic_year', 'exam_type', 'term', 'status', 'is_published']
+
+
+class ExamViewSet(OptimizedReadOnlyViewSet):
+    serializer_class = ExamSerializer
+    filterset_class = ExamFilter
+
+    def get_queryset(self):
+        queryset = Exam.objects.select_related('academic_year')
+        # Schedules are only fetched when they will be serialized
+        if wants_field(self.request, self.serializer_class, 'schedules'):
+            queryset = queryset.prefetch_related(
+                Prefetch('schedules', queryset=ExamSchedule.objects.select_related('class_room', 'subject'))
+            )
+        return queryset
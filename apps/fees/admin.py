@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FeeStructure, Payment, FeeBalance
+from .models import FeeStructure, Payment, FeeBalance, ReceiptSequence
 
 
 @admin.register(FeeStructure)
@@ -53,20 +53,6 @@ class PaymentAdmin(admin.ModelAdmin):
         return obj.student.user.get_full_name() or obj.student.admission_number
     get_student_name.short_description = 'Student Name'
     get_student_name.admin_order_field = 'student__user__first_name'
-    
-    # Auto-generate receipt number on save
-    def save_model(self, request, obj, form, change):
-        if not obj.receipt_number:
-            # Generate receipt number
-            from django.utils import timezone
-            date_str = timezone.now().strftime('%Y%m%d')
-            last_payment = Payment.objects.filter(receipt_number__startswith=f'REC-{date_str}').order_by('-receipt_number').first()
-            if last_payment:
-                last_num = int(last_payment.receipt_number.split('-')[-1])
-                obj.receipt_number = f'REC-{date_str}-{last_num + 1:04d}'
-            else:
-                obj.receipt_number = f'REC-{date_str}-0001'
-        super().save_model(request, obj, form, change)
 
 
 @admin.register(FeeBalance)
@@ -87,3 +73,9 @@ class FeeBalanceAdmin(admin.ModelAdmin):
     def get_balance(self, obj):
         return obj.balance
     get_balance.short_description = 'Balance'
+
+
+@admin.register(ReceiptSequence)
+class ReceiptSequenceAdmin(admin.ModelAdmin):
+    list_display = ['year', 'last_value', 'updated_at']
+    readonly_fields = ['updated_at']
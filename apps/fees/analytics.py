@@ -0,0 +1,162 @@
+"""
+Fee Analytics
+Collection and arrears figures for an academic year, each answered by one
+or two grouped aggregate queries and cached until a payment, fee structure
+or balance changes
+"""
+from django.db.models import Count, Q, Sum
+from config.cache import VersionedCache
+from .models import FeeBalance, FeeStructure, Payment
+
+UNALLOCATED = 'General'
+
+
+FEE_ANALYTICS_CACHE = VersionedCache('fees:analytics', 'FEE_ANALYTICS_CACHE_TTL', 300)
+
+
+def invalidate_fee_analytics():
+    """Retire every cached fee analytics report"""
+    FEE_ANALYTICS_CACHE.invalidate()
+
+
+def _amount(value):
+    return float(value or 0)
+
+
+def _payments(academic_year):
+    return Payment.objects.filter(payment_date__range=[academic_year.start_date, academic_year.end_date])
+
+
+def summary(academic_year):
+    """Headline figures: fees billed, collected, outstanding and payment counts by status"""
+    totals = FeeBalance.objects.filter(academic_year=academic_year).aggregate(
+        billed=Sum('total_fees'),
+        paid=Sum('total_paid'),
+        outstanding=Sum('balance', filter=Q(balance__gt=0)),
+        students_in_arrears=Count('id', filter=Q(balance__gt=0)),
+    )
+    payments = _payments(academic_year).aggregate(
+        collected=Sum('amount_paid', filter=Q(status=Payment.COUNTED_STATUS)),
+        completed=Count('id', filter=Q(status=Payment.COUNTED_STATUS)),
+        pending=Count('id', filter=Q(status='PENDING')),
+        failed=Count('id', filter=Q(status='FAILED')),
+        refunded=Sum('amount_paid', filter=Q(status='REFUNDED')),
+    )
+    return {
+        'billed': _amount(totals['billed']),
+        'collected': _amount(payments['collected']),
+        'outstanding': _amount(totals['outstanding']),
+        'refunded': _amount(payments['refunded']),
+        'students_in_arrears': totals['students_in_arrears'],
+        'completed_payments': payments['completed'],
+        'pending_payments': payments['pending'],
+        'failed_payments': payments['failed'],
+    }
+
+
+def collections_by_month(academic_year):
+    # Grouping on the plain date column (at most a year of rows) and folding
+    # into months here avoids a per-row date truncation in the database
+    months = {}
+    for payment_date, amount, payments in _payments(academic_year).filter(status=Payment.COUNTED_STATUS).values(
+        'payment_date'
+    ).annotate(amount=Sum('amount_paid'), payments=Count('id')).values_list('payment_date', 'amount', 'payments'):
+        month = months.setdefault(payment_date.strftime('%Y-%m'), {'amount': 0, 'payments': 0})
+        month['amount'] += amount
+        month['payments'] += payments
+    return [
+        {'month': month, 'amount': _amount(totals['amount']), 'payments': totals['payments']}
+        for month, totals in sorted(months.items())
+    ]
+
+
+def collections_by_method(academic_year):
+    labels = dict(Payment.PAYMENT_METHOD_CHOICES)
+    rows = _payments(academic_year).filter(status=Payment.COUNTED_STATUS).values('payment_method').annotate(
+        amount=Sum('amount_paid'), payments=Count('id')
+    ).order_by('-amount')
+    return [
+        {
+            'method': row['payment_method'],
+            'label': labels.get(row['payment_method'], row['payment_method']),
+            'amount': _amount(row['amount']),
+            'payments': row['payments'],
+        }
+        for row in rows
+    ]
+
+
+def arrears_by_fee_type(academic_year):
+    """
+    Billed vs collected per fee type. Billed is each mandatory structure's
+    amount times the students of its class who carry a balance for the
+    year, as in rebuild_balances, so the totals agree with the summary and
+    by-class reports. Payments without a fee structure are reported as
+    'General'.
+    """
+    # Imported here because the ledger imports this module to invalidate reports
+    from .ledger import balance_students, counted_payments, mandatory_structures
+
+    labels = dict(FeeStructure.FEE_TYPE_CHOICES)
+    class_sizes = dict(
+        balance_students(academic_year, counted_payments(academic_year)).order_by().values('class_assigned')
+        .annotate(students=Count('id')).values_list('class_assigned', 'students')
+    )
+    billed = {}
+    for fee_type, class_room_id, amount in mandatory_structures(academic_year).values_list(
+        'fee_type', 'class_room_id', 'amount'
+    ):
+        billed[fee_type] = billed.get(fee_type, 0) + amount * class_sizes.get(class_room_id, 0)
+
+    collected = dict(
+        _payments(academic_year).filter(status=Payment.COUNTED_STATUS).values('fee_structure__fee_type')
+        .annotate(amount=Sum('amount_paid')).values_list('fee_structure__fee_type', 'amount')
+    )
+    rows = []
+    for fee_type in sorted(set(billed) | set(collected), key=lambda value: value or ''):
+        rows.append({
+            'fee_type': fee_type or UNALLOCATED,
+            'label': labels.get(fee_type, UNALLOCATED),
+            'billed': _amount(billed.get(fee_type)),
+            'collected': _amount(collected.get(fee_type)),
+            'outstanding': max(_amount(billed.get(fee_type)) - _amount(collected.get(fee_type)), 0.0),
+        })
+    return rows
+
+
+def arrears_by_class(academic_year):
+    rows = FeeBalance.objects.filter(academic_year=academic_year).values(
+        'student__class_assigned', 'student__class_assigned__name', 'student__class_assigned__stream'
+    ).annotate(
+        billed=Sum('total_fees'),
+        paid=Sum('total_paid'),
+        outstanding=Sum('balance', filter=Q(balance__gt=0)),
+        students=Count('id'),
+        in_arrears=Count('id', filter=Q(balance__gt=0)),
+    ).order_by('student__class_assigned__name', 'student__class_assigned__stream')
+    return [
+        {
+            'class_id': row['student__class_assigned'],
+            'class_name': ' '.join(filter(None, [row['student__class_assigned__name'], row['student__class_assigned__stream']])) or 'Unassigned',
+            'billed': _amount(row['billed']),
+            'paid': _amount(row['paid']),
+            'outstanding': _amount(row['outstanding']),
+            'students': row['students'],
+            'students_in_arrears': row['in_arrears'],
+        }
+        for row in rows
+    ]
+
+
+REPORTS = {
+    'summary': summary,
+    'monthly': collections_by_month,
+    'methods': collections_by_method,
+    'fee-types': arrears_by_fee_type,
+    'classes': arrears_by_class,
+}
+
+
+def get_report(report, academic_year):
+    """A cached report by name (see REPORTS) for an academic year"""
+    return FEE_ANALYTICS_CACHE.get_or_build(lambda: REPORTS[report](academic_year), report, academic_year.pk)
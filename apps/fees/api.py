@@ -0,0 +1,48 @@
+"""
+REST API for Fees
+"""
+import django_filters
+from rest_framework import serializers
+from config.api import DefaultCursorPagination, OptimizedReadOnlyViewSet, SparseModelSerializer, student_scope
+from .models import Payment
+
+
+class PaymentSerializer(SparseModelSerializer):
+    admission_number = serializers.CharField(source='student.admission_number', read_only=True)
+    student_name = serializers.SerializerMethodField()
+    fee_type = serializers.CharField(source='fee_structure.fee_type', read_only=True, default=None)
+
+    class Meta:
+        model = Payment
+        fields = [
+            'id', 'receipt_number', 'student', 'admission_number', 'student_name', 'fee_structure',
+            'fee_type', 'amount_paid', 'payment_date', 'payment_method', 'transaction_reference',
+            'status', 'remarks', 'created_at', 'updated_at',
+        ]
+
+    def get_student_name(self, obj):
+        return obj.student.user.get_full_name()
+
+
+class PaymentFilter(django_filters.FilterSet):
+    date_from = django_filters.DateFilter(field_name='payment_date', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='payment_date', lookup_expr='lte')
+
+    class Meta:
+        model = Payment
+        fields = ['student', 'status', 'payment_method', 'transaction_reference', 'receipt_number']
+
+
+class PaymentPagination(DefaultCursorPagination):
+    ordering = ('-payment_date', '-id')
+
+
+class PaymentViewSet(OptimizedReadOnlyViewSet):
+    serializer_class = PaymentSerializer
+    filterset_class = PaymentFilter
+    pagination_class = PaymentPagination
+
+    def get_queryset(self):
+        return Payment.objects.filter(student_scope(self.request.user, 'student__')).select_related(
+            'student__user', 'fee_structure'
+        )
@@ -5,3 +5,6 @@ class FeesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.fees'
     verbose_name = 'Fees Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
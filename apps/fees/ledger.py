@@ -0,0 +1,175 @@
+"""
+Fee Balance Ledger
+Keeps FeeBalance in step with payments and fee structures. Payment
+transitions move total_paid with F() increments; fee structure changes
+re-price the affected class; rebuild_balances() recomputes a whole
+academic year from a handful of aggregate queries.
+
+A payment counts toward the academic year whose dates contain its
+payment_date, and only while its status is COMPLETED. A student's fees
+are the active, mandatory fee structures of their class for that year.
+"""
+from decimal import Decimal
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.classes.models import AcademicYear
+from apps.students.models import Student
+from .analytics import invalidate_fee_analytics
+from .models import FeeBalance, FeeStructure, Payment
+
+BALANCE_FIELDS = ['total_fees', 'total_paid', 'balance', 'last_updated']
+ZERO = Decimal('0')
+
+
+def academic_year_for(date):
+    """Id of the academic year containing date, preferring the current one, or None"""
+    return AcademicYear.objects.filter(start_date__lte=date, end_date__gte=date).order_by(
+        '-is_current', '-start_date'
+    ).values_list('id', flat=True).first()
+
+
+def payment_entry(student_id, payment_date, amount, status):
+    """(student_id, academic_year_id, amount) a payment contributes to the ledger, or None"""
+    if status != Payment.COUNTED_STATUS or not payment_date:
+        return None
+    academic_year_id = academic_year_for(payment_date)
+    if academic_year_id is None:
+        return None
+    return student_id, academic_year_id, Decimal(amount)
+
+
+def apply_payment(student_id, academic_year_id, amount):
+    """Add amount (negative to reverse) to a student's total_paid for a year"""
+    updated = FeeBalance.objects.filter(student_id=student_id, academic_year_id=academic_year_id).update(
+        total_paid=F('total_paid') + amount,
+        balance=F('balance') - amount,
+        last_updated=timezone.now(),
+    )
+    if updated:
+        return
+    # No balance yet: build it from the records, which already include this payment
+    try:
+        with transaction.atomic():
+            rebuild_balances(AcademicYear.objects.get(pk=academic_year_id), student_ids=[student_id], prune=False)
+    except IntegrityError:
+        # Another transaction created the row first; add this payment to it
+        apply_payment(student_id, academic_year_id, amount)
+
+
+def record_payment_change(previous, current):
+    """Move total_paid from a payment's previous ledger entry to its current one"""
+    if previous == current:
+        return
+    if previous:
+        student_id, academic_year_id, amount = previous
+        apply_payment(student_id, academic_year_id, -amount)
+    if current:
+        student_id, academic_year_id, amount = current
+        apply_payment(student_id, academic_year_id, amount)
+
+
+def class_fees(class_room_id, academic_year_id):
+    """Total of the active, mandatory fee structures for a class and year"""
+    return FeeStructure.objects.filter(
+        class_room_id=class_room_id, academic_year_id=academic_year_id, is_active=True, is_mandatory=True
+    ).aggregate(total=Coalesce(Sum('amount'), ZERO))['total']
+
+
+def refresh_class_fees(class_room_id, academic_year_id):
+    """Re-price existing balances of a class's students after its fee structures change"""
+    total = class_fees(class_room_id, academic_year_id)
+    return FeeBalance.objects.filter(
+        academic_year_id=academic_year_id, student__class_assigned_id=class_room_id
+    ).update(total_fees=total, balance=total - F('total_paid'), last_updated=timezone.now())
+
+
+def mandatory_structures(academic_year):
+    """The fee structures billed to every student of their class for a year"""
+    return FeeStructure.objects.filter(academic_year=academic_year, is_active=True, is_mandatory=True)
+
+
+def counted_payments(academic_year):
+    """Completed payments dated within an academic year"""
+    return Payment.objects.filter(
+        status=Payment.COUNTED_STATUS, payment_date__range=[academic_year.start_date, academic_year.end_date]
+    )
+
+
+def balance_students(academic_year, payments):
+    """Students who carry a balance for the year: enrolled in it, or with one of payments"""
+    return Student.objects.filter(Q(academic_year=academic_year) | Q(pk__in=payments.values('student_id')))
+
+
+def rebuild_balances(academic_year, student_ids=None, prune=True):
+    """
+    Recompute FeeBalance rows for a year from fee structures and completed
+    payments, for the given students or everyone enrolled or paying that
+    year. With prune, balances of students no longer in scope are removed.
+    Returns the number of balances written.
+    """
+    fees_by_class = dict(
+        mandatory_structures(academic_year).values('class_room').annotate(total=Sum('amount'))
+        .values_list('class_room', 'total')
+    )
+    payments = counted_payments(academic_year)
+    if student_ids is not None:
+        payments = payments.filter(student_id__in=student_ids)
+    paid_by_student = dict(
+        payments.values('student').annotate(total=Sum('amount_paid')).values_list('student', 'total')
+    )
+    students = balance_students(academic_year, payments)
+    if student_ids is not None:
+        students = students.filter(pk__in=student_ids)
+
+    now = timezone.now()
+    balances = []
+    for student_id, class_room_id in students.values_list('id', 'class_assigned_id').iterator():
+        total_fees = fees_by_class.get(class_room_id) or ZERO
+        total_paid = paid_by_student.get(student_id) or ZERO
+        balances.append(FeeBalance(
+            student_id=student_id,
+            academic_year=academic_year,
+            total_fees=total_fees,
+            total_paid=total_paid,
+            balance=total_fees - total_paid,
+            last_updated=now,
+        ))
+
+    with transaction.atomic():
+        if connection.features.supports_update_conflicts_with_target:
+            FeeBalance.objects.bulk_create(
+                balances,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['student', 'academic_year'],
+                update_fields=BALANCE_FIELDS,
+            )
+        else:
+            existing = FeeBalance.objects.filter(academic_year=academic_year)
+            if student_ids is not None:
+                existing = existing.filter(student_id__in=student_ids)
+            existing = dict(existing.values_list('student_id', 'id'))
+            for balance in balances:
+                balance.id = existing.get(balance.student_id)
+            FeeBalance.objects.bulk_update([b for b in balances if b.id], BALANCE_FIELDS, batch_size=500)
+            FeeBalance.objects.bulk_create([b for b in balances if not b.id], batch_size=500)
+        if prune:
+            stale = FeeBalance.objects.filter(academic_year=academic_year).exclude(
+                student__in=balance_students(academic_year, payments).values('id')
+            )
+            if student_ids is not None:
+                stale = stale.filter(student_id__in=student_ids)
+            stale.delete()
+    invalidate_fee_analytics()
+    return len(balances)
+
+
+def get_balance(student, academic_year):
+    """A student's FeeBalance for a year, built on first use"""
+    balance = FeeBalance.objects.filter(student=student, academic_year=academic_year).first()
+    if balance is None:
+        rebuild_balances(academic_year, student_ids=[student.pk], prune=False)
+        balance = FeeBalance.objects.filter(student=student, academic_year=academic_year).first()
+    return balance
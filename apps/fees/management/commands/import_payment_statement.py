@@ -0,0 +1,54 @@
+"""
+Management command to import payments from a bank or mobile-money CSV statement
+Usage: python manage.py import_payment_statement <file.csv> [--method MOBILE_MONEY] [--batch-size N] [--rejected <out.csv>] [--dry-run]
+"""
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.fees.statements import DEFAULT_BATCH_SIZE, DEFAULT_METHOD, StatementImport, read_statement, write_rejections
+
+
+class Command(BaseCommand):
+    help = 'Matches statement transactions to students and records them as completed payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV statement')
+        parser.add_argument('--method', default=DEFAULT_METHOD, help='Payment method when the statement has no channel column')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Transactions looked up and inserted per batch')
+        parser.add_argument('--rejected', help='Where to write rejected transactions. Defaults to <file>_rejected.csv')
+        parser.add_argument('--dry-run', action='store_true', help='Match and validate only; nothing is written')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.exists(path):
+            raise CommandError(f'File {path} does not exist')
+
+        started = time.monotonic()
+        with open(path, 'rb') as source:
+            rows, columns = read_statement(source)
+            statement = StatementImport(
+                rows, columns,
+                default_method=options['method'],
+                batch_size=options['batch_size'],
+                source=os.path.basename(path),
+            )
+            try:
+                summary = statement.run(dry_run=options['dry_run'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        if statement.rejected:
+            rejected_path = options['rejected'] or f'{os.path.splitext(path)[0]}_rejected.csv'
+            with open(rejected_path, 'w', newline='') as out:
+                write_rejections(statement.rejected, out)
+            self.stdout.write(self.style.WARNING(
+                f"{len(statement.rejected)} transaction(s) not imported "
+                f"({summary['duplicates']} duplicate, {summary['unmatched']} unmatched, {summary['invalid']} invalid). "
+                f"See {rejected_path}"
+            ))
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {summary['imported']} of {summary['total']} transaction(s) "
+            f"totalling {summary['amount']:,.2f} in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,37 @@
+"""
+Management command to rebuild fee balances from fee structures and payments
+Usage: python manage.py reconcile_fee_balances [--year <name or id>] [--all]
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.classes.models import AcademicYear
+from apps.fees.ledger import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = 'Recomputes every FeeBalance for an academic year (the current one by default) from aggregate queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', help='Academic year name or id. Defaults to the current academic year.')
+        parser.add_argument('--all', action='store_true', help='Reconcile every academic year')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            years = list(AcademicYear.objects.order_by('start_date'))
+        elif options['year']:
+            value = options['year']
+            lookup = {'pk': int(value)} if value.isdigit() else {'name': value}
+            years = list(AcademicYear.objects.filter(**lookup))
+            if not years:
+                raise CommandError(f"Academic year '{value}' does not exist")
+        else:
+            years = list(AcademicYear.objects.filter(is_current=True)[:1])
+            if not years:
+                raise CommandError('No current academic year. Pass --year or --all.')
+
+        for academic_year in years:
+            started = time.monotonic()
+            count = rebuild_balances(academic_year)
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {academic_year.name}: reconciled {count} balance(s) in {time.monotonic() - started:.1f}s'
+            ))
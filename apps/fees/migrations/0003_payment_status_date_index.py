@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0002_receipt_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'payment_date'], name='fees_paymen_status_7cd330_idx'),
+        ),
+    ]
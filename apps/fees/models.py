@@ -84,6 +84,8 @@ class Payment(models.Model):
         ('FAILED', 'Failed'),
         ('REFUNDED', 'Refunded'),
     )
+    # Only payments in this status count toward balances and collections
+    COUNTED_STATUS = 'COMPLETED'
     
     student = models.ForeignKey(
         Student,
@@ -144,6 +146,7 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=['student', 'payment_date']),
             models.Index(fields=['transaction_reference']),
+            models.Index(fields=['status', 'payment_date']),
         ]
     
     def __str__(self):
@@ -152,13 +155,28 @@ class Payment(models.Model):
     def save(self, *args, **kwargs):
         """Generate receipt number if not exists"""
         if not self.receipt_number:
-            from django.utils import timezone
-            year = timezone.now().year
-            count = Payment.objects.filter(payment_date__year=year).count() + 1
-            self.receipt_number = f"REC{year}{count:06d}"
+            from .receipts import next_receipt_number
+            self.receipt_number = next_receipt_number()
         super().save(*args, **kwargs)
 
 
+class ReceiptSequence(models.Model):
+    """
+    Per-year receipt number counter, locked while numbers are taken from it
+    """
+    year = models.PositiveIntegerField(unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-year']
+        verbose_name = 'Receipt Sequence'
+        verbose_name_plural = 'Receipt Sequences'
+    
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
+
+
 class FeeBalance(models.Model):
     """
     Track fee balance for each student
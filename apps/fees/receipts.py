@@ -0,0 +1,58 @@
+"""
+Receipt Numbers
+Receipt numbers come from a per-year ReceiptSequence row taken under
+select_for_update, so concurrent cashiers never get the same number and
+issuing one is a single-row update however many payments exist
+"""
+from config.sequences import allocate_numbers, highest_issued
+from .models import Payment, ReceiptSequence
+
+RECEIPT_PREFIX = 'REC'
+
+
+def format_receipt_number(year, value):
+    return f"{RECEIPT_PREFIX}{year}{value:06d}"
+
+
+def _highest_issued(year):
+    """Largest counter value already on a receipt for the year, so a new counter continues from it"""
+    return highest_issued(Payment.objects.all(), 'receipt_number', f"{RECEIPT_PREFIX}{year}")
+
+
+def allocate_receipt_numbers(count, year=None):
+    """
+    Reserve a contiguous range of count receipt numbers for a year (the
+    current year by default). Batch imports take one range per batch.
+    The year's row stays locked until the enclosing transaction commits,
+    so call this outside long-running transactions.
+    """
+    return allocate_numbers(ReceiptSequence, count, format_receipt_number, _highest_issued, year)
+
+
+def next_receipt_number(year=None):
+    return allocate_receipt_numbers(1, year)[0]
+
+
+class ReceiptNumberPool:
+    """
+    Hands out receipt numbers one at a time from preallocated ranges,
+    reserving block_size more whenever the current range runs out.
+    Unused numbers in the last range are skipped, never reissued.
+    """
+
+    def __init__(self, block_size=500, year=None):
+        self.block_size = block_size
+        self.year = year
+        self._numbers = []
+
+    def take(self, count):
+        if count > len(self._numbers):
+            self._numbers.extend(allocate_receipt_numbers(max(self.block_size, count - len(self._numbers)), self.year))
+        taken, self._numbers = self._numbers[:count], self._numbers[count:]
+        return taken
+
+    def __next__(self):
+        return self.take(1)[0]
+
+    def __iter__(self):
+        return self
@@ -0,0 +1,68 @@
+"""
+Signal handlers for Fees Management
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .analytics import invalidate_fee_analytics
+from .ledger import payment_entry, record_payment_change, refresh_class_fees
+from .models import FeeBalance, FeeStructure, Payment
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_entry(sender, instance, **kwargs):
+    """Note what the payment counted for before this save, so post_save can move it"""
+    instance._ledger_entry = None
+    if instance.pk and not instance._state.adding:
+        previous = Payment.objects.filter(pk=instance.pk).values(
+            'student_id', 'payment_date', 'amount_paid', 'status'
+        ).first()
+        if previous:
+            instance._ledger_entry = payment_entry(
+                previous['student_id'], previous['payment_date'], previous['amount_paid'], previous['status']
+            )
+
+
+@receiver(post_save, sender=Payment)
+def update_balance_on_payment(sender, instance, **kwargs):
+    """Completing a payment adds to total_paid; refunding, failing or moving it takes it back off"""
+    current = payment_entry(instance.student_id, instance.payment_date, instance.amount_paid, instance.status)
+    record_payment_change(getattr(instance, '_ledger_entry', None), current)
+    instance._ledger_entry = current
+
+
+@receiver(post_delete, sender=Payment)
+def update_balance_on_payment_delete(sender, instance, **kwargs):
+    record_payment_change(
+        payment_entry(instance.student_id, instance.payment_date, instance.amount_paid, instance.status), None
+    )
+
+
+@receiver(pre_save, sender=FeeStructure)
+def remember_fee_structure_class(sender, instance, **kwargs):
+    instance._ledger_class = None
+    if instance.pk and not instance._state.adding:
+        instance._ledger_class = FeeStructure.objects.filter(pk=instance.pk).values_list(
+            'class_room_id', 'academic_year_id'
+        ).first()
+
+
+@receiver(post_save, sender=FeeStructure)
+@receiver(post_delete, sender=FeeStructure)
+def update_balances_on_fee_structure(sender, instance, **kwargs):
+    """Re-price the class (and the class it moved from, if any) when a fee structure changes"""
+    affected = {(instance.class_room_id, instance.academic_year_id)}
+    if getattr(instance, '_ledger_class', None):
+        affected.add(instance._ledger_class)
+    for class_room_id, academic_year_id in affected:
+        refresh_class_fees(class_room_id, academic_year_id)
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=FeeStructure)
+@receiver(post_delete, sender=FeeStructure)
+@receiver(post_save, sender=FeeBalance)
+@receiver(post_delete, sender=FeeBalance)
+def refresh_fee_analytics(sender, **kwargs):
+    """Retire cached fee analytics when the records they aggregate change"""
+    invalidate_fee_analytics()
@@ -0,0 +1,262 @@
+"""
+Payment Statement Import
+Streams a bank or mobile-money CSV statement in batches: each batch costs
+one IN lookup for already-imported references, one for students, and a
+bulk INSERT that skips references recorded since the lookup. Receipt numbers are taken from the sequence in blocks and fee
+balances are rebuilt in aggregate once the file is done.
+"""
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from apps.accounts.dashboard import invalidate_dashboard
+from apps.classes.models import AcademicYear
+from apps.students.models import Student
+from .ledger import rebuild_balances
+from .models import Payment
+from .receipts import ReceiptNumberPool
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_METHOD = 'MOBILE_MONEY'
+BALANCE_CHUNK_SIZE = 1000
+
+# Statement headers vary by provider; each field accepts any of these (case-insensitive)
+COLUMN_ALIASES = {
+    'reference': ['transaction reference', 'reference', 'transaction id', 'receipt no', 'ref'],
+    'amount': ['amount', 'credit', 'paid in', 'amount paid'],
+    'date': ['date', 'transaction date', 'value date', 'completion time'],
+    'account': ['admission number', 'account', 'account number', 'bill reference', 'student'],
+    'description': ['description', 'narration', 'details', 'remarks'],
+    'method': ['payment method', 'channel', 'method'],
+}
+REQUIRED_FIELDS = ('reference', 'amount', 'date')
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d.%m.%Y')
+TOKEN = re.compile(r'[A-Za-z0-9/-]+')
+# A currency code (KES, Ksh., RWF) or symbol before or after the number
+CURRENCY = re.compile(r'^(?:[A-Za-z]{2,4}\.?|[^\w\s.,()+-])\s*|\s*(?:[A-Za-z]{2,4}\.?|[^\w\s.,()+-])$')
+# Digits with optional thousands commas and at most two decimal places
+AMOUNT = re.compile(r'[+-]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{1,2})?')
+METHODS = {code for code, label in Payment.PAYMENT_METHOD_CHOICES}
+
+
+def _columns(fieldnames):
+    """Map each statement field to the header it appears under"""
+    headers = {name.strip().lower(): name for name in fieldnames or []}
+    return {
+        field: next((headers[alias] for alias in aliases if alias in headers), None)
+        for field, aliases in COLUMN_ALIASES.items()
+    }
+
+
+def _parse_date(value):
+    value = value.strip()
+    date = parse_date(value[:10]) if re.match(r'\d{4}-\d{2}-\d{2}', value) else None
+    if date:
+        return date
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value):
+    """
+    Amount in a statement cell, or None when it is not a plain number.
+    Currency codes and symbols, spaces and thousands commas are dropped;
+    a debit written in parentheses or with a trailing minus comes back
+    negative. Anything else, such as "1.000,50", is not guessed at.
+    """
+    value = CURRENCY.sub('', (value or '').strip()).replace(' ', '').replace('\xa0', '')
+    negative = False
+    if value.startswith('(') and value.endswith(')'):
+        value, negative = value[1:-1], True
+    elif value.endswith('-'):
+        value, negative = value[:-1], True
+    if not AMOUNT.fullmatch(value):
+        return None
+    amount = Decimal(value.replace(',', ''))
+    return -amount if negative else amount
+
+
+class StatementImport:
+    """
+    Import one statement file. rows is any iterable of dicts (csv.DictReader);
+    read_statement() builds one from a file. Unmatched, duplicate and invalid
+    transactions are kept in self.rejected with a reason.
+    """
+
+    def __init__(self, rows, columns, received_by=None, default_method=DEFAULT_METHOD,
+                 batch_size=DEFAULT_BATCH_SIZE, source=''):
+        self.rows = rows
+        self.columns = columns
+        self.received_by = received_by
+        self.default_method = default_method
+        self.batch_size = batch_size
+        self.source = source
+        self.rejected = []
+        self.summary = {'total': 0, 'imported': 0, 'amount': Decimal('0'), 'duplicates': 0, 'unmatched': 0, 'invalid': 0}
+        # Every reference seen so far, so a transaction repeated later in the file is caught too
+        self.seen = set()
+        self.touched = defaultdict(set)
+
+    def missing_columns(self):
+        return [COLUMN_ALIASES[field][0].title() for field in REQUIRED_FIELDS if not self.columns.get(field)]
+
+    def _value(self, row, field):
+        column = self.columns.get(field)
+        return str(row.get(column) or '').strip() if column else ''
+
+    def _reject(self, line, row, category, reason):
+        self.summary[category] += 1
+        self.rejected.append({'line': line, 'reference': self._value(row, 'reference'), 'reason': reason})
+
+    def _parse(self, line, row):
+        reference = self._value(row, 'reference')
+        if not reference:
+            self._reject(line, row, 'invalid', 'Missing transaction reference.')
+            return None
+        if len(reference) > 100:
+            self._reject(line, row, 'invalid', 'Transaction reference is longer than 100 characters.')
+            return None
+        amount = _parse_amount(self._value(row, 'amount'))
+        if amount is None:
+            self._reject(line, row, 'invalid', f"Amount '{self._value(row, 'amount')}' is not a recognised amount.")
+            return None
+        if amount <= 0:
+            self._reject(line, row, 'invalid', f"Amount '{self._value(row, 'amount')}' is not a credit.")
+            return None
+        payment_date = _parse_date(self._value(row, 'date'))
+        if payment_date is None:
+            self._reject(line, row, 'invalid', f"Date '{self._value(row, 'date')}' is not recognised.")
+            return None
+        method = self._value(row, 'method').upper().replace(' ', '_')
+        account, description = self._value(row, 'account'), self._value(row, 'description')
+        # Candidate admission numbers: the account field first, then tokens in the reference and narration
+        candidates = [account] + TOKEN.findall(f'{account} {reference} {description}')
+        return {
+            'line': line,
+            'row': row,
+            'reference': reference,
+            'amount': amount,
+            'payment_date': payment_date,
+            'method': method if method in METHODS else self.default_method,
+            'description': description,
+            'candidates': [c.upper() for c in candidates if c],
+        }
+
+    def _import_batch(self, batch, receipts, dry_run):
+        existing = set(Payment.objects.filter(
+            transaction_reference__in=[entry['reference'] for entry in batch]
+        ).values_list('transaction_reference', flat=True))
+        tokens = {candidate for entry in batch for candidate in entry['candidates']}
+        students = {
+            admission_number.upper(): student_id
+            for student_id, admission_number in Student.objects.filter(
+                admission_number__in=tokens
+            ).values_list('id', 'admission_number')
+        }
+
+        payments, entries = [], []
+        for entry in batch:
+            if entry['reference'] in existing:
+                self._reject(entry['line'], entry['row'], 'duplicates', 'Already imported.')
+                continue
+            student_id = next((students[c] for c in entry['candidates'] if c in students), None)
+            if student_id is None:
+                self._reject(entry['line'], entry['row'], 'unmatched', 'No student matches the account or reference.')
+                continue
+            payments.append(Payment(
+                student_id=student_id,
+                amount_paid=entry['amount'],
+                payment_date=entry['payment_date'],
+                payment_method=entry['method'],
+                transaction_reference=entry['reference'],
+                status=Payment.COUNTED_STATUS,
+                received_by=self.received_by,
+                remarks=f"Statement {self.source}: {entry['description']}".strip(),
+            ))
+            entries.append(entry)
+
+        if payments and not dry_run:
+            for payment, receipt_number in zip(payments, receipts.take(len(payments))):
+                payment.receipt_number = receipt_number
+            with transaction.atomic():
+                # A reference recorded by hand or by another import since the lookup above is
+                # skipped rather than failing the batch; the receipt numbers show which rows landed
+                Payment.objects.bulk_create(payments, batch_size=self.batch_size, ignore_conflicts=True)
+                landed = set(Payment.objects.filter(
+                    receipt_number__in=[payment.receipt_number for payment in payments]
+                ).values_list('receipt_number', flat=True))
+            for payment, entry in zip(payments, entries):
+                if payment.receipt_number not in landed:
+                    self._reject(entry['line'], entry['row'], 'duplicates', 'Already imported.')
+            payments = [payment for payment in payments if payment.receipt_number in landed]
+            for payment in payments:
+                self.touched[payment.payment_date].add(payment.student_id)
+        self.summary['imported'] += len(payments)
+        self.summary['amount'] += sum((payment.amount_paid for payment in payments), Decimal('0'))
+
+    def run(self, dry_run=False):
+        """Import every row. Returns the summary dict."""
+        missing = self.missing_columns()
+        if missing:
+            raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+        receipts = ReceiptNumberPool(block_size=self.batch_size)
+        batch = []
+        try:
+            # Line 1 is the header
+            for line, row in enumerate(self.rows, start=2):
+                self.summary['total'] += 1
+                entry = self._parse(line, row)
+                if entry is None:
+                    continue
+                if entry['reference'] in self.seen:
+                    self._reject(line, row, 'duplicates', 'Repeated in this statement.')
+                    continue
+                self.seen.add(entry['reference'])
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch, receipts, dry_run)
+                    batch = []
+            if batch:
+                self._import_batch(batch, receipts, dry_run)
+        finally:
+            # Each batch commits on its own, so balances follow whatever was
+            # committed even when a later batch or row fails
+            if self.touched:
+                self.update_balances()
+        return self.summary
+
+    def update_balances(self):
+        """Rebuild the balances of every student paid, once per academic year"""
+        dates = sorted(self.touched)
+        for academic_year in AcademicYear.objects.filter(start_date__lte=dates[-1], end_date__gte=dates[0]):
+            student_ids = {
+                student_id
+                for date, ids in self.touched.items()
+                if academic_year.start_date <= date <= academic_year.end_date
+                for student_id in ids
+            }
+            student_ids = sorted(student_ids)
+            for offset in range(0, len(student_ids), BALANCE_CHUNK_SIZE):
+                rebuild_balances(academic_year, student_ids=student_ids[offset:offset + BALANCE_CHUNK_SIZE], prune=False)
+        invalidate_dashboard()
+
+
+def read_statement(source, encoding='utf-8-sig'):
+    """(rows, columns) for a CSV statement in a binary file object; rows are read lazily"""
+    reader = csv.DictReader(io.TextIOWrapper(source, encoding=encoding, newline=''))
+    return reader, _columns(reader.fieldnames)
+
+
+def write_rejections(rejected, stream):
+    """Write rejected transactions as CSV to a text stream"""
+    writer = csv.DictWriter(stream, fieldnames=['line', 'reference', 'reason'])
+    writer.writeheader()
+    writer.writerows(rejected)
@@ -7,6 +7,8 @@ urlpatterns = [
     path('structure/', views.fee_structure_view, name='fee_structure'),
     path('structure/add/', views.fee_structure_create_view, name='fee_structure_add'),
     path('payments/', views.payment_list_view, name='payment_list'),
+    path('payments/import/', views.payment_import_view, name='payment_import'),
+    path('analytics/<slug:report>/', views.fee_analytics_data_view, name='fee_analytics_data'),
     path('student/<int:student_id>/', views.student_fees_view, name='student_fees'),
     path('student/<int:student_id>/record/', views.record_payment_view, name='record_payment'),
 ]
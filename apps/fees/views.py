@@ -4,7 +4,7 @@ Views for Fees Management
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from apps.accounts.decorators import admin_required
-from .models import FeeStructure, Payment, FeeBalance
+from .models import FeeStructure, Payment
 from apps.students.models import Student
 from .forms import FeeStructureForm
 
@@ -28,7 +28,14 @@ Views for Fees Management
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from apps.accounts.decorators import admin_required
-from .models import FeeStructure, Payment, FeeBalance
+from django.contrib import messages
+from django.db.models import Sum
+from django.http import Http404, JsonResponse
+from .analytics import REPORTS, get_report
+from .models import FeeStructure, Payment
+from .ledger import get_balance
+from .statements import DEFAULT_METHOD, StatementImport, read_statement
+from apps.classes.models import AcademicYear
 from apps.students.models import Student
 
 
@@ -41,7 +48,7 @@ def fee_structure_view(request):
     unique_classes = fee_structures.values('class_room').distinct().count()
     unique_years = fee_structures.values('academic_year').distinct().count()
     unique_types = fee_structures.values('fee_type').distinct().count()
-    total_amount = sum([fs.amount for fs in fee_structures])
+    total_amount = fee_structures.aggregate(total=Sum('amount'))['total'] or 0
     
     context = {
         'fee_structures': fee_structures,
@@ -62,23 +69,50 @@ def payment_list_view(request):
 
 @login_required
 def student_fees_view(request, student_id):
-    """View student fees and payment history"""
-    student = get_object_or_404(Student, pk=student_id)
-    payments = Payment.objects.filter(student=student).order_by('-payment_date')
-    
-    try:
-        balance = FeeBalance.objects.get(student=student)
-    except FeeBalance.DoesNotExist:
-        balance = None
+    """View student fees and payment history for an academic year (the student's own by default)"""
+    student = get_object_or_404(Student.objects.select_related('user', 'class_assigned', 'academic_year'), pk=student_id)
+    academic_year = student.academic_year
+    year_id = request.GET.get('year')
+    if year_id and year_id.isdigit():
+        academic_year = get_object_or_404(AcademicYear, pk=year_id)
+
+    payments = Payment.objects.filter(
+        student=student, payment_date__range=[academic_year.start_date, academic_year.end_date]
+    ).select_related('fee_structure', 'received_by').order_by('-payment_date')
+    balance = get_balance(student, academic_year)
     
     context = {
         'student': student,
+        'academic_year': academic_year,
+        'academic_years': AcademicYear.objects.order_by('-start_date'),
         'payments': payments,
         'balance': balance,
     }
     return render(request, 'fees/student_fees.html', context)
 
 
+@login_required
+@admin_required
+def payment_import_view(request):
+    """Import payments from a bank or mobile-money CSV statement"""
+    context = {'methods': Payment.PAYMENT_METHOD_CHOICES, 'default_method': DEFAULT_METHOD}
+    if request.method == 'POST' and request.FILES.get('file'):
+        upload = request.FILES['file']
+        method = request.POST.get('method') or DEFAULT_METHOD
+        dry_run = bool(request.POST.get('dry_run'))
+        try:
+            rows, columns = read_statement(upload.file)
+            statement = StatementImport(rows, columns, received_by=request.user, default_method=method, source=upload.name)
+            summary = statement.run(dry_run=dry_run)
+        except (ValueError, UnicodeDecodeError) as e:
+            messages.error(request, f'Could not read the statement: {e}')
+            return render(request, 'fees/payment_import.html', context)
+        verb = 'Would import' if dry_run else 'Imported'
+        messages.success(request, f"{verb} {summary['imported']} of {summary['total']} transaction(s).")
+        context.update({'summary': summary, 'rejected': statement.rejected[:100], 'dry_run': dry_run})
+    return render(request, 'fees/payment_import.html', context)
+
+
 @login_required
 @admin_required
 def record_payment_view(request, student_id):
@@ -86,3 +120,31 @@ def record_payment_view(request, student_id):
     student = get_object_or_404(Student, pk=student_id)
     # Payment form handling would go here
     return render(request, 'fees/record_payment.html', {'student': student})
+
+
+def _analytics_year(request):
+    """Academic year from ?year=<id>, else the current one"""
+    year_id = request.GET.get('year')
+    if year_id and year_id.isdigit():
+        return get_object_or_404(AcademicYear, pk=year_id)
+    academic_year = AcademicYear.objects.filter(is_current=True).first()
+    if academic_year is None:
+        raise Http404('No current academic year')
+    return academic_year
+
+
+@login_required
+@admin_required
+def fee_analytics_data_view(request, report):
+    """
+    JSON for fee charts. report is one of summary, monthly, methods,
+    fee-types or classes; ?year=<id> selects the academic year.
+    """
+    if report not in REPORTS:
+        raise Http404(f"Unknown report '{report}'")
+    academic_year = _analytics_year(request)
+    return JsonResponse({
+        'academic_year': {'id': academic_year.pk, 'name': academic_year.name},
+        'report': report,
+        'data': get_report(report, academic_year),
+    })
@@ -0,0 +1,27 @@
+"""
+REST API for Notifications
+"""
+import django_filters
+from config.api import OptimizedReadOnlyViewSet, SparseModelSerializer
+from .models import Notification
+
+
+class NotificationSerializer(SparseModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ['id', 'title', 'message', 'notification_type', 'link', 'is_read', 'created_at', 'read_at']
+
+
+class NotificationFilter(django_filters.FilterSet):
+    class Meta:
+        model = Notification
+        fields = ['is_read', 'notification_type']
+
+
+class NotificationViewSet(OptimizedReadOnlyViewSet):
+    """The signed-in user's own notifications"""
+    serializer_class = NotificationSerializer
+    filterset_class = NotificationFilter
+
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user)
@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.notifications'
     verbose_name = 'Notifications & Notices'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .counters import check_shared_cache
+        checks.register(check_shared_cache, checks.Tags.caches, deploy=True)
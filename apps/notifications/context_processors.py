@@ -0,0 +1,12 @@
+"""
+Template context processors for Notifications
+"""
+from .counters import get_unread_count
+
+
+def unread_notifications(request):
+    """Unread notification count for the navbar badge"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_count': get_unread_count(user.pk)}
@@ -0,0 +1,90 @@
+"""
+Unread Notification Counters
+Per-user unread counts kept in the cache. Writes adjust them with atomic
+cache increments; a missing counter is rebuilt from the (user, is_read) index
+on the next read. Notifications may be sent from a Celery worker, so every
+process must share the cache (CACHE_URL).
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from .models import Notification
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _missed_key(user_id):
+    return f'notifications:unread:{user_id}:missed'
+
+
+def get_counter_timeout():
+    # Counters expire so any drift corrects itself within minutes
+    return getattr(settings, 'NOTIFICATION_COUNTER_TTL', 300)
+
+
+def get_unread_count(user_id):
+    """Unread notifications for a user; no query when the counter is cached"""
+    count = cache.get(_key(user_id))
+    if count is None:
+        cache.delete(_missed_key(user_id))
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(_key(user_id), count, get_counter_timeout())
+        if cache.get(_missed_key(user_id)):
+            # A change landed between the count and the add and may not be in
+            # either, so recount on the next read
+            cache.delete(_key(user_id))
+    return count
+
+
+def adjust_unread_counts(user_ids, delta):
+    """Add delta to each user's cached counter; users without one are rebuilt on their next read"""
+    for user_id in user_ids:
+        try:
+            if cache.incr(_key(user_id), delta) < 0:
+                cache.delete(_key(user_id))
+        except ValueError:
+            # Tell a rebuild that may be counting right now that it missed this change
+            cache.set(_missed_key(user_id), True, get_counter_timeout())
+
+
+def reset_unread_count(user_id):
+    """Forget a user's counter so the next read rebuilds it"""
+    cache.delete(_key(user_id))
+
+
+def mark_read(notification):
+    """
+    Mark one notification read with a conditional UPDATE, so concurrent
+    requests cannot both decrement the counter. Returns True if it was unread.
+    """
+    now = timezone.now()
+    updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True, read_at=now)
+    notification.is_read = True
+    if updated:
+        notification.read_at = now
+        adjust_unread_counts([notification.user_id], -1)
+    return bool(updated)
+
+
+def mark_all_read(user_id):
+    """Mark every unread notification for a user read in one UPDATE. Returns the number marked."""
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True, read_at=timezone.now())
+    # Rebuilt on next read, so a notification created meanwhile is still counted
+    reset_unread_count(user_id)
+    return updated
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Deploy check: counters are adjusted by whichever process sends a notification"""
+    if isinstance(caches['default'], LocMemCache):
+        return [checks.Warning(
+            'The default cache is local to each process, so unread notification counts, '
+            'grading schemes and cached reports can go stale in other processes.',
+            hint='Set CACHE_URL to a shared cache such as Redis.',
+            id='notifications.W001',
+        )]
+    return []
@@ -0,0 +1,89 @@
+"""
+Notification Fan-out
+Creates one Notification (and optionally one Message) per recipient with
+batched INSERTs, either in-process or on the Celery queue
+"""
+import logging
+from django.conf import settings
+from django.db import transaction
+from .counters import adjust_unread_counts
+from .models import Notification, Message
+
+logger = logging.getLogger('django')
+
+DELIVERY_SYNC = 'sync'
+DELIVERY_CELERY = 'celery'
+
+
+def get_batch_size():
+    return getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+
+
+def _recipient_ids(recipients):
+    """Accept a User queryset, model instances or plain ids and return a list of ids"""
+    if hasattr(recipients, 'values_list'):
+        return list(recipients.order_by().values_list('id', flat=True).distinct())
+    ids = []
+    seen = set()
+    for recipient in recipients:
+        recipient_id = getattr(recipient, 'pk', recipient)
+        if recipient_id is not None and recipient_id not in seen:
+            seen.add(recipient_id)
+            ids.append(recipient_id)
+    return ids
+
+
+def fan_out(recipient_ids, title, message, notification_type='INFO', link='', sender_id=None, batch_size=None):
+    """
+    Create notifications for every recipient, batch_size rows per INSERT.
+    When sender_id is given each recipient also gets an inbox Message.
+    Returns the number of recipients notified.
+    """
+    batch_size = batch_size or get_batch_size()
+    for offset in range(0, len(recipient_ids), batch_size):
+        batch = recipient_ids[offset:offset + batch_size]
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(user_id=user_id, title=title, message=message,
+                             notification_type=notification_type, link=link or '')
+                for user_id in batch
+            ], batch_size=batch_size)
+            if sender_id:
+                Message.objects.bulk_create([
+                    Message(sender_id=sender_id, recipient_id=user_id, subject=title, body=message)
+                    for user_id in batch
+                ], batch_size=batch_size)
+        adjust_unread_counts(batch, 1)
+    return len(recipient_ids)
+
+
+def send_notifications(recipients, title, message, notification_type='INFO', link='', sender=None):
+    """
+    Notify a set of users. With NOTIFICATION_DELIVERY = 'celery' the inserts
+    run on a worker once the current transaction commits; otherwise (or if
+    the queue is unreachable) they run here. Returns the number of recipients.
+    """
+    recipient_ids = _recipient_ids(recipients)
+    if not recipient_ids:
+        return 0
+    kwargs = {
+        'title': title,
+        'message': message,
+        'notification_type': notification_type,
+        'link': link or '',
+        'sender_id': getattr(sender, 'pk', sender),
+    }
+
+    if getattr(settings, 'NOTIFICATION_DELIVERY', DELIVERY_SYNC) == DELIVERY_CELERY:
+        def enqueue():
+            try:
+                from .tasks import fan_out_task
+                fan_out_task.delay(recipient_ids, **kwargs)
+            except Exception as e:
+                logger.warning(f"Could not queue notification fan-out, delivering in-process: {e}")
+                fan_out(recipient_ids, **kwargs)
+
+        transaction.on_commit(enqueue)
+    else:
+        fan_out(recipient_ids, **kwargs)
+    return len(recipient_ids)
@@ -114,11 +114,9 @@ class Notification(models.Model):
     
     def mark_as_read(self):
         """Mark notification as read"""
-        from django.utils import timezone
+        from .counters import mark_read
         if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save()
+            mark_read(self)
 
 
 class Message(models.Model):
@@ -0,0 +1,23 @@
+"""
+Signal handlers for Notifications
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .counters import adjust_unread_counts, reset_unread_count
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, **kwargs):
+    """Count new unread notifications; any other edit may flip is_read, so recount"""
+    if created:
+        if not instance.is_read:
+            adjust_unread_counts([instance.user_id], 1)
+    else:
+        reset_unread_count(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread_counts([instance.user_id], -1)
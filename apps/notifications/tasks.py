@@ -0,0 +1,11 @@
+"""
+Celery tasks for Notifications
+"""
+from celery import shared_task
+from .fanout import fan_out
+
+
+@shared_task(ignore_result=True)
+def fan_out_task(recipient_ids, title, message, notification_type='INFO', link='', sender_id=None):
+    """Background delivery for send_notifications"""
+    return fan_out(recipient_ids, title, message, notification_type, link, sender_id)
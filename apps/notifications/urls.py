@@ -15,6 +15,7 @@ urlpatterns = [
     path('', views.notifications_view, name='notifications'),
     path('create/', views.notification_create_view, name='notification_create'),
     path('<int:notification_id>/read/', views.mark_notification_read, name='mark_read'),
+    path('read-all/', views.mark_all_notifications_read, name='mark_all_read'),
     
     # Messages
     path('messages/', views.messages_view, name='messages'),
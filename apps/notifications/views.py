@@ -5,10 +5,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 from apps.accounts.decorators import admin_required, teacher_required
 from apps.accounts.models import User
 from .models import Notice, Notification, Message
 from .forms import NoticeForm, NotificationForm
+from .counters import get_unread_count, mark_all_read
+from .fanout import send_notifications
 
 
 @login_required
@@ -69,7 +72,7 @@ def notice_detail_view(request, pk):
 def notifications_view(request):
     """View user notifications"""
     notifications = Notification.objects.filter(user=request.user)
-    unread_count = notifications.filter(is_read=False).count()
+    unread_count = get_unread_count(request.user.pk)
     
     context = {
         'notifications': notifications,
@@ -89,6 +92,18 @@ def mark_notification_read(request, notification_id):
     return redirect('notifications:notifications')
 
 
+@login_required
+@require_POST
+def mark_all_notifications_read(request):
+    """Mark all of the user's notifications as read"""
+    count = mark_all_read(request.user.pk)
+    
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'success': True, 'marked': count})
+    messages.success(request, f'Marked {count} notification(s) as read.')
+    return redirect('notifications:notifications')
+
+
 @login_required
 def messages_view(request):
     """View messages inbox"""
@@ -200,24 +215,15 @@ def notification_create_view(request):
                 # Filter by role (ADMIN, TEACHER, STUDENT, PARENT, STAFF)
                 users = User.objects.filter(role=recipient_type)
             
-            # Create notification and message for each selected user
-            created_count = 0
-            for user in users:
-                Notification.objects.create(
-                    user=user,
-                    title=title,
-                    message=message,
-                    notification_type=notification_type,
-                    link=link
-                )
-                # Save as Message as well
-                Message.objects.create(
-                    sender=request.user,
-                    recipient=user,
-                    subject=title,
-                    body=message
-                )
-                created_count += 1
+            # Create a notification and an inbox message for each selected user
+            created_count = send_notifications(
+                users,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                link=link,
+                sender=request.user,
+            )
             
             messages.success(request, f'Successfully sent notification to {created_count} user(s)!')
             return redirect('notifications:notifications')
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Result, ReportCard
+from apps.classes.models import AcademicYear
+from apps.exams.models import Exam
+from .grading import regrade_exam
+from .models import GradeBoundary, GradingScheme, Result, ReportCard
 
 
 @admin.register(Result)
@@ -57,3 +60,36 @@ class ReportCardAdmin(admin.ModelAdmin):
         return obj.student.user.get_full_name() or obj.student.admission_number
     get_student_name.short_description = 'Student'
     get_student_name.admin_order_field = 'student__user__first_name'
+
+
+class GradeBoundaryInline(admin.TabularInline):
+    model = GradeBoundary
+    extra = 0
+    verbose_name = 'Grade Boundary'
+    verbose_name_plural = 'Grade Boundaries (lowest percentage for each grade)'
+
+
+@admin.register(GradingScheme)
+class GradingSchemeAdmin(admin.ModelAdmin):
+    list_display = ['name', 'level', 'academic_year', 'credits_per_subject', 'is_active', 'updated_at']
+    list_filter = ['level', 'academic_year', 'is_active']
+    search_fields = ['name']
+    inlines = [GradeBoundaryInline]
+    
+    actions = ['regrade_exams']
+    
+    def regrade_exams(self, request, queryset):
+        """Regrade every exam of the schemes' academic years (the current year for schemes without one)"""
+        year_ids = set(queryset.exclude(academic_year=None).values_list('academic_year_id', flat=True))
+        if queryset.filter(academic_year=None).exists():
+            year_ids.update(AcademicYear.objects.filter(is_current=True).values_list('id', flat=True))
+        results = report_cards = 0
+        exams = Exam.objects.filter(academic_year_id__in=year_ids)
+        for exam in exams:
+            changed = regrade_exam(exam)
+            results += changed[0]
+            report_cards += changed[1]
+        self.message_user(
+            request, f'Regraded {len(exams)} exam(s): {results} result(s) and {report_cards} report card(s) changed.'
+        )
+    regrade_exams.short_description = 'Regrade exams using the selected schemes'
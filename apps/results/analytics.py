@@ -0,0 +1,201 @@
+"""
+Exam Analytics
+Subject statistics for an exam (mean, median, standard deviation,
+quartiles, pass rate and grade distribution) exam-wide, per class and per
+stream. The exam's results are read in one query into NumPy arrays and
+every group is computed at once from a single sort, so the cost does not
+grow with the number of classes or subjects. Cached per exam until one of
+its results changes.
+"""
+import numpy as np
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from apps.classes.models import ClassRoom, Subject
+from config.cache import VersionedCache
+from .models import Result, pass_percentage
+
+UNASSIGNED = 'Unassigned'
+EXAM_ANALYTICS_CACHE = VersionedCache('results:analytics', 'EXAM_ANALYTICS_CACHE_TTL', 600)
+
+
+def invalidate_exam_analytics(exam_id):
+    """Retire the cached statistics of one exam"""
+    EXAM_ANALYTICS_CACHE.invalidate(scope=exam_id)
+
+
+def grade_codes():
+    return [code for code, label in Result._meta.get_field('grade').choices]
+
+
+def load_exam_arrays(exam):
+    """
+    One query for every result of the exam, as NumPy arrays: student,
+    subject and class ids (0 for students without a class), marks,
+    max_marks, is_absent and grade index (-1 when ungraded).
+    """
+    rows = list(Result.objects.filter(exam=exam).order_by().annotate(
+        marks=Cast('marks_obtained', FloatField())
+    ).values_list('student_id', 'subject_id', 'student__class_assigned_id', 'marks', 'max_marks', 'is_absent', 'grade'))
+    codes = {code: index for index, code in enumerate(grade_codes())}
+    students, subjects, classes, marks, max_marks, absent, grades = zip(*rows) if rows else ([],) * 7
+    return {
+        'student': np.array(students, dtype=np.int64),
+        'subject': np.array(subjects, dtype=np.int64),
+        'class': np.array([class_id or 0 for class_id in classes], dtype=np.int64),
+        'marks': np.array(marks, dtype=np.float64),
+        'max_marks': np.array(max_marks, dtype=np.float64),
+        'absent': np.array(absent, dtype=bool),
+        'grade': np.array([codes.get(grade, -1) for grade in grades], dtype=np.int64),
+    }
+
+
+def group_statistics(keys, values, passed, grades, n_grades):
+    """
+    Statistics of values per distinct key. Returns (keys, stats) where
+    stats holds one array per measure, aligned with keys. Quartiles and
+    the median interpolate linearly (as Excel's QUARTILE.INC does); the
+    standard deviation is the population one.
+    """
+    order = np.lexsort((values, keys))
+    keys, values, passed, grades = keys[order], values[order], passed[order], grades[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    means = np.add.reduceat(values, starts) / counts
+    deviations = values - np.repeat(means, counts)
+
+    def quantile(q):
+        position = starts + q * (counts - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        return values[low] + (values[high] - values[low]) * (position - low)
+
+    group = np.repeat(np.arange(len(starts)), counts)
+    graded = grades >= 0
+    distribution = np.bincount(
+        group[graded] * n_grades + grades[graded], minlength=len(starts) * n_grades
+    ).reshape(len(starts), n_grades)
+    return keys[starts], {
+        'count': counts,
+        'mean': means,
+        'median': quantile(0.5),
+        'std': np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts),
+        'min': values[starts],
+        'q1': quantile(0.25),
+        'q3': quantile(0.75),
+        'max': values[starts + counts - 1],
+        'passed': np.add.reduceat(passed.astype(np.int64), starts),
+        'grades': distribution,
+    }
+
+
+def _rows(keys, stats, labels, codes):
+    """Plain dicts (percentages rounded to 2 places) for JSON and templates"""
+    rows = []
+    for index, key in enumerate(keys.tolist()):
+        count = int(stats['count'][index])
+        rows.append({
+            **labels(key),
+            'count': count,
+            'mean': round(float(stats['mean'][index]), 2),
+            'median': round(float(stats['median'][index]), 2),
+            'std': round(float(stats['std'][index]), 2),
+            'min': round(float(stats['min'][index]), 2),
+            'q1': round(float(stats['q1'][index]), 2),
+            'q3': round(float(stats['q3'][index]), 2),
+            'max': round(float(stats['max'][index]), 2),
+            'passed': int(stats['passed'][index]),
+            'pass_rate': round(int(stats['passed'][index]) * 100 / count, 1),
+            'grades': dict(zip(codes, stats['grades'][index].tolist())),
+        })
+    return rows
+
+
+def compute_exam_analytics(exam):
+    """
+    Statistics on percentage scores for every subject of an exam: exam-wide
+    ('subjects'), per class across its streams ('classes') and per class
+    stream ('streams'). Absent students are left out of the statistics and
+    only counted in the summary. A result passes when its percentage
+    reaches the subject's pass_mark as a share of its total_marks.
+    """
+    data = load_exam_arrays(exam)
+    codes = grade_codes()
+    present = ~data['absent']
+
+    subject_ids = np.unique(data['subject'])
+    subjects = {
+        subject.id: subject
+        for subject in Subject.objects.filter(id__in=subject_ids.tolist()).only('name', 'code', 'pass_mark', 'total_marks')
+    }
+    class_rooms = {
+        class_room.id: class_room
+        for class_room in ClassRoom.objects.filter(id__in=np.unique(data['class']).tolist()).only('name', 'stream')
+    }
+
+    # Dense indexes so composite keys stay small: key = group * n_subjects + subject
+    subject_index = np.searchsorted(subject_ids, data['subject'])
+    n_subjects = max(len(subject_ids), 1)
+    required = np.array([pass_percentage(subjects[subject_id]) for subject_id in subject_ids.tolist()])
+    percentage = np.divide(
+        data['marks'] * 100, data['max_marks'], out=np.zeros_like(data['marks']), where=data['max_marks'] > 0
+    )
+    passed = percentage >= required[subject_index] if len(subject_ids) else np.zeros(0, dtype=bool)
+
+    stream_ids = np.unique(data['class'])
+    stream_index = np.searchsorted(stream_ids, data['class'])
+    stream_names = [
+        class_rooms[class_id].name if class_id in class_rooms else UNASSIGNED for class_id in stream_ids.tolist()
+    ]
+    class_names = sorted(set(stream_names))
+    name_index = np.array([class_names.index(name) for name in stream_names], dtype=np.int64)
+    class_index = name_index[stream_index] if len(stream_ids) else stream_index
+
+    def subject_label(index):
+        subject = subjects[int(subject_ids[index])]
+        return {'subject_id': subject.id, 'subject': subject.name, 'code': subject.code}
+
+    def stream_label(stream):
+        class_id = int(stream_ids[stream])
+        class_room = class_rooms.get(class_id)
+        return {
+            'class_id': class_id or None,
+            'class_name': stream_names[stream],
+            'stream': class_room.stream if class_room else '',
+        }
+
+    groups = {
+        'subjects': (subject_index, subject_label),
+        'classes': (
+            class_index * n_subjects + subject_index,
+            lambda key: {'class_name': class_names[key // n_subjects], **subject_label(key % n_subjects)},
+        ),
+        'streams': (
+            stream_index * n_subjects + subject_index,
+            lambda key: {**stream_label(key // n_subjects), **subject_label(key % n_subjects)},
+        ),
+    }
+    analytics = {
+        'exam': {'id': exam.pk, 'name': exam.name},
+        'grades': codes,
+        'summary': {
+            'students': int(len(np.unique(data['student']))),
+            'results': int(len(data['student'])),
+            'absent': int(data['absent'].sum()),
+            'subjects': int(len(subject_ids)),
+            'classes': int(len(stream_ids)),
+        },
+    }
+    for name, (keys, labels) in groups.items():
+        if not present.any():
+            analytics[name] = []
+            continue
+        group_keys, stats = group_statistics(
+            keys[present], percentage[present], passed[present], data['grade'][present], len(codes)
+        )
+        analytics[name] = _rows(group_keys, stats, labels, codes)
+    return analytics
+
+
+def get_exam_analytics(exam):
+    """Cached compute_exam_analytics(exam)"""
+    return EXAM_ANALYTICS_CACHE.get_or_build(lambda: compute_exam_analytics(exam), scope=exam.pk)
@@ -0,0 +1,148 @@
+"""
+REST API for Results
+"""
+from decimal import Decimal, InvalidOperation
+import django_filters
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from apps.accounts.sync import is_conflict, parse_version, run_idempotent
+from apps.classes.models import ClassRoom, Subject
+from apps.exams.models import Exam
+from config.api import OptimizedReadOnlyViewSet, SparseModelSerializer, student_scope
+from .ingestion import _as_bool, save_marksheet
+from .marksheet import can_enter_results
+from .models import Result
+
+
+def result_scope(user):
+    """
+    Q limiting results to those a user may see: staff see every result,
+    students and parents only their own results of published exams
+    """
+    scope = student_scope(user, 'student__')
+    if user.is_admin or user.is_teacher or user.is_superuser:
+        return scope
+    return scope & Q(exam__is_published=True)
+
+
+class ResultSerializer(SparseModelSerializer):
+    admission_number = serializers.CharField(source='student.admission_number', read_only=True)
+    student_name = serializers.SerializerMethodField()
+    exam_name = serializers.CharField(source='exam.name', read_only=True)
+    subject_name = serializers.CharField(source='subject.name', read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Result
+        fields = [
+            'id', 'student', 'admission_number', 'student_name', 'exam', 'exam_name', 'subject',
+            'subject_name', 'marks_obtained', 'max_marks', 'percentage', 'grade', 'is_absent',
+            'status', 'subject_position', 'subject_class_size', 'remarks', 'updated_at',
+        ]
+
+    def get_student_name(self, obj):
+        return obj.student.user.get_full_name()
+
+
+class ResultSyncSerializer(ResultSerializer):
+    """
+    Results as sent by the sync feed, without class ranks: re-ranking a
+    class rewrites every student's ranks without bumping updated_at (which
+    is the marks version offline uploads are checked against), so the feed
+    could not deliver them. Devices read ranks from the results endpoint.
+    """
+
+    class Meta(ResultSerializer.Meta):
+        fields = [
+            name for name in ResultSerializer.Meta.fields if name not in ('subject_position', 'subject_class_size')
+        ]
+
+
+class ResultFilter(django_filters.FilterSet):
+    class_room = django_filters.NumberFilter(field_name='student__class_assigned')
+
+    class Meta:
+        model = Result
+        fields = ['student', 'exam', 'subject', 'status', 'class_room']
+
+
+class ResultViewSet(OptimizedReadOnlyViewSet):
+    serializer_class = ResultSerializer
+    filterset_class = ResultFilter
+
+    def get_queryset(self):
+        return Result.objects.filter(result_scope(self.request.user)).select_related(
+            'student__user', 'exam', 'subject'
+        )
+
+
+def _same_marks(current, row):
+    """Whether an uploaded row holds the values already on the server"""
+    if _as_bool(row.get('is_absent', False)) != current['is_absent']:
+        return False
+    if str(row.get('remarks') or '') != (current['remarks'] or ''):
+        return False
+    if current['is_absent']:
+        return True
+    try:
+        return Decimal(str(row.get('marks'))) == current['marks_obtained']
+    except InvalidOperation:
+        return False
+
+
+@api_view(['POST'])
+def marks_sync_view(request):
+    """
+    Upload a subject marksheet entered offline:
+    {"idempotency_key", "exam_id", "class_id", "subject_id",
+     "rows": [{"student", "marks", "is_absent", "remarks", "updated_at"}]}
+    updated_at is the server version the device last saw; rows the server
+    has changed since are returned as conflicts (unless "force").
+    """
+    user = request.user
+    if not (user.is_teacher or user.is_admin or user.is_superuser):
+        return Response({'detail': 'Only teachers can sync marks.'}, status=status.HTTP_403_FORBIDDEN)
+    rows = request.data.get('rows')
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return Response({'detail': 'A list of rows is required.'}, status=status.HTTP_400_BAD_REQUEST)
+    exam = get_object_or_404(Exam, pk=request.data.get('exam_id'))
+    class_room = get_object_or_404(ClassRoom, pk=request.data.get('class_id'))
+    subject = get_object_or_404(Subject, pk=request.data.get('subject_id'))
+    if not can_enter_results(user, class_room):
+        return Response({'detail': 'You do not have permission to access this class.'}, status=status.HTTP_403_FORBIDDEN)
+    return run_idempotent(request, 'marks', lambda: _sync_marksheet(exam, class_room, subject, rows, user))
+
+
+def _sync_marksheet(exam, class_room, subject, rows, user):
+    server = {
+        row['student_id']: row
+        for row in Result.objects.filter(exam=exam, subject=subject, student_id__in=[
+            row.get('student') for row in rows if str(row.get('student')).isdigit()
+        ]).values('student_id', 'marks_obtained', 'is_absent', 'remarks', 'updated_at')
+    }
+
+    accepted, positions, conflicts = [], [], []
+    for index, row in enumerate(rows):
+        current = server.get(int(row['student'])) if str(row.get('student')).isdigit() else None
+        if current and not row.get('force'):
+            if is_conflict(current['updated_at'], parse_version(row.get('updated_at')), _same_marks(current, row)):
+                conflicts.append({'row': index, 'server': current})
+                continue
+        accepted.append(row)
+        positions.append(index)
+
+    report = save_marksheet(exam, class_room, subject, accepted, user)
+    for error in report['errors']:
+        error['row'] = positions[error['row']]
+    if not report['success']:
+        return report, status.HTTP_400_BAD_REQUEST
+
+    report['conflicts'] = conflicts
+    # The versions the device should base its next edits on
+    report['versions'] = list(Result.objects.filter(
+        exam=exam, subject=subject, student_id__in=[row.get('student') for row in accepted]
+    ).values('student_id', 'updated_at'))
+    return report, status.HTTP_200_OK
@@ -5,3 +5,6 @@ class ResultsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.results'
     verbose_name = 'Results Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,100 @@
+"""
+Result Browser
+Filtered result listing with keyset (seek) pagination over (created_at, id),
+so every page costs one index range scan however deep it is, and
+statistics aggregated in SQL over the whole filtered set
+"""
+import base64
+from django.db.models import Avg, Case, Count, IntegerField, Q, Sum, When
+from django.utils.dateparse import parse_datetime
+from .models import passes_condition
+
+PAGE_SIZE = 50
+FILTERS = {
+    'exam': 'exam_id',
+    'class': 'student__class_assigned_id',
+    'subject': 'subject_id',
+    'student': 'student_id',
+    'status': 'status',
+}
+
+
+def filter_results(queryset, params):
+    """Apply the exam, class, subject, student and status filters present in params"""
+    for param, lookup in FILTERS.items():
+        value = params.get(param)
+        if value:
+            queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+def result_statistics(queryset):
+    """
+    Count, average marks and passes over the whole filtered set in one
+    query. A result passes on the same rule as Result.is_pass and the
+    exam analytics (its percentage reaches the subject's pass percentage),
+    and absent students do not pass.
+    """
+    stats = queryset.order_by().annotate(
+        passed=Case(
+            When(passes_condition(), is_absent=False, then=1),
+            default=0,
+            output_field=IntegerField(),
+        )
+    ).aggregate(total=Count('id'), avg_score=Avg('marks_obtained'), pass_count=Sum('passed'))
+    total = stats['total']
+    pass_count = stats['pass_count'] or 0
+    return {
+        'total_results': total,
+        'avg_score': stats['avg_score'] or 0,
+        'pass_count': pass_count,
+        'pass_rate': (pass_count / total * 100) if total else 0,
+    }
+
+
+def encode_position(result):
+    value = f'{result.created_at.isoformat()}|{result.pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_position(token):
+    """(created_at, id) from a page token, or None if it is missing or malformed"""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode().split('|')
+        created_at = parse_datetime(created_at)
+        return (created_at, int(pk)) if created_at else None
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    One page of queryset, newest first. after is the token of the last row
+    of the previous page (next page), before the token of the first row of
+    the following page (previous page). Returns (rows, next_token,
+    previous_token); a token is None at either end.
+    """
+    position = decode_position(before) if before else decode_position(after) if after else None
+    backwards = bool(before and position)
+    if position:
+        created_at, pk = position
+        if backwards:
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+        else:
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    ordering = ('created_at', 'id') if backwards else ('-created_at', '-id')
+    rows = list(queryset.order_by(*ordering)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+    # Going forwards there are newer rows whenever we started from a position; backwards, older ones
+    newer = has_more if backwards else bool(position)
+    older = bool(position) if backwards else has_more
+    return (
+        rows,
+        encode_position(rows[-1]) if older else None,
+        encode_position(rows[0]) if newer else None,
+    )
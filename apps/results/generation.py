@@ -0,0 +1,105 @@
+"""
+Bulk Report Card Generation
+Builds every report card for an (exam, class) from a single Result query
+and writes them back in one transaction
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from django.utils import timezone
+from apps.classes.models import ClassRoom
+from apps.exams.models import ExamSchedule
+from .grading import scheme_for
+from .models import Result, ReportCard
+from .progress import invalidate_exam_progress
+from .ranking import rank_class
+
+
+REPORT_CARD_FIELDS = ['total_marks', 'marks_obtained', 'percentage', 'overall_grade', 'gpa', 'generated_at']
+
+
+def _two_places(value):
+    return Decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def _build_totals(rows, with_gpa, scheme):
+    """Aggregate (student_id, marks_obtained, max_marks) rows into per-student totals"""
+    totals = {}
+    for student_id, marks_obtained, max_marks in rows:
+        entry = totals.setdefault(student_id, {'obtained': Decimal('0'), 'possible': 0, 'points': 0.0, 'subjects': 0})
+        entry['obtained'] += marks_obtained
+        entry['possible'] += max_marks
+        if with_gpa:
+            pct = (float(marks_obtained) / max_marks) * 100 if max_marks else 0
+            entry['points'] += scheme.point(pct) * scheme.credits
+            entry['subjects'] += 1
+    return totals
+
+
+def _apply_totals(report_card, entry, with_gpa, scheme, now):
+    if entry is None:
+        entry = {'obtained': Decimal('0'), 'possible': 0, 'points': 0.0, 'subjects': 0}
+    report_card.total_marks = entry['possible']
+    report_card.marks_obtained = entry['obtained']
+    if entry['possible'] > 0:
+        percentage = (float(entry['obtained']) / entry['possible']) * 100
+        report_card.percentage = _two_places(percentage)
+        report_card.overall_grade = scheme.grade(percentage)
+    if with_gpa:
+        credits = entry['subjects'] * scheme.credits
+        report_card.gpa = _two_places(entry['points'] / credits) if credits else Decimal('0.00')
+    report_card.generated_at = now
+
+
+def generate_report_cards(exam, class_room, rank=True):
+    """
+    Generate (or refresh) report cards for every student in a class.
+    Loads all Result rows for the class once, computes totals, percentage,
+    overall grade and GPA in memory, then bulk writes the report cards and
+    class ranks inside a single transaction. Returns the number of report cards.
+    """
+    with_gpa = class_room.level == 'UNIVERSITY'
+    scheme = scheme_for(class_room.level, exam.academic_year_id)
+    student_ids = list(class_room.students.values_list('id', flat=True))
+    rows = Result.objects.filter(
+        exam=exam,
+        student__class_assigned=class_room,
+        is_absent=False,
+    ).order_by().values_list('student_id', 'marks_obtained', 'max_marks')
+    totals = _build_totals(rows, with_gpa, scheme)
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = {
+            rc.student_id: rc
+            for rc in ReportCard.objects.select_for_update().filter(exam=exam, student_id__in=student_ids)
+        }
+        to_update, to_create = [], []
+        for student_id in student_ids:
+            report_card = existing.get(student_id)
+            if report_card is None:
+                report_card = ReportCard(student_id=student_id, exam=exam)
+                to_create.append(report_card)
+            else:
+                to_update.append(report_card)
+            _apply_totals(report_card, totals.get(student_id), with_gpa, scheme, now)
+
+        ReportCard.objects.bulk_update(to_update, REPORT_CARD_FIELDS, batch_size=500)
+        ReportCard.objects.bulk_create(to_create, batch_size=500)
+        if rank:
+            rank_class(exam, class_room)
+    if to_create:
+        invalidate_exam_progress(exam.pk)
+    return len(student_ids)
+
+
+def exam_class_rooms(exam):
+    """Classes that sit an exam, according to its schedules"""
+    class_ids = ExamSchedule.objects.filter(exam=exam).values_list('class_room_id', flat=True)
+    return ClassRoom.objects.filter(id__in=class_ids)
+
+
+def generate_exam_report_cards(exam, class_rooms=None, rank=True):
+    """Generate report cards for every class in an exam. Returns {class_room: count}"""
+    if class_rooms is None:
+        class_rooms = exam_class_rooms(exam)
+    return {class_room: generate_report_cards(exam, class_room, rank=rank) for class_room in class_rooms}
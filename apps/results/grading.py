@@ -0,0 +1,162 @@
+"""
+Grading Schemes
+Grade boundaries compiled into sorted lookup tables: one bisect per score,
+or one numpy.searchsorted for a whole array of scores. Compiled schemes are
+cached for GRADING_SCHEME_CACHE_TTL seconds or until a scheme or boundary
+changes.
+"""
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from .analytics import invalidate_exam_analytics
+from .models import GradingScheme, Result, ReportCard
+
+CACHE_KEY = 'results:grading:schemes'
+
+# (grade, lowest percentage, grade point): used where no scheme is configured
+DEFAULT_BOUNDARIES = (
+    ('A', 80, 4.0),
+    ('B', 70, 3.5),
+    ('C', 60, 3.0),
+    ('D', 50, 2.5),
+    ('E', 40, 2.0),
+    ('F', 0, 0.0),
+)
+DEFAULT_CREDITS = 3
+
+
+class CompiledScheme:
+    """Boundaries sorted by lowest percentage, ready for bisect and searchsorted"""
+
+    def __init__(self, boundaries, credits=DEFAULT_CREDITS, name='Default'):
+        ordered = sorted(boundaries, key=lambda boundary: boundary[1])
+        self.thresholds = [float(minimum) for grade, minimum, point in ordered]
+        self.grades = [grade for grade, minimum, point in ordered]
+        self.points = [float(point) for grade, minimum, point in ordered]
+        self.credits = credits
+        self.name = name
+
+    def _index(self, percentage):
+        return max(bisect_right(self.thresholds, float(percentage)) - 1, 0)
+
+    def grade(self, percentage):
+        return self.grades[self._index(percentage)]
+
+    def point(self, percentage):
+        return self.points[self._index(percentage)]
+
+    def indexes(self, percentages):
+        """Boundary index for each score in a NumPy array"""
+        return np.maximum(np.searchsorted(self.thresholds, percentages, side='right') - 1, 0)
+
+    def grades_for(self, percentages):
+        return np.array(self.grades)[self.indexes(percentages)]
+
+    def points_for(self, percentages):
+        return np.array(self.points)[self.indexes(percentages)]
+
+
+DEFAULT_SCHEME = CompiledScheme(DEFAULT_BOUNDARIES)
+
+
+def invalidate_grading_schemes():
+    cache.delete(CACHE_KEY)
+
+
+def load_schemes():
+    """{(level, academic_year_id): CompiledScheme} for every active scheme with boundaries"""
+    schemes = cache.get(CACHE_KEY)
+    if schemes is None:
+        schemes = {}
+        for scheme in GradingScheme.objects.filter(is_active=True).order_by('updated_at').prefetch_related('boundaries'):
+            boundaries = [(b.grade, b.min_percentage, b.grade_point) for b in scheme.boundaries.all()]
+            if boundaries:
+                # The most recently edited scheme wins when two share a scope
+                schemes[(scheme.level, scheme.academic_year_id)] = CompiledScheme(
+                    boundaries, scheme.credits_per_subject, scheme.name
+                )
+        cache.set(CACHE_KEY, schemes, settings.GRADING_SCHEME_CACHE_TTL)
+    return schemes
+
+
+def scheme_for(level, academic_year_id=None):
+    """Most specific scheme for a class level and academic year, falling back to the default scale"""
+    schemes = load_schemes()
+    for key in ((level, academic_year_id), (level, None), ('', academic_year_id), ('', None)):
+        if key in schemes:
+            return schemes[key]
+    return DEFAULT_SCHEME
+
+
+def scheme_for_result(result):
+    class_room = result.student.class_assigned
+    return scheme_for(class_room.level if class_room else '', result.exam.academic_year_id)
+
+
+def _two_places(value):
+    return Decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def regrade_exam(exam):
+    """
+    Reassign every grade in an exam from the current grading schemes:
+    Result.grade for each mark (blank when absent), and the overall grade
+    and university GPA of existing report cards. Scores are graded per
+    class level in one searchsorted pass and only changed rows are
+    written, in one bulk_update per model. Manually entered grades are
+    overwritten. Returns (results changed, report cards changed).
+    """
+    rows = list(Result.objects.filter(exam=exam).order_by().annotate(
+        marks=Cast('marks_obtained', FloatField())
+    ).values_list('id', 'student_id', 'student__class_assigned__level', 'marks', 'max_marks', 'is_absent', 'grade'))
+    if not rows:
+        return 0, 0
+    ids, students, levels, marks, max_marks, absent, grades = zip(*rows)
+    ids, students = np.array(ids), np.array(students)
+    levels = np.array([level or '' for level in levels])
+    marks, max_marks = np.array(marks, dtype=np.float64), np.array(max_marks, dtype=np.float64)
+    absent, grades = np.array(absent, dtype=bool), np.array(grades)
+    # Same arithmetic as Result.percentage, so boundary scores grade identically
+    percentage = np.divide(marks, max_marks, out=np.zeros_like(marks), where=max_marks > 0) * 100
+
+    schemes = {level: scheme_for(level, exam.academic_year_id) for level in np.unique(levels).tolist()}
+    new_grades = np.empty(len(ids), dtype='<U1')
+    points = np.zeros(len(ids))
+    for level, scheme in schemes.items():
+        in_level = levels == level
+        new_grades[in_level] = scheme.grades_for(percentage[in_level])
+        points[in_level] = scheme.points_for(percentage[in_level])
+    new_grades[absent] = ''
+
+    now = timezone.now()
+    changed = np.flatnonzero(new_grades != grades)
+    results = [Result(id=int(ids[i]), grade=str(new_grades[i]), updated_at=now) for i in changed]
+
+    # University GPA: with equal credits per subject it is the mean grade point of the marks sat
+    sat = ~absent
+    student_ids, student_index = np.unique(students[sat], return_inverse=True)
+    counts = np.bincount(student_index, minlength=len(student_ids))
+    point_totals = np.bincount(student_index, weights=points[sat], minlength=len(student_ids))
+    gpa = dict(zip(student_ids.tolist(), (point_totals / np.maximum(counts, 1)).tolist()))
+
+    report_cards = []
+    for report_card in ReportCard.objects.filter(exam=exam, total_marks__gt=0).select_related('student__class_assigned'):
+        class_room = report_card.student.class_assigned
+        level = class_room.level if class_room else ''
+        overall_grade = scheme_for(level, exam.academic_year_id).grade(report_card.percentage)
+        report_card_gpa = _two_places(gpa.get(report_card.student_id, 0)) if level == 'UNIVERSITY' else report_card.gpa
+        if (overall_grade, report_card_gpa) != (report_card.overall_grade, report_card.gpa):
+            report_card.overall_grade, report_card.gpa = overall_grade, report_card_gpa
+            report_cards.append(report_card)
+
+    with transaction.atomic():
+        Result.objects.bulk_update(results, ['grade', 'updated_at'], batch_size=500)
+        ReportCard.objects.bulk_update(report_cards, ['overall_grade', 'gpa'], batch_size=500)
+    invalidate_exam_analytics(exam.pk)
+    return len(results), len(report_cards)
@@ -0,0 +1,150 @@
+"""
+Bulk Result Ingestion
+Validates a whole subject marksheet and upserts it in one transaction,
+reporting errors per row instead of failing half way through
+"""
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.accounts.dashboard import invalidate_dashboard
+from apps.exams.models import ExamSchedule
+from .grading import scheme_for
+from .progress import invalidate_exam_progress
+from .models import Result
+from .analytics import invalidate_exam_analytics
+from .ranking import invalidate_class_ranking
+
+
+UPSERT_FIELDS = ['marks_obtained', 'max_marks', 'grade', 'is_absent', 'remarks', 'entered_by', 'updated_at']
+
+
+def _valid_grades():
+    return {code for code, label in getattr(settings, 'RESULT_GRADE_CHOICES', [])} or set('ABCDEF')
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def validate_row(row, class_student_ids, max_marks, valid_grades, scheme):
+    """
+    Validate one marksheet row; a missing grade is taken from the grading scheme.
+    Returns (cleaned, errors); cleaned is None when the row is blank and should be skipped.
+    """
+    errors = []
+    try:
+        student_id = int(row.get('student'))
+    except (TypeError, ValueError):
+        return None, ['Invalid student id.']
+    if student_id not in class_student_ids:
+        errors.append('Student is not in this class.')
+
+    is_absent = _as_bool(row.get('is_absent', False))
+    remarks = str(row.get('remarks') or '')
+    marks = row.get('marks')
+
+    if is_absent:
+        return {'student_id': student_id, 'is_absent': True, 'marks': Decimal('0'), 'grade': '', 'remarks': remarks}, errors
+
+    if marks in (None, ''):
+        # Nothing entered for this student yet
+        return None, errors
+
+    try:
+        marks = Decimal(str(marks))
+        if not marks.is_finite():
+            raise InvalidOperation
+    except InvalidOperation:
+        errors.append(f"Marks '{row.get('marks')}' is not a number.")
+        return {'student_id': student_id}, errors
+    if marks < 0 or marks > max_marks:
+        errors.append(f'Marks must be between 0 and {max_marks}.')
+
+    grade = str(row.get('grade') or '').strip().upper()
+    if grade and grade not in valid_grades:
+        errors.append(f"Grade '{grade}' is not valid.")
+    if not grade and max_marks:
+        grade = scheme.grade(float(marks) / max_marks * 100)
+
+    return {'student_id': student_id, 'is_absent': False, 'marks': marks, 'grade': grade, 'remarks': remarks}, errors
+
+
+def save_marksheet(exam, class_room, subject, rows, entered_by):
+    """
+    Validate and save a subject marksheet for a class.
+    Nothing is written unless every row is valid. Returns a report dict with
+    'success', 'created', 'updated', 'skipped' and a per-row 'errors' list.
+    """
+    schedule = ExamSchedule.objects.filter(exam=exam, class_room=class_room, subject=subject).first()
+    max_marks = schedule.max_marks if schedule else subject.total_marks
+    class_student_ids = set(class_room.students.values_list('id', flat=True))
+    valid_grades = _valid_grades()
+    scheme = scheme_for(class_room.level, exam.academic_year_id)
+
+    cleaned_rows, errors, seen = [], [], set()
+    skipped = 0
+    for index, row in enumerate(rows):
+        cleaned, row_errors = validate_row(row, class_student_ids, max_marks, valid_grades, scheme)
+        student_id = cleaned['student_id'] if cleaned else row.get('student')
+        if cleaned and student_id in seen:
+            row_errors.append('Student appears more than once in this marksheet.')
+        if row_errors:
+            errors.append({'row': index, 'student': student_id, 'errors': row_errors})
+            continue
+        if cleaned is None:
+            skipped += 1
+            continue
+        seen.add(student_id)
+        cleaned_rows.append(cleaned)
+
+    report = {'success': not errors, 'created': 0, 'updated': 0, 'skipped': skipped, 'errors': errors}
+    if errors or not cleaned_rows:
+        return report
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = dict(
+            Result.objects.filter(exam=exam, subject=subject, student_id__in=seen)
+            .order_by()
+            .values_list('student_id', 'id')
+        )
+        objs = [
+            Result(
+                student_id=row['student_id'],
+                exam=exam,
+                subject=subject,
+                marks_obtained=row['marks'],
+                max_marks=max_marks,
+                grade=row['grade'],
+                is_absent=row['is_absent'],
+                remarks=row['remarks'],
+                entered_by=entered_by,
+                updated_at=now,
+            )
+            for row in cleaned_rows
+        ]
+        if connection.features.supports_update_conflicts_with_target:
+            Result.objects.bulk_create(
+                objs,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['student', 'exam', 'subject'],
+                update_fields=UPSERT_FIELDS,
+            )
+        else:
+            for obj in objs:
+                obj.id = existing.get(obj.student_id)
+            Result.objects.bulk_update([o for o in objs if o.id], UPSERT_FIELDS, batch_size=500)
+            Result.objects.bulk_create([o for o in objs if not o.id], batch_size=500)
+        invalidate_class_ranking(exam, class_room)
+    invalidate_dashboard()
+    invalidate_exam_analytics(exam.pk)
+
+    report['updated'] = len(existing)
+    report['created'] = len(objs) - len(existing)
+    if report['created']:
+        invalidate_exam_progress(exam.pk)
+    return report
@@ -0,0 +1,48 @@
+"""
+Management command to export every report card for an exam as one PDF or a ZIP
+Usage: python manage.py export_report_cards <exam_id> --output packs/term1.pdf [--class <class_id>] [--format pdf|zip] [--workers N]
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.classes.models import ClassRoom
+from apps.exams.models import Exam
+from apps.results.pdf_export import EXPORT_FORMATS, export_report_cards, get_worker_count
+
+
+class Command(BaseCommand):
+    help = 'Renders report cards for an exam in parallel into a merged PDF or a ZIP of PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int, help='Exam to export report cards for')
+        parser.add_argument('--output', required=True, help='File to write the PDF or ZIP to')
+        parser.add_argument('--class', dest='class_id', type=int, help='Only export this class')
+        parser.add_argument('--format', dest='output_format', choices=EXPORT_FORMATS, default='pdf')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: REPORT_PDF_WORKERS or CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(pk=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} does not exist")
+        class_room = None
+        if options['class_id']:
+            try:
+                class_room = ClassRoom.objects.get(pk=options['class_id'])
+            except ClassRoom.DoesNotExist:
+                raise CommandError(f"Class {options['class_id']} does not exist")
+
+        workers = get_worker_count(options['workers'])
+        self.stdout.write(f'Exporting report cards for {exam} with {workers} worker(s)...')
+        started = time.monotonic()
+
+        def progress(done, total):
+            if done == total or done % 25 == 0:
+                self.stdout.write(f'  {done}/{total} rendered')
+
+        with open(options['output'], 'wb') as dest:
+            count = export_report_cards(
+                exam, dest, class_room, options['output_format'], workers=workers, progress=progress
+            )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Exported {count} report card(s) to {options['output']} in {elapsed:.1f}s"))
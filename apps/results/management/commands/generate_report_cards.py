@@ -0,0 +1,48 @@
+"""
+Management command to generate report cards for an exam in bulk
+Usage: python manage.py generate_report_cards <exam_id> [--class <class_id> ...] [--no-rank]
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.classes.models import ClassRoom
+from apps.exams.models import Exam
+from apps.results.generation import exam_class_rooms, generate_report_cards
+
+
+class Command(BaseCommand):
+    help = 'Generates report cards (totals, grades, GPA and class positions) for every class in an exam'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int, help='Exam to generate report cards for')
+        parser.add_argument(
+            '--class',
+            dest='class_ids',
+            type=int,
+            action='append',
+            help='Only generate for this class (repeatable). Defaults to every class scheduled for the exam.'
+        )
+        parser.add_argument('--no-rank', action='store_true', help='Skip calculating class positions')
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(pk=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} does not exist")
+
+        if options['class_ids']:
+            class_rooms = ClassRoom.objects.filter(id__in=options['class_ids'])
+        else:
+            class_rooms = exam_class_rooms(exam)
+
+        started = time.monotonic()
+        total = 0
+        for class_room in class_rooms:
+            count = generate_report_cards(exam, class_room, rank=not options['no_rank'])
+            total += count
+            self.stdout.write(f'  {class_room}: {count} report card(s)')
+
+        if total == 0:
+            self.stdout.write(self.style.WARNING(f'No students found for {exam}.'))
+        else:
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f'✅ Generated {total} report card(s) for {exam} in {elapsed:.1f}s'))
@@ -0,0 +1,14 @@
+"""
+Management command to remove old report card exports and their files
+Usage: python manage.py purge_report_exports
+"""
+from django.core.management.base import BaseCommand
+from apps.results.pdf_export import purge_old_exports
+
+
+class Command(BaseCommand):
+    help = 'Deletes report card exports older than REPORT_EXPORT_RETENTION_HOURS, with their files'
+
+    def handle(self, *args, **options):
+        removed = purge_old_exports()
+        self.stdout.write(self.style.SUCCESS(f'✅ Removed {removed} old export(s)'))
@@ -0,0 +1,34 @@
+"""
+Management command to reassign grades after a grading scheme changes
+Usage: python manage.py regrade_results <exam_id> [<exam_id> ...] | --year <academic_year_id>
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.exams.models import Exam
+from apps.results.grading import regrade_exam
+
+
+class Command(BaseCommand):
+    help = 'Regrades every result and report card of the given exams from the current grading schemes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_ids', nargs='*', type=int, help='Exams to regrade')
+        parser.add_argument('--year', type=int, help='Regrade every exam of this academic year')
+
+    def handle(self, *args, **options):
+        if options['year']:
+            exams = list(Exam.objects.filter(academic_year_id=options['year']))
+        elif options['exam_ids']:
+            exams = list(Exam.objects.filter(pk__in=options['exam_ids']))
+            missing = set(options['exam_ids']) - {exam.pk for exam in exams}
+            if missing:
+                raise CommandError(f"Exam(s) {', '.join(map(str, sorted(missing)))} do not exist")
+        else:
+            raise CommandError('Give one or more exam ids, or --year')
+
+        started = time.monotonic()
+        for exam in exams:
+            results, report_cards = regrade_exam(exam)
+            self.stdout.write(f'  {exam}: {results} result(s), {report_cards} report card(s) changed')
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Regraded {len(exams)} exam(s) in {elapsed:.1f}s'))
@@ -0,0 +1,133 @@
+"""
+Marksheet Grid
+Loads every result of an exam for one class into a dense students x
+subjects matrix in a fixed three queries (students, scheduled subjects,
+results), for the result entry page and its JSON form
+"""
+from apps.exams.models import ExamSchedule
+from .grading import scheme_for
+from .models import Result
+
+
+def allowed_class_ids(user):
+    """
+    Ids of the classes a teacher may enter results for: those they are
+    class teacher of or teach a subject in. None when the user is not
+    restricted to particular classes.
+    """
+    teacher = getattr(user, 'teacher_profile', None)
+    if not user.is_teacher or user.is_admin or teacher is None:
+        return None
+    return set(teacher.classes_as_teacher.values_list('id', flat=True)).union(
+        teacher.teaching_subjects.values_list('class_room_id', flat=True)
+    )
+
+
+def can_enter_results(user, class_room):
+    """Teachers may only enter results for classes they teach or are class teacher of"""
+    class_ids = allowed_class_ids(user)
+    return class_ids is None or class_room.id in class_ids
+
+
+class Marksheet:
+    """
+    students and subjects are ordered lists; cells[i][j] is the result of
+    students[i] in subjects[j] as a dict (marks, is_absent, grade, remarks,
+    status, updated_at), or None when nothing has been entered
+    """
+
+    def __init__(self, exam, class_room, students, subjects, cells, scheme):
+        self.exam = exam
+        self.class_room = class_room
+        self.students = students
+        self.subjects = subjects
+        self.cells = cells
+        self.scheme = scheme
+
+    @property
+    def expected(self):
+        return len(self.students) * len(self.subjects)
+
+    @property
+    def entered(self):
+        return sum(cell is not None for row in self.cells for cell in row)
+
+    @property
+    def completion_percentage(self):
+        return self.entered / self.expected * 100 if self.expected else 0
+
+    def columns(self):
+        """Per-subject view for the entry tabs: {'subject', 'max_marks', 'entries': [(student, cell)]}"""
+        return [
+            {
+                'subject': subject['subject'],
+                'max_marks': subject['max_marks'],
+                'entries': [(student, row[index]) for student, row in zip(self.students, self.cells)],
+            }
+            for index, subject in enumerate(self.subjects)
+        ]
+
+    def grading(self):
+        """The class's grading scheme as sorted thresholds, for grading in the browser"""
+        return {'thresholds': self.scheme.thresholds, 'grades': self.scheme.grades}
+
+    def as_json(self):
+        return {
+            'exam': {'id': self.exam.pk, 'name': self.exam.name},
+            'class_room': {'id': self.class_room.pk, 'name': str(self.class_room)},
+            'students': [
+                {'id': student.pk, 'admission_number': student.admission_number, 'name': student.user.get_full_name()}
+                for student in self.students
+            ],
+            'subjects': [
+                {
+                    'id': subject['subject'].pk,
+                    'name': subject['subject'].name,
+                    'code': subject['subject'].code,
+                    'max_marks': subject['max_marks'],
+                }
+                for subject in self.subjects
+            ],
+            'cells': [
+                [None if cell is None else {
+                    **cell,
+                    'marks': None if cell['is_absent'] else str(cell['marks']),
+                    'updated_at': cell['updated_at'].isoformat(),
+                } for cell in row]
+                for row in self.cells
+            ],
+            'grading': self.grading(),
+            'expected': self.expected,
+            'entered': self.entered,
+        }
+
+
+def load_marksheet(exam, class_room):
+    """Marksheet for every student of a class in every subject scheduled for it in the exam"""
+    students = list(class_room.students.select_related('user').order_by('admission_number'))
+    subjects = [
+        {'subject': schedule.subject, 'max_marks': schedule.max_marks}
+        for schedule in ExamSchedule.objects.filter(exam=exam, class_room=class_room).select_related(
+            'subject'
+        ).order_by('subject__name')
+    ]
+    student_index = {student.pk: index for index, student in enumerate(students)}
+    subject_index = {subject['subject'].pk: index for index, subject in enumerate(subjects)}
+
+    cells = [[None] * len(subjects) for _ in students]
+    if students and subjects:
+        results = Result.objects.filter(
+            exam=exam, student__class_assigned=class_room, subject_id__in=subject_index
+        ).order_by().values_list(
+            'student_id', 'subject_id', 'marks_obtained', 'is_absent', 'grade', 'remarks', 'status', 'updated_at'
+        )
+        for student_id, subject_id, marks, is_absent, grade, remarks, status, updated_at in results:
+            cells[student_index[student_id]][subject_index[subject_id]] = {
+                'marks': marks,
+                'is_absent': is_absent,
+                'grade': grade,
+                'remarks': remarks,
+                'status': status,
+                'updated_at': updated_at,
+            }
+    return Marksheet(exam, class_room, students, subjects, cells, scheme_for(class_room.level, exam.academic_year_id))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0003_result_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='subject_class_size',
+            field=models.IntegerField(blank=True, help_text='Number of ranked results for this subject in the class', null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='subject_position',
+            field=models.IntegerField(blank=True, help_text='Rank in this subject within the class (set by the ranking engine)', null=True),
+        ),
+    ]
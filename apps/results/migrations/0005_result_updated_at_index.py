@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0004_result_subject_class_size_result_subject_position'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='result',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
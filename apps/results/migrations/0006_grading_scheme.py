@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:48
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0003_alter_classroom_level'),
+        ('results', '0005_result_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('level', models.CharField(blank=True, choices=[('PRIMARY', 'Primary School'), ('SECONDARY', 'Secondary School'), ('HIGH_SCHOOL', 'High School'), ('UNIVERSITY', 'University Level')], help_text='Class level this scheme grades; leave blank for every level', max_length=20)),
+                ('credits_per_subject', models.PositiveSmallIntegerField(default=3, help_text='Credit weight of each subject when calculating GPA')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(blank=True, help_text='Leave blank to use this scheme in every academic year', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='grading_schemes', to='classes.academicyear')),
+            ],
+            options={
+                'verbose_name': 'Grading Scheme',
+                'verbose_name_plural': 'Grading Schemes',
+                'ordering': ['level', 'academic_year__start_date', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.CharField(choices=[('A', 'A - Excellent'), ('B', 'B - Very Good'), ('C', 'C - Good'), ('D', 'D - Satisfactory'), ('E', 'E - Pass'), ('F', 'F - Fail')], max_length=1)),
+                ('min_percentage', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('grade_point', models.DecimalField(decimal_places=2, default=0, help_text='Grade point used for GPA', max_digits=3)),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boundaries', to='results.gradingscheme')),
+            ],
+            options={
+                'verbose_name': 'Grade Boundary',
+                'verbose_name_plural': 'Grade Boundaries',
+                'ordering': ['scheme', '-min_percentage'],
+                'unique_together': {('scheme', 'grade'), ('scheme', 'min_percentage')},
+            },
+        ),
+    ]
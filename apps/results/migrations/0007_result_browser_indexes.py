@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0006_grading_scheme'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['exam', 'subject', 'status', 'created_at', 'id'], name='results_res_exam_id_42608d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['created_at', 'id'], name='results_res_created_360d06_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_examschedule_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('classes', '0003_alter_classroom_level'),
+        ('results', '0007_result_browser_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportCardExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(editable=False, unique=True)),
+                ('output_format', models.CharField(choices=[('pdf', 'Merged PDF'), ('zip', 'ZIP of PDFs')], default='pdf', max_length=3)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('done', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('file_path', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report_card_exports', to='classes.classroom')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_card_exports', to='exams.exam')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_card_exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Report Card Export',
+                'verbose_name_plural': 'Report Card Exports',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
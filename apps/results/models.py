@@ -2,13 +2,117 @@
 Results Management Models
 """
 from django.db import models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.lookups import GreaterThanOrEqual
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 from apps.students.models import Student
-from apps.classes.models import Subject
+from apps.classes.models import AcademicYear, ClassRoom, Subject
 from apps.exams.models import Exam, ExamSchedule
 
 
+class GradingScheme(models.Model):
+    """
+    Grade boundaries for a section of the school. A scheme applies to one
+    class level (or every level when blank) and one academic year (or every
+    year when blank); the most specific active scheme wins, and the built-in
+    80/70/60/50/40 scale is used when none matches.
+    """
+    name = models.CharField(max_length=100)
+    level = models.CharField(
+        max_length=20,
+        choices=ClassRoom.LEVEL_CHOICES,
+        blank=True,
+        help_text='Class level this scheme grades; leave blank for every level'
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='grading_schemes',
+        help_text='Leave blank to use this scheme in every academic year'
+    )
+    credits_per_subject = models.PositiveSmallIntegerField(
+        default=3,
+        help_text='Credit weight of each subject when calculating GPA'
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['level', 'academic_year__start_date', 'name']
+        verbose_name = 'Grading Scheme'
+        verbose_name_plural = 'Grading Schemes'
+    
+    def __str__(self):
+        scope = self.get_level_display() if self.level else 'All levels'
+        if self.academic_year_id:
+            scope += f", {self.academic_year}"
+        return f"{self.name} ({scope})"
+
+
+class GradeBoundary(models.Model):
+    """
+    Lowest percentage that earns a grade within a scheme. Scores below the
+    lowest boundary get that boundary's grade.
+    """
+    scheme = models.ForeignKey(GradingScheme, on_delete=models.CASCADE, related_name='boundaries')
+    grade = models.CharField(
+        max_length=1,
+        choices=getattr(settings, 'RESULT_GRADE_CHOICES', [
+            ("A", "A - Excellent"),
+            ("B", "B - Very Good"),
+            ("C", "C - Good"),
+            ("D", "D - Satisfactory"),
+            ("E", "E - Pass"),
+            ("F", "F - Fail"),
+        ])
+    )
+    min_percentage = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+    grade_point = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        help_text='Grade point used for GPA'
+    )
+    
+    class Meta:
+        ordering = ['scheme', '-min_percentage']
+        unique_together = [['scheme', 'grade'], ['scheme', 'min_percentage']]
+        verbose_name = 'Grade Boundary'
+        verbose_name_plural = 'Grade Boundaries'
+    
+    def __str__(self):
+        return f"{self.grade} from {self.min_percentage}%"
+
+
+def pass_percentage(subject):
+    """
+    Percentage a result of subject must reach to pass: the subject's
+    pass_mark as a share of its total_marks. Comparing percentages keeps
+    the rule right for papers scheduled out of a different max_marks.
+    """
+    return subject.pass_mark * 100 / (subject.total_marks or 100)
+
+
+def passes_condition():
+    """pass_percentage as a boolean SQL expression over Result rows, for Case/When and filter()"""
+    percentage = Coalesce(
+        Cast('marks_obtained', FloatField()) * Value(100.0) / NullIf(F('max_marks'), 0), Value(0.0)
+    )
+    required = Cast('subject__pass_mark', FloatField()) * Value(100.0) / Coalesce(
+        NullIf(F('subject__total_marks'), 0), Value(100)
+    )
+    return GreaterThanOrEqual(percentage, required)
+
+
 class Result(models.Model):
     """
     Individual exam results/marks
@@ -73,6 +177,17 @@ class Result(models.Model):
         help_text='Was student absent for this exam?'
     )
     
+    subject_position = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text='Rank in this subject within the class (set by the ranking engine)'
+    )
+    subject_class_size = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text='Number of ranked results for this subject in the class'
+    )
+    
     entered_by = models.ForeignKey(
         'accounts.User',
         on_delete=models.SET_NULL,
@@ -80,7 +195,7 @@ class Result(models.Model):
     )
     
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-exam__start_date', 'student', 'subject']
@@ -89,6 +204,9 @@ class Result(models.Model):
         verbose_name_plural = 'Results'
         indexes = [
             models.Index(fields=['student', 'exam']),
+            # Result browser: exam/subject/status filters, newest first
+            models.Index(fields=['exam', 'subject', 'status', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
         ]
     
     def __str__(self):
@@ -103,24 +221,13 @@ class Result(models.Model):
     
     @property
     def is_pass(self):
-        """Check if student passed"""
-        return self.marks_obtained >= self.subject.pass_mark
+        """Whether the percentage reaches the subject's pass percentage"""
+        return self.percentage >= pass_percentage(self.subject)
     
     def calculate_grade(self):
-        """Auto-calculate grade based on percentage"""
-        pct = self.percentage
-        if pct >= 80:
-            return 'A'
-        elif pct >= 70:
-            return 'B'
-        elif pct >= 60:
-            return 'C'
-        elif pct >= 50:
-            return 'D'
-        elif pct >= 40:
-            return 'E'
-        else:
-            return 'F'
+        """Auto-calculate grade based on percentage, using the grading scheme of the student's class"""
+        from .grading import scheme_for_result
+        return scheme_for_result(self).grade(self.percentage)
     
     def save(self, *args, **kwargs):
         """Auto-calculate grade before saving"""
@@ -174,6 +281,7 @@ class ReportCard(models.Model):
         self.marks_obtained = sum([r.marks_obtained for r in results])
         if self.total_marks > 0:
             self.percentage = (float(self.marks_obtained) / float(self.total_marks)) * 100
+            self.overall_grade = self.grading_scheme().grade(self.percentage)
         
         # Calculate GPA for university level (4.0 scale)
         if self.student.class_assigned and self.student.class_assigned.level == 'UNIVERSITY':
@@ -181,34 +289,87 @@ class ReportCard(models.Model):
         
         self.save()
     
+    def totals_match(self, results):
+        """Check stored totals against already loaded results without querying"""
+        counted = [r for r in results if not r.is_absent]
+        return (
+            self.total_marks == sum(r.max_marks for r in counted)
+            and self.marks_obtained == sum(r.marks_obtained for r in counted)
+        )
+    
+    def grading_scheme(self):
+        """Compiled grading scheme for this student's class level and the exam's academic year"""
+        from .grading import scheme_for
+        class_room = self.student.class_assigned
+        return scheme_for(class_room.level if class_room else '', self.exam.academic_year_id)
+    
     def calculate_gpa(self, results):
         """Calculate GPA on a 4.0 scale for university level"""
         if not results:
             return 0.0
         
+        scheme = self.grading_scheme()
         total_credit_points = 0
         total_credits = 0
         
         for result in results:
-            # Assume each subject has equal credits (can be customized)
-            credits = 3  # Default credit hours
-            percentage = result.percentage
-            
-            # Convert percentage to grade points (4.0 scale)
-            if percentage >= 80:
-                grade_point = 4.0
-            elif percentage >= 70:
-                grade_point = 3.5
-            elif percentage >= 60:
-                grade_point = 3.0
-            elif percentage >= 50:
-                grade_point = 2.5
-            elif percentage >= 40:
-                grade_point = 2.0
-            else:
-                grade_point = 0.0
+            # Every subject carries the scheme's credit weight
+            credits = scheme.credits
+            grade_point = scheme.point(result.percentage)
             
             total_credit_points += (grade_point * credits)
             total_credits += credits
         
         return round(total_credit_points / total_credits, 2) if total_credits > 0 else 0.0
+
+
+class ReportCardExport(models.Model):
+    """
+    Background export of an exam's report cards (or one class's) into one
+    merged PDF or ZIP. Progress is kept on the row so any application
+    process can report it.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+    FORMAT_CHOICES = [
+        ('pdf', 'Merged PDF'),
+        ('zip', 'ZIP of PDFs'),
+    ]
+    
+    job_id = models.UUIDField(unique=True, editable=False)
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='report_card_exports')
+    class_room = models.ForeignKey(
+        ClassRoom,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='report_card_exports'
+    )
+    output_format = models.CharField(max_length=3, choices=FORMAT_CHOICES, default='pdf')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    done = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    file_path = models.CharField(max_length=500, blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_card_exports'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Report Card Export'
+        verbose_name_plural = 'Report Card Exports'
+    
+    def __str__(self):
+        scope = f" - {self.class_room}" if self.class_room_id else ''
+        return f"{self.exam}{scope} ({self.get_status_display()})"
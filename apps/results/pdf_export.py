@@ -0,0 +1,290 @@
+"""
+Batch Report Card PDF Export
+Renders report cards for a whole exam in a process pool and packs them
+into one merged PDF or a ZIP archive
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from PyPDF2 import PdfReader, PdfWriter
+from apps.config.models import SchoolInfo
+from .generation import exam_class_rooms, generate_report_cards
+from .models import Result, ReportCard, ReportCardExport
+from .pdf_worker import render_pdf
+from .ranking import rank_class, ranking_is_stale
+from .report_cache import report_card_digest, get_artifact, store_artifact
+
+logger = logging.getLogger('django')
+
+PDF_TEMPLATE = 'results/report_card_pdf.html'
+EXPORT_FORMATS = ('pdf', 'zip')
+
+
+def school_info_context():
+    """School details and headmaster shared by every report card template"""
+    school_info_obj = SchoolInfo.objects.select_related('headmaster__user').order_by('-updated_at').first()
+    school_info = {
+        'name': school_info_obj.name if school_info_obj else '',
+        'address': school_info_obj.address if school_info_obj else '',
+        'phone': school_info_obj.phone if school_info_obj else '',
+        'email': school_info_obj.email if school_info_obj else '',
+        'motto': school_info_obj.motto if school_info_obj else '',
+        'logo': school_info_obj.logo if school_info_obj and school_info_obj.logo else None,
+        'updated_at': school_info_obj.updated_at if school_info_obj else None,
+    }
+    headmaster = school_info_obj.headmaster if school_info_obj and school_info_obj.headmaster else None
+    return school_info, headmaster
+
+
+def report_card_filename(student, exam):
+    return f"report_card_{student.admission_number}_{exam.name}.pdf"
+
+
+def _class_documents(exam, class_room, school_info, headmaster, refreshed=False):
+    students = list(class_room.students.select_related('user').order_by('admission_number'))
+    report_cards = {rc.student_id: rc for rc in ReportCard.objects.filter(exam=exam, student__class_assigned=class_room)}
+    results_by_student = {}
+    for result in Result.objects.filter(exam=exam, student__class_assigned=class_room).select_related('subject').order_by('subject__name'):
+        results_by_student.setdefault(result.student_id, []).append(result)
+
+    # Fill in missing report cards or stale ranks once for the whole class
+    if not refreshed:
+        if len(report_cards) < len(students):
+            generate_report_cards(exam, class_room)
+            return _class_documents(exam, class_room, school_info, headmaster, refreshed=True)
+        if any(ranking_is_stale(rc, results_by_student.get(student_id, [])) for student_id, rc in report_cards.items()):
+            rank_class(exam, class_room)
+            return _class_documents(exam, class_room, school_info, headmaster, refreshed=True)
+
+    class_teacher = class_room.class_teacher
+    documents = []
+    for student in students:
+        student.class_assigned = class_room
+        results = results_by_student.get(student.id, [])
+        report_card = report_cards.get(student.id)
+        digest = report_card_digest(
+            PDF_TEMPLATE, student, exam, report_card, results, school_info['updated_at'], class_teacher
+        )
+        document = {
+            'filename': report_card_filename(student, exam),
+            'student_id': student.id,
+            'exam_id': exam.id,
+            'digest': digest,
+            'pdf': get_artifact(student.id, exam.id, 'pdf', digest),
+            'html': None,
+        }
+        if document['pdf'] is None:
+            context = {
+                'student': student,
+                'exam': exam,
+                'report_card': report_card,
+                'results': results,
+                'school_info': school_info,
+                'headmaster': headmaster,
+                'class_teacher': class_teacher,
+            }
+            document['html'] = render_to_string(PDF_TEMPLATE, context)
+        documents.append(document)
+    return documents
+
+
+def build_report_card_documents(exam, class_room=None):
+    """
+    Prepare report cards for every student sitting an exam (or one class).
+    Database work stays in this process. Each document carries its cached PDF,
+    or the rendered HTML when the artifact cache has no current copy.
+    """
+    if class_room is not None:
+        class_rooms = [class_room]
+    else:
+        class_rooms = exam_class_rooms(exam).select_related('class_teacher__user').order_by('level', 'name', 'stream')
+    school_info, headmaster = school_info_context()
+    documents = []
+    for room in class_rooms:
+        documents.extend(_class_documents(exam, room, school_info, headmaster))
+    return documents
+
+
+def get_worker_count(workers=None):
+    return workers or getattr(settings, 'REPORT_PDF_WORKERS', 0) or os.cpu_count() or 1
+
+
+def render_documents(documents, workers=None, progress=None):
+    """
+    Render documents to PDF in a process pool, skipping those already cached.
+    Yields (filename, pdf_bytes) in the original order and calls
+    progress(done, total) after each document.
+    """
+    workers = get_worker_count(workers)
+    total = len(documents)
+    htmls = [document['html'] for document in documents if document['pdf'] is None]
+
+    if workers <= 1 or len(htmls) <= 1:
+        pdfs = map(render_pdf, htmls)
+        executor = None
+    else:
+        # spawn keeps worker processes clear of the parent's threads and DB connections
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        pdfs = executor.map(render_pdf, htmls, chunksize=max(1, len(htmls) // (workers * 4)))
+    try:
+        for done, document in enumerate(documents, start=1):
+            pdf = document['pdf']
+            if pdf is None:
+                pdf = next(pdfs)
+                store_artifact(document['student_id'], document['exam_id'], 'pdf', document['digest'], pdf)
+            if progress:
+                progress(done, total)
+            yield document['filename'], pdf
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def write_export(rendered, output_format, dest):
+    """Write rendered (filename, pdf_bytes) pairs to dest as one merged PDF or a ZIP"""
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{output_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    count = 0
+    if output_format == 'zip':
+        with zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename, pdf in rendered:
+                archive.writestr(filename, pdf)
+                count += 1
+    else:
+        writer = PdfWriter()
+        for filename, pdf in rendered:
+            writer.append(PdfReader(BytesIO(pdf)))
+            count += 1
+        writer.write(dest)
+    return count
+
+
+def export_report_cards(exam, dest, class_room=None, output_format='pdf', workers=None, progress=None):
+    """Render every report card for an exam (or one class) into dest. Returns the number exported."""
+    documents = build_report_card_documents(exam, class_room)
+    return write_export(render_documents(documents, workers, progress), output_format, dest)
+
+
+# Background export jobs for the web UI. Each job is a ReportCardExport row,
+# so any process can report its progress. It runs on a Celery worker when
+# REPORT_EXPORT_BACKEND = 'celery' and in a thread of this process otherwise.
+
+EXPORT_BACKEND_THREAD = 'thread'
+EXPORT_BACKEND_CELERY = 'celery'
+# An unfinished export with no progress for this long died with its process
+EXPORT_STALE_AFTER = timedelta(minutes=30)
+PROGRESS_INTERVAL = 1  # seconds between progress writes
+
+
+def get_export_retention():
+    return timedelta(hours=getattr(settings, 'REPORT_EXPORT_RETENTION_HOURS', 24))
+
+
+def get_export_job(job_id):
+    """The ReportCardExport for a job id, or None. An export abandoned by a stopped process is marked failed."""
+    try:
+        export = ReportCardExport.objects.get(job_id=job_id)
+    except (ReportCardExport.DoesNotExist, ValidationError):
+        return None
+    if export.status in ('QUEUED', 'RUNNING') and export.updated_at < timezone.now() - EXPORT_STALE_AFTER:
+        export.status = 'FAILED'
+        export.error = 'The export stopped before finishing. Please start it again.'
+        export.save(update_fields=['status', 'error', 'updated_at'])
+    return export
+
+
+def _update_export(export_id, **values):
+    ReportCardExport.objects.filter(pk=export_id).update(updated_at=timezone.now(), **values)
+
+
+def run_export_job(export_id):
+    """Render a queued export into its file, recording progress on the row"""
+    export = ReportCardExport.objects.select_related('exam', 'class_room').get(pk=export_id)
+    last_write = [0.0]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if done == total or now - last_write[0] >= PROGRESS_INTERVAL:
+            last_write[0] = now
+            _update_export(export_id, done=done, total=total)
+
+    try:
+        _update_export(export_id, status='RUNNING')
+        os.makedirs(os.path.dirname(export.file_path), exist_ok=True)
+        with open(export.file_path, 'wb') as dest:
+            count = export_report_cards(export.exam, dest, export.class_room, export.output_format, progress=progress)
+        _update_export(export_id, status='COMPLETED', done=count, total=count)
+    except Exception as e:
+        logger.error(f"Report card export {export.job_id.hex} failed: {e}", exc_info=True)
+        _update_export(export_id, status='FAILED', error=str(e))
+        _remove_file(export.file_path)
+
+
+def _run_in_thread(export_id):
+    try:
+        run_export_job(export_id)
+    finally:
+        connection.close()
+
+
+def _start_thread(export_id):
+    threading.Thread(target=_run_in_thread, args=(export_id,), daemon=True).start()
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def purge_old_exports():
+    """Delete exports untouched for longer than REPORT_EXPORT_RETENTION_HOURS, with their files"""
+    old = list(ReportCardExport.objects.filter(
+        updated_at__lt=timezone.now() - get_export_retention()
+    ).values_list('pk', 'file_path'))
+    for pk, path in old:
+        if path:
+            _remove_file(path)
+    ReportCardExport.objects.filter(pk__in=[pk for pk, path in old]).delete()
+    return len(old)
+
+
+def start_export_job(exam, class_room=None, output_format='pdf', requested_by=None):
+    """Queue a background export and return its job id"""
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{output_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    purge_old_exports()
+    job_id = uuid.uuid4()
+    suffix = f'_{class_room.pk}' if class_room else ''
+    path = os.path.join(settings.MEDIA_ROOT, 'exports', f'report_cards_{exam.pk}{suffix}_{job_id.hex}.{output_format}')
+    export = ReportCardExport.objects.create(
+        job_id=job_id, exam=exam, class_room=class_room, output_format=output_format,
+        file_path=path, requested_by=requested_by,
+    )
+
+    if getattr(settings, 'REPORT_EXPORT_BACKEND', EXPORT_BACKEND_THREAD) == EXPORT_BACKEND_CELERY:
+        def enqueue():
+            try:
+                from .tasks import export_report_cards_task
+                export_report_cards_task.delay(export.pk)
+            except Exception as e:
+                logger.warning(f"Could not queue report card export, running in-process: {e}")
+                _start_thread(export.pk)
+
+        transaction.on_commit(enqueue)
+    else:
+        transaction.on_commit(lambda: _start_thread(export.pk))
+    return job_id.hex
@@ -0,0 +1,15 @@
+"""
+PDF rendering worker
+Kept free of Django model imports so it can run in spawned worker processes
+"""
+from io import BytesIO
+from xhtml2pdf import pisa
+
+
+def render_pdf(html):
+    """Render an HTML document to PDF bytes. Raises ValueError if xhtml2pdf reports errors."""
+    buffer = BytesIO()
+    status = pisa.CreatePDF(html, dest=buffer)
+    if status.err:
+        raise ValueError('Error generating PDF')
+    return buffer.getvalue()
@@ -0,0 +1,98 @@
+"""
+Report Processing Progress
+Expected versus entered results per (class, subject) and report cards
+generated per class for an exam, from one schedule query and three grouped
+counts however many classes sit it. Cached per exam; only creating or
+deleting rows changes the counts, so edits to marks already entered leave
+the cache alone.
+"""
+from django.db.models import Count
+from apps.exams.models import ExamSchedule
+from apps.students.models import Student
+from config.cache import VersionedCache
+from .models import Result, ReportCard
+
+PROGRESS_CACHE = VersionedCache('results:progress', 'REPORT_PROGRESS_CACHE_TTL', 300)
+
+
+def invalidate_exam_progress(exam_id):
+    """Recount an exam's progress on next read"""
+    PROGRESS_CACHE.invalidate(scope=exam_id)
+
+
+def _percentage(done, expected):
+    return round(done * 100 / expected, 1) if expected else 0
+
+
+def compute_exam_progress(exam):
+    """
+    One dict per class scheduled for the exam, ordered by class name:
+    class_id, name, stream, students, report_cards, expected, entered,
+    percentage and a 'subjects' list with each subject's expected and
+    entered results. Every student of a class is expected to sit each of
+    its scheduled subjects; results for unscheduled subjects are ignored.
+    """
+    schedules = ExamSchedule.objects.filter(exam=exam).order_by(
+        'class_room__name', 'class_room__stream', 'subject__name'
+    ).values_list('class_room_id', 'class_room__name', 'class_room__stream', 'subject_id', 'subject__name').distinct()
+    classes = {}
+    for class_id, name, stream, subject_id, subject_name in schedules:
+        entry = classes.setdefault(class_id, {'class_id': class_id, 'name': name, 'stream': stream, 'subjects': {}})
+        entry['subjects'][subject_id] = {'subject_id': subject_id, 'name': subject_name}
+    if not classes:
+        return []
+
+    students = dict(Student.objects.filter(class_assigned_id__in=classes).order_by().values(
+        'class_assigned_id'
+    ).annotate(count=Count('id')).values_list('class_assigned_id', 'count'))
+    entered = {
+        (class_id, subject_id): count
+        for class_id, subject_id, count in Result.objects.filter(
+            exam=exam, student__class_assigned_id__in=classes
+        ).order_by().values('student__class_assigned_id', 'subject_id').annotate(
+            count=Count('id')
+        ).values_list('student__class_assigned_id', 'subject_id', 'count')
+    }
+    report_cards = dict(ReportCard.objects.filter(exam=exam, student__class_assigned_id__in=classes).order_by().values(
+        'student__class_assigned_id'
+    ).annotate(count=Count('id')).values_list('student__class_assigned_id', 'count'))
+
+    progress = []
+    for class_id, entry in classes.items():
+        size = students.get(class_id, 0)
+        subjects = []
+        for subject_id, subject in entry['subjects'].items():
+            done = min(entered.get((class_id, subject_id), 0), size)
+            subjects.append({**subject, 'expected': size, 'entered': done, 'percentage': _percentage(done, size)})
+        expected = size * len(subjects)
+        done = sum(subject['entered'] for subject in subjects)
+        progress.append({
+            **entry,
+            'students': size,
+            'subjects': subjects,
+            'report_cards': report_cards.get(class_id, 0),
+            'expected': expected,
+            'entered': done,
+            'pending': expected - done,
+            'percentage': _percentage(done, expected),
+        })
+    return progress
+
+
+def get_exam_progress(exam):
+    """Cached compute_exam_progress(exam)"""
+    return PROGRESS_CACHE.get_or_build(lambda: compute_exam_progress(exam), scope=exam.pk)
+
+
+def progress_totals(progress):
+    """Exam-wide figures for a list of class progress dicts"""
+    expected = sum(entry['expected'] for entry in progress)
+    entered = sum(entry['entered'] for entry in progress)
+    return {
+        'classes': len(progress),
+        'expected': expected,
+        'entered': entered,
+        'pending': expected - entered,
+        'percentage': _percentage(entered, expected),
+        'report_cards': sum(entry['report_cards'] for entry in progress),
+    }
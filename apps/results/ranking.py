@@ -0,0 +1,193 @@
+"""
+Class Ranking Engine
+Computes overall class positions and per-subject ranks for a whole
+(exam, class) in one pass and stores them on Result and ReportCard rows
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, FloatField, Sum, Window
+from django.db.models.functions import Cast, DenseRank, Rank
+from .models import Result, ReportCard
+
+
+RANKING_COMPETITION = 'competition'
+RANKING_DENSE = 'dense'
+RANKING_METHODS = (RANKING_COMPETITION, RANKING_DENSE)
+
+
+def get_ranking_method(method=None):
+    """Return the tie handling method, falling back to settings.RESULT_RANKING_METHOD"""
+    method = method or getattr(settings, 'RESULT_RANKING_METHOD', RANKING_COMPETITION)
+    if method not in RANKING_METHODS:
+        raise ValueError(f"Unknown ranking method '{method}'. Use one of: {', '.join(RANKING_METHODS)}")
+    return method
+
+
+def rank_scores(scores, method=RANKING_COMPETITION):
+    """
+    Rank a mapping of key -> score (highest first).
+    Competition ranking gives 1, 2, 2, 4; dense ranking gives 1, 2, 2, 3.
+    """
+    ranks = {}
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    previous_score = None
+    current_rank = 0
+    for index, (key, score) in enumerate(ordered, start=1):
+        if score != previous_score:
+            current_rank = index if method == RANKING_COMPETITION else current_rank + 1
+            previous_score = score
+        ranks[key] = current_rank
+    return ranks
+
+
+def _supports_window_functions():
+    return connection.features.supports_over_clause
+
+
+def _class_results(exam, class_room):
+    return Result.objects.filter(
+        exam=exam,
+        student__class_assigned=class_room,
+        is_absent=False,
+    ).order_by()
+
+
+def _subject_ranks_sql(results, method):
+    """Per-subject ranks using window functions: {result_id: (rank, total)}"""
+    rank_function = Rank() if method == RANKING_COMPETITION else DenseRank()
+    rows = results.annotate(
+        position=Window(
+            expression=rank_function,
+            partition_by=[F('subject_id')],
+            order_by=Cast('marks_obtained', FloatField()).desc(),
+        ),
+        out_of=Window(
+            expression=Count('id'),
+            partition_by=[F('subject_id')],
+        ),
+    ).values_list('id', 'position', 'out_of')
+    return {result_id: (position, out_of) for result_id, position, out_of in rows}
+
+
+def _overall_positions_sql(results, method):
+    """Overall class positions from aggregated marks: {student_id: (position, percentage, obtained, possible)}"""
+    rank_function = Rank() if method == RANKING_COMPETITION else DenseRank()
+    percentage = Cast(Sum('marks_obtained'), FloatField()) * 100 / Cast(Sum('max_marks'), FloatField())
+    rows = results.filter(max_marks__gt=0).values('student_id').annotate(
+        obtained=Sum('marks_obtained'),
+        possible=Sum('max_marks'),
+        pct=percentage,
+        position=Window(expression=rank_function, order_by=percentage.desc()),
+    ).values_list('student_id', 'position', 'pct', 'obtained', 'possible')
+    return {
+        student_id: (position, pct, obtained, possible)
+        for student_id, position, pct, obtained, possible in rows
+    }
+
+
+def _ranks_python(results, method):
+    """Fallback for databases without window functions: one query, ranked in memory"""
+    subject_scores = {}
+    student_totals = {}
+    for result_id, student_id, subject_id, marks, max_marks in results.values_list(
+        'id', 'student_id', 'subject_id', 'marks_obtained', 'max_marks'
+    ):
+        subject_scores.setdefault(subject_id, {})[result_id] = marks
+        obtained, possible = student_totals.get(student_id, (0, 0))
+        student_totals[student_id] = (obtained + marks, possible + max_marks)
+
+    subject_ranks = {}
+    for scores in subject_scores.values():
+        out_of = len(scores)
+        for result_id, position in rank_scores(scores, method).items():
+            subject_ranks[result_id] = (position, out_of)
+
+    percentages = {
+        student_id: float(obtained) * 100 / possible
+        for student_id, (obtained, possible) in student_totals.items()
+        if possible > 0
+    }
+    overall = {
+        student_id: (position, percentages[student_id], *student_totals[student_id])
+        for student_id, position in rank_scores(percentages, method).items()
+    }
+    return subject_ranks, overall
+
+
+def compute_class_ranking(exam, class_room, method=None):
+    """
+    Compute every per-subject rank and the overall class position for an exam.
+    Returns (subject_ranks, overall) where subject_ranks maps result id to
+    (rank, total) and overall maps student id to
+    (position, percentage, marks_obtained, total_marks).
+    Absent results are not ranked.
+    """
+    method = get_ranking_method(method)
+    results = _class_results(exam, class_room)
+    if _supports_window_functions():
+        return _subject_ranks_sql(results, method), _overall_positions_sql(results, method)
+    return _ranks_python(results, method)
+
+
+@transaction.atomic
+def rank_class(exam, class_room, method=None):
+    """
+    Compute and store rankings for an (exam, class).
+    Ranks go to Result.subject_position/subject_class_size and positions to
+    ReportCard.class_position/rank, so report card views read them directly.
+    """
+    subject_ranks, overall = compute_class_ranking(exam, class_room, method)
+
+    results = list(
+        Result.objects.filter(exam=exam, student__class_assigned=class_room)
+        .only('id', 'subject_position', 'subject_class_size')
+    )
+    for result in results:
+        result.subject_position, result.subject_class_size = subject_ranks.get(result.id, (None, None))
+    Result.objects.bulk_update(results, ['subject_position', 'subject_class_size'], batch_size=500)
+
+    report_cards = {
+        rc.student_id: rc
+        for rc in ReportCard.objects.filter(exam=exam, student__class_assigned=class_room)
+    }
+    to_create = []
+    for student_id, (position, pct, obtained, possible) in overall.items():
+        report_card = report_cards.get(student_id)
+        if report_card is None:
+            to_create.append(ReportCard(
+                student_id=student_id,
+                exam=exam,
+                total_marks=possible,
+                marks_obtained=obtained,
+                percentage=round(pct, 2),
+                class_position=position,
+                rank=position,
+            ))
+        else:
+            report_card.class_position = position
+            report_card.rank = position
+    for student_id, report_card in report_cards.items():
+        if student_id not in overall:
+            report_card.class_position = None
+            report_card.rank = None
+    ReportCard.objects.bulk_update(report_cards.values(), ['class_position', 'rank'], batch_size=500)
+    ReportCard.objects.bulk_create(to_create, batch_size=500)
+    return subject_ranks, overall
+
+
+def invalidate_class_ranking(exam, class_room):
+    """Clear stored ranks after marks change; they are recomputed on next read"""
+    Result.objects.filter(exam=exam, student__class_assigned=class_room).update(
+        subject_position=None, subject_class_size=None
+    )
+    ReportCard.objects.filter(exam=exam, student__class_assigned=class_room).update(
+        class_position=None, rank=None
+    )
+
+
+def ranking_is_stale(report_card, results):
+    """True if the stored ranks for this report card need recomputing"""
+    ranked = [r for r in results if not r.is_absent]
+    if not ranked:
+        return False
+    return report_card.class_position is None or any(r.subject_position is None for r in ranked)
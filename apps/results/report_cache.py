@@ -0,0 +1,207 @@
+"""
+Report Card Artifact Cache
+Stores rendered report cards keyed by a hash of everything that goes into
+them, so unchanged report cards are served without re-rendering
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+
+
+ARTIFACT_KINDS = ('pdf', 'html')
+# Seconds between full scans of the disk store; other processes' writes only show up in a scan
+DISK_RESCAN_INTERVAL = 60
+
+RESULT_HASH_FIELDS = (
+    'id', 'subject_id', 'marks_obtained', 'max_marks', 'grade', 'is_absent', 'remarks',
+    'status', 'subject_position', 'subject_class_size', 'updated_at',
+)
+REPORT_CARD_HASH_FIELDS = (
+    'total_marks', 'marks_obtained', 'percentage', 'overall_grade', 'gpa', 'rank', 'class_position',
+    'remarks', 'teacher_comment', 'principal_comment', 'attendance_days', 'total_school_days',
+)
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name):
+    """Short hash of a template's source; changes whenever the template is edited and redeployed"""
+    template = get_template(template_name)
+    source = getattr(getattr(template, 'template', template), 'source', '')
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+
+
+def report_card_digest(template_name, student, exam, report_card, results, school_info_updated_at, class_teacher=None):
+    """Content hash of a report card: its results, the ReportCard row, school info and template version"""
+    digest = hashlib.sha256()
+
+    def feed(*values):
+        digest.update('|'.join(str(v) for v in values).encode('utf-8'))
+        digest.update(b'\n')
+
+    feed('template', template_name, template_version(template_name))
+    feed('school', school_info_updated_at)
+    feed('student', student.pk, student.admission_number, student.user.get_full_name(), student.class_assigned_id)
+    feed('exam', exam.pk, exam.name, exam.start_date)
+    feed('class_teacher', class_teacher.pk if class_teacher else '')
+    feed('report_card', *(getattr(report_card, field) for field in REPORT_CARD_HASH_FIELDS))
+    for result in sorted(results, key=lambda r: r.pk):
+        feed('result', *(getattr(result, field) for field in RESULT_HASH_FIELDS))
+    return digest.hexdigest()
+
+
+class DiskArtifactStore:
+    """
+    Artifacts as files under <root>/<exam>/<student>/<kind>-<digest>.
+    Reads refresh the file's mtime and writes evict least recently used files
+    once the directory grows past max_size bytes. The size is tracked per
+    process between periodic scans, so a write does not walk the whole tree.
+    """
+
+    def __init__(self, root, max_size):
+        self.root = Path(root)
+        self.max_size = max_size
+        self._size = None
+        self._scanned_at = 0.0
+
+    def _dir(self, student_id, exam_id):
+        return self.root / str(exam_id) / str(student_id)
+
+    def get(self, student_id, exam_id, kind, digest):
+        path = self._dir(student_id, exam_id) / f'{kind}-{digest}'
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def set(self, student_id, exam_id, kind, digest, data):
+        directory = self._dir(student_id, exam_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        replaced = 0
+        for old in directory.glob(f'{kind}-*'):
+            try:
+                replaced += old.stat().st_size
+            except OSError:
+                continue
+            old.unlink(missing_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, directory / f'{kind}-{digest}')
+        self._written(len(data) - replaced)
+
+    def _written(self, delta):
+        if not self.max_size:
+            return
+        if self._size is None or time.monotonic() - self._scanned_at > DISK_RESCAN_INTERVAL:
+            self.enforce_size_cap()
+            return
+        self._size += delta
+        if self._size > self.max_size:
+            self.enforce_size_cap()
+
+    def invalidate(self, student_id, exam_id):
+        shutil.rmtree(self._dir(student_id, exam_id), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._size = 0
+
+    def enforce_size_cap(self):
+        """Scan the store and evict least recently used artifacts until it is back under 90% of max_size"""
+        if not self.max_size:
+            return
+        files = []
+        total = 0
+        for path in self.root.glob('*/*/*-*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total > self.max_size:
+            target = self.max_size * 0.9
+            for mtime, size, path in sorted(files):
+                path.unlink(missing_ok=True)
+                total -= size
+                if total <= target:
+                    break
+        self._size = total
+        self._scanned_at = time.monotonic()
+
+
+class CacheArtifactStore:
+    """
+    Artifacts in a Django cache backend, one entry per (exam, student, kind).
+    Size capping and LRU eviction are left to the backend (e.g. MAX_ENTRIES
+    for locmem/file caches, maxmemory-policy allkeys-lru for Redis).
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, student_id, exam_id, kind):
+        return f'report_card_artifact:{exam_id}:{student_id}:{kind}'
+
+    def get(self, student_id, exam_id, kind, digest):
+        value = self.cache.get(self._key(student_id, exam_id, kind))
+        if value and value[0] == digest:
+            return value[1]
+        return None
+
+    def set(self, student_id, exam_id, kind, digest, data):
+        self.cache.set(self._key(student_id, exam_id, kind), (digest, data), None)
+
+    def invalidate(self, student_id, exam_id):
+        self.cache.delete_many([self._key(student_id, exam_id, kind) for kind in ARTIFACT_KINDS])
+
+    def clear(self):
+        self.cache.clear()
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    """Configured artifact store, or None when REPORT_CARD_CACHE is 'none'"""
+    backend = getattr(settings, 'REPORT_CARD_CACHE', 'disk')
+    if not backend or backend == 'none':
+        return None
+    if backend == 'disk':
+        return DiskArtifactStore(
+            getattr(settings, 'REPORT_CARD_CACHE_DIR', Path(settings.BASE_DIR) / 'cache' / 'report_cards'),
+            getattr(settings, 'REPORT_CARD_CACHE_MAX_SIZE', 512 * 1024 * 1024),
+        )
+    return CacheArtifactStore(backend)
+
+
+def get_artifact(student_id, exam_id, kind, digest):
+    store = get_store()
+    return store.get(student_id, exam_id, kind, digest) if store else None
+
+
+def store_artifact(student_id, exam_id, kind, digest, data):
+    store = get_store()
+    if store:
+        store.set(student_id, exam_id, kind, digest, data)
+
+
+def invalidate_report_card(student_id, exam_id):
+    """Drop cached artifacts for one student's report card"""
+    store = get_store()
+    if store:
+        store.invalidate(student_id, exam_id)
@@ -0,0 +1,69 @@
+"""
+Signal handlers for Results Management
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from apps.exams.models import Exam, ExamSchedule
+from .models import GradeBoundary, GradingScheme, Result, ReportCard
+from .analytics import invalidate_exam_analytics
+from .grading import invalidate_grading_schemes
+from .progress import invalidate_exam_progress
+from .report_cache import invalidate_report_card
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+@receiver(post_save, sender=ReportCard)
+@receiver(post_delete, sender=ReportCard)
+def invalidate_cached_report_card(sender, instance, **kwargs):
+    """Drop rendered report cards once their results or report card row change"""
+    invalidate_report_card(instance.student_id, instance.exam_id)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def invalidate_cached_exam_analytics(sender, instance, **kwargs):
+    """Recompute the exam's statistics on next read once one of its results changes"""
+    invalidate_exam_analytics(instance.exam_id)
+
+
+@receiver(post_save, sender=GradingScheme)
+@receiver(post_delete, sender=GradingScheme)
+@receiver(post_save, sender=GradeBoundary)
+@receiver(post_delete, sender=GradeBoundary)
+def invalidate_compiled_grading_schemes(sender, instance, **kwargs):
+    """Recompile grading schemes on next lookup once a scheme or boundary changes"""
+    invalidate_grading_schemes()
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_save, sender=ReportCard)
+@receiver(post_save, sender=ExamSchedule)
+def recount_exam_progress(sender, instance, created=False, **kwargs):
+    """New results, report cards or schedules change the exam's progress counts; edits do not"""
+    if created or sender is ExamSchedule:
+        invalidate_exam_progress(instance.exam_id)
+
+
+@receiver(post_delete, sender=Result)
+@receiver(post_delete, sender=ReportCard)
+@receiver(post_delete, sender=ExamSchedule)
+def recount_exam_progress_on_delete(sender, instance, **kwargs):
+    invalidate_exam_progress(instance.exam_id)
+
+
+@receiver(pre_save, sender=Exam)
+def remember_exam_publication(sender, instance, **kwargs):
+    instance._was_published = bool(instance.pk) and Exam.objects.filter(pk=instance.pk, is_published=True).exists()
+
+
+@receiver(post_save, sender=Exam)
+def touch_published_results(sender, instance, **kwargs):
+    """
+    Students and parents only sync results of published exams, so mark the
+    exam's results changed once it is published for the sync feed to send
+    them to devices that have already pulled past them
+    """
+    if instance.is_published and not getattr(instance, '_was_published', False):
+        Result.objects.filter(exam=instance).update(updated_at=timezone.now())
@@ -0,0 +1,11 @@
+"""
+Celery tasks for Results
+"""
+from celery import shared_task
+from .pdf_export import run_export_job
+
+
+@shared_task(ignore_result=True)
+def export_report_cards_task(export_id):
+    """Background rendering for start_export_job"""
+    run_export_job(export_id)
@@ -12,9 +12,15 @@ urlpatterns = [
     
     # Report Processing Dashboard
     path('processing/<int:exam_id>/', views.report_processing_view, name='report_processing'),
+    path('processing/<int:exam_id>/progress/', views.report_processing_progress_view, name='report_processing_progress'),
+    
+    # Exam Analytics
+    path('analytics/<int:exam_id>/', views.exam_analytics_view, name='exam_analytics'),
+    path('analytics/<int:exam_id>/data/', views.exam_analytics_data_view, name='exam_analytics_data'),
     
     # Result Entry
     path('enter/<int:exam_id>/<int:class_id>/', views.enter_results_view, name='enter_results'),
+    path('enter/<int:exam_id>/<int:class_id>/data/', views.marksheet_data_view, name='marksheet_data'),
     path('save/<int:exam_id>/<int:class_id>/', views.save_results_view, name='save_results'),
     
     # Report Generation
@@ -40,4 +46,9 @@ urlpatterns = [
     
     # Bulk Print
     path('bulk-print/<int:exam_id>/<int:class_id>/', views.bulk_print_reports_view, name='bulk_print'),
+    
+    # Batch PDF Export
+    path('export/<int:exam_id>/', views.export_report_cards_view, name='export_report_cards'),
+    path('export/status/<str:job_id>/', views.export_report_cards_status_view, name='export_report_cards_status'),
+    path('export/download/<str:job_id>/', views.export_report_cards_download_view, name='export_report_cards_download'),
 ]
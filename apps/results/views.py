@@ -1,86 +1,83 @@
 from django.template.loader import render_to_string
-from django.http import HttpResponse, JsonResponse
-from xhtml2pdf import pisa
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_POST
-from django.db.models import Count, Avg, Sum, Q
+from django.db.models import Count, Sum, Q
 from apps.accounts.decorators import teacher_required, admin_required
 from .models import Result, ReportCard
+from .ranking import rank_class, invalidate_class_ranking, ranking_is_stale
+from .analytics import get_exam_analytics
+from .browser import filter_results, keyset_page, result_statistics
+from .generation import generate_report_cards
+from .progress import get_exam_progress, progress_totals
+from .ingestion import save_marksheet
+from .marksheet import allowed_class_ids, can_enter_results, load_marksheet
+from .pdf_export import (
+    EXPORT_FORMATS, PDF_TEMPLATE, school_info_context, report_card_filename, start_export_job, get_export_job
+)
+from .pdf_worker import render_pdf
+from .report_cache import report_card_digest, get_artifact, store_artifact
 from apps.accounts.models import User
 from apps.students.models import Student
-from apps.exams.models import Exam, ExamSchedule
+from apps.exams.models import Exam
 from apps.classes.models import ClassRoom, Subject
-from apps.notifications.models import Notification
+from apps.notifications.fanout import send_notifications
 from apps.parents.models import Parent
+from django.urls import reverse
 import json
+import os
 
 # PDF report card view (xhtml2pdf)
 @login_required
 def report_card_pdf(request, student_id, exam_id):
-    student = get_object_or_404(Student, pk=student_id)
+    student = get_object_or_404(Student.objects.select_related('user', 'class_assigned__class_teacher__user'), pk=student_id)
     exam = get_object_or_404(Exam, pk=exam_id)
-    report_card, _ = ReportCard.objects.get_or_create(student=student, exam=exam)
-    report_card.calculate_totals()
-    results = Result.objects.filter(student=student, exam=exam).order_by('subject__name')
+    report_card, created = ReportCard.objects.get_or_create(student=student, exam=exam)
+    results = list(Result.objects.filter(student=student, exam=exam).select_related('subject').order_by('subject__name'))
+    # Only recompute totals when they no longer match the results
+    if created or request.GET.get('regenerate') or not report_card.totals_match(results):
+        report_card.calculate_totals()
+    if student.class_assigned and ranking_is_stale(report_card, results):
+        rank_class(exam, student.class_assigned)
+        report_card.refresh_from_db()
+        results = list(Result.objects.filter(student=student, exam=exam).select_related('subject').order_by('subject__name'))
     # School info from DB
-    from apps.config.models import SchoolInfo
-    school_info_obj = SchoolInfo.objects.order_by('-updated_at').first()
-    school_info = {
-        'name': school_info_obj.name if school_info_obj else '',
-        'address': school_info_obj.address if school_info_obj else '',
-        'phone': school_info_obj.phone if school_info_obj else '',
-        'email': school_info_obj.email if school_info_obj else '',
-        'motto': school_info_obj.motto if school_info_obj else '',
-        'logo': school_info_obj.logo if school_info_obj and school_info_obj.logo else None,
-    }
-    headmaster = school_info_obj.headmaster if school_info_obj and school_info_obj.headmaster else None
+    school_info, headmaster = school_info_context()
     class_teacher = student.class_assigned.class_teacher if student.class_assigned and student.class_assigned.class_teacher else None
-    # Per-subject ranking
-    subject_ranks = {}
-    for result in results:
-        subject_results = Result.objects.filter(
-            exam=exam,
-            subject=result.subject,
-            student__class_assigned=student.class_assigned
-        ).order_by('-marks_obtained')
-        rank = None
-        for idx, r in enumerate(subject_results, start=1):
-            if r.student_id == student.id:
-                rank = idx
-                break
-        subject_ranks[result.subject.id] = {
-            'rank': rank,
-            'total': subject_results.count()
+
+    # Serve the cached PDF if nothing that goes into it has changed
+    digest = report_card_digest(
+        PDF_TEMPLATE, student, exam, report_card, results, school_info['updated_at'], class_teacher
+    )
+    pdf = get_artifact(student.id, exam.id, 'pdf', digest)
+    if pdf is None:
+        context = {
+            'student': student,
+            'exam': exam,
+            'report_card': report_card,
+            'results': results,
+            'school_info': school_info,
+            'headmaster': headmaster,
+            'class_teacher': class_teacher,
         }
-    context = {
-        'student': student,
-        'exam': exam,
-        'report_card': report_card,
-        'results': results,
-        'school_info': school_info,
-        'headmaster': headmaster,
-        'class_teacher': class_teacher,
-        'subject_ranks': subject_ranks,
-    }
-    html = render_to_string('results/report_card_pdf.html', context)
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="report_card_{student.admission_number}_{exam.name}.pdf"'
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    if pisa_status.err:
-        return HttpResponse('Error generating PDF', status=500)
+        html = render_to_string(PDF_TEMPLATE, context)
+        try:
+            pdf = render_pdf(html)
+        except ValueError:
+            return HttpResponse('Error generating PDF', status=500)
+        store_artifact(student.id, exam.id, 'pdf', digest, pdf)
+
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{report_card_filename(student, exam)}"'
     return response
 
-# Utility: Send notification to user
-def send_result_notification(user, title, message, link=None, notification_type='INFO'):
-    Notification.objects.create(
-        user=user,
-        title=title,
-        message=message,
-        notification_type=notification_type,
-        link=link or ''
-    )
+# Utility: Send notification to one user or a group of users
+def send_result_notification(users, title, message, link=None, notification_type='INFO'):
+    if isinstance(users, User):
+        users = [users]
+    send_notifications(users, title=title, message=message, notification_type=notification_type, link=link)
 
 """
 Views for Results Management
@@ -89,60 +86,51 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
-from django.db.models import Count, Avg, Sum, Q
+from django.db.models import Count, Sum, Q
 from apps.accounts.decorators import teacher_required, admin_required
 from .models import Result, ReportCard
 from apps.students.models import Student
-from apps.exams.models import Exam, ExamSchedule
+from apps.exams.models import Exam
 from apps.classes.models import ClassRoom, Subject
 import json
 
 
 @login_required
 def result_list_view(request):
-    """List all results with filters"""
-    results = Result.objects.select_related('student__user', 'exam', 'subject').all()
-    
-    # Filters
-    exam_id = request.GET.get('exam')
-    class_id = request.GET.get('class')
-    subject_id = request.GET.get('subject')
-    student_id = request.GET.get('student')
-    
-    if exam_id:
-        results = results.filter(exam_id=exam_id)
-    if class_id:
-        results = results.filter(student__class_assigned_id=class_id)
-    if subject_id:
-        results = results.filter(subject_id=subject_id)
-    if student_id:
-        results = results.filter(student_id=student_id)
-    
-    results = results.order_by('-created_at')[:200]  # Limit for performance
+    """List results with filters, a page at a time (newest first)"""
+    results = filter_results(Result.objects.all(), request.GET)
+    
+    # Statistics cover every matching result, not just the page shown
+    statistics = result_statistics(results)
+    page, next_token, previous_token = keyset_page(
+        results.select_related('student__user', 'student__class_assigned', 'exam', 'subject'),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
     
     # Get filter options
     exams = Exam.objects.all().order_by('-start_date')[:10]
     classes = ClassRoom.objects.filter(is_active=True)
     subjects = Subject.objects.filter(is_active=True)
     
-    # Calculate statistics
-    total_results = results.count()
-    avg_score = results.aggregate(avg=Avg('marks_obtained'))['avg'] or 0
-    pass_count = sum(1 for r in results if r.is_pass)
-    pass_rate = (pass_count / total_results * 100) if total_results > 0 else 0
+    filters = request.GET.copy()
+    for param in ('after', 'before'):
+        filters.pop(param, None)
     
     context = {
-        'results': results,
+        'results': page,
         'exams': exams,
         'classes': classes,
         'subjects': subjects,
-        'total_results': total_results,
-        'avg_score': avg_score,
-        'pass_count': pass_count,
-        'pass_rate': pass_rate,
-        'selected_exam': exam_id,
-        'selected_class': class_id,
-        'selected_subject': subject_id,
+        'statuses': Result._meta.get_field('status').choices,
+        **statistics,
+        'next_token': next_token,
+        'previous_token': previous_token,
+        'filter_query': filters.urlencode(),
+        'selected_exam': request.GET.get('exam'),
+        'selected_class': request.GET.get('class'),
+        'selected_subject': request.GET.get('subject'),
+        'selected_status': request.GET.get('status'),
     }
     return render(request, 'results/result_list.html', context)
 
@@ -221,17 +209,17 @@ def result_create_view(request):
 
             result.calculate_grade()
             result.save()
+            if student.class_assigned:
+                invalidate_class_ranking(exam, student.class_assigned)
 
             if action == 'submit':
                 # Notify HOD/Admin for approval
-                admin_users = User.objects.filter(role='ADMIN')
-                for admin in admin_users:
-                    send_result_notification(
-                        admin,
-                        title='Result Submitted for Approval',
-                        message=f'Result for {student.user.get_full_name()} ({subject.name}) has been submitted by {request.user.get_full_name()}.',
-                        link='/results/'
-                    )
+                send_result_notification(
+                    User.objects.filter(role='ADMIN'),
+                    title='Result Submitted for Approval',
+                    message=f'Result for {student.user.get_full_name()} ({subject.name}) has been submitted by {request.user.get_full_name()}.',
+                    link='/results/'
+                )
                 messages.success(request, f'Result submitted for approval for {student.user.get_full_name()}')
             elif created:
                 messages.success(request, f'Result created for {student.user.get_full_name()}')
@@ -293,17 +281,17 @@ def result_update_view(request, pk):
 
             result.calculate_grade()
             result.save()
+            if result.student.class_assigned:
+                invalidate_class_ranking(result.exam, result.student.class_assigned)
 
             if action == 'submit':
                 # Notify HOD/Admin for approval
-                admin_users = User.objects.filter(role='ADMIN')
-                for admin in admin_users:
-                    send_result_notification(
-                        admin,
-                        title='Result Submitted for Approval',
-                        message=f'Result for {result.student.user.get_full_name()} ({result.subject.name}) has been submitted by {request.user.get_full_name()}.',
-                        link='/results/'
-                    )
+                send_result_notification(
+                    User.objects.filter(role='ADMIN'),
+                    title='Result Submitted for Approval',
+                    message=f'Result for {result.student.user.get_full_name()} ({result.subject.name}) has been submitted by {request.user.get_full_name()}.',
+                    link='/results/'
+                )
                 messages.success(request, 'Result submitted for approval')
             elif action == 'approve':
                 # Notify teacher who entered the result
@@ -359,66 +347,60 @@ def student_results_view(request, student_id):
     return render(request, 'results/student_results.html', context)
 
 
+def _visible_progress(request, exam):
+    """Exam progress for the classes this user may process"""
+    progress = get_exam_progress(exam)
+    class_ids = allowed_class_ids(request.user)
+    if class_ids is not None:
+        progress = [entry for entry in progress if entry['class_id'] in class_ids]
+    return progress
+
+
 @login_required
 @teacher_required
 def report_processing_view(request, exam_id):
     """Main report processing dashboard"""
-    exam = get_object_or_404(Exam, pk=exam_id)
-    
-    # Get all exam schedules for this exam
-    schedules = ExamSchedule.objects.filter(exam=exam).select_related('class_room')
-
-    # Restrict to only classes assigned to this teacher (unless admin)
-    if request.user.is_teacher and not request.user.is_admin:
-        teacher = getattr(request.user, 'teacher_profile', None)
-        if teacher:
-            # Classes where teacher is class_teacher
-            class_teacher_ids = set(teacher.classes_as_teacher.values_list('id', flat=True))
-            # Classes where teacher teaches at least one subject
-            subject_class_ids = set(teacher.teaching_subjects.values_list('class_room_id', flat=True))
-            allowed_class_ids = class_teacher_ids.union(subject_class_ids)
-            schedules = schedules.filter(class_room_id__in=allowed_class_ids)
-
-    # Get unique class rooms from filtered schedules
-    class_rooms = {}
-    for schedule in schedules:
-        if schedule.class_room.id not in class_rooms:
-            class_rooms[schedule.class_room.id] = schedule.class_room
-    
-    # Calculate statistics
-    schedule_data = []
-    for class_room in class_rooms.values():
-        total_students = class_room.students.count()
-        total_subjects = ExamSchedule.objects.filter(exam=exam, class_room=class_room).count()
-        
-        # Calculate completion percentage
-        expected_results = total_students * total_subjects
-        actual_results = Result.objects.filter(exam=exam, student__class_assigned=class_room).count()
-        completion_pct = (actual_results / expected_results * 100) if expected_results > 0 else 0
-        
-        schedule_data.append({
-            'class_room': class_room,
-            'subjects': ExamSchedule.objects.filter(exam=exam, class_room=class_room),
-            'completion_percentage': completion_pct
-        })
-    
-    total_classes = len(schedule_data)
-    results_entered = Result.objects.filter(exam=exam).count()
-    total_expected = sum([s['class_room'].students.count() * s['subjects'].count() for s in schedule_data])
-    results_pending = total_expected - results_entered
-    reports_generated = ReportCard.objects.filter(exam=exam).count()
-    
+    exam = get_object_or_404(Exam.objects.select_related('academic_year'), pk=exam_id)
+    progress = _visible_progress(request, exam)
+    totals = progress_totals(progress)
+
     context = {
         'exam': exam,
-        'schedules': schedule_data,
-        'total_classes': total_classes,
-        'results_entered': results_entered,
-        'results_pending': results_pending,
-        'reports_generated': reports_generated,
+        'schedules': progress,
+        'total_classes': totals['classes'],
+        'results_entered': totals['entered'],
+        'results_pending': totals['pending'],
+        'reports_generated': totals['report_cards'],
     }
     return render(request, 'results/report_processing.html', context)
 
 
+@login_required
+@teacher_required
+def report_processing_progress_view(request, exam_id):
+    """JSON of the report processing progress, for refreshing the dashboard during marking"""
+    exam = get_object_or_404(Exam, pk=exam_id)
+    progress = _visible_progress(request, exam)
+    return JsonResponse({'exam': exam.pk, 'totals': progress_totals(progress), 'classes': progress})
+
+
+@login_required
+@teacher_required
+def exam_analytics_view(request, exam_id):
+    """Subject statistics for an exam: exam-wide, per class and per stream"""
+    exam = get_object_or_404(Exam.objects.select_related('academic_year'), pk=exam_id)
+    analytics = get_exam_analytics(exam)
+    return render(request, 'results/exam_analytics.html', {'exam': exam, 'analytics': analytics})
+
+
+@login_required
+@teacher_required
+def exam_analytics_data_view(request, exam_id):
+    """JSON of the exam statistics shown on the analytics page"""
+    exam = get_object_or_404(Exam, pk=exam_id)
+    return JsonResponse(get_exam_analytics(exam))
+
+
 @login_required
 @teacher_required
 def enter_results_view(request, exam_id, class_id):
@@ -426,53 +408,36 @@ def enter_results_view(request, exam_id, class_id):
     exam = get_object_or_404(Exam, pk=exam_id)
     class_room = get_object_or_404(ClassRoom, pk=class_id)
     # Restrict teacher access to only their assigned classes
-    if request.user.is_teacher and not request.user.is_admin:
-        teacher = getattr(request.user, 'teacher_profile', None)
-        if teacher:
-            allowed_class_ids = set(teacher.classes_as_teacher.values_list('id', flat=True)).union(
-                set(teacher.teaching_subjects.values_list('class_room_id', flat=True))
-            )
-            if class_room.id not in allowed_class_ids:
-                messages.error(request, 'You do not have permission to access this class.')
-                return redirect('dashboard')
-    
-    # Get all students in the class
-    students = class_room.students.all().order_by('admission_number')
-    
-    # Get all subjects for this exam and class
-    exam_schedules = ExamSchedule.objects.filter(exam=exam, class_room=class_room)
-    subjects = [schedule.subject for schedule in exam_schedules]
-    
-    # Calculate completion percentage
-    total_expected = students.count() * len(subjects)
-    total_entered = Result.objects.filter(exam=exam, student__in=students).count()
-    completion_percentage = (total_entered / total_expected * 100) if total_expected > 0 else 0
-    
-    # Attach existing results to students
-    for student in students:
-        for subject in subjects:
-            try:
-                result = Result.objects.get(student=student, exam=exam, subject=subject)
-                setattr(student, f'result_marks', result.marks_obtained if not result.is_absent else '')
-                setattr(student, f'result_grade', result.grade)
-                setattr(student, f'result_remarks', result.remarks)
-            except Result.DoesNotExist:
-                pass
+    if not can_enter_results(request.user, class_room):
+        messages.error(request, 'You do not have permission to access this class.')
+        return redirect('dashboard')
     
+    marksheet = load_marksheet(exam, class_room)
     context = {
         'exam': exam,
         'class_room': class_room,
-        'students': students,
-        'subjects': subjects,
-        'completion_percentage': completion_percentage,
+        'marksheet': marksheet,
+        'columns': marksheet.columns(),
+        'completion_percentage': marksheet.completion_percentage,
     }
     return render(request, 'results/enter_results.html', context)
 
 
+@login_required
+@teacher_required
+def marksheet_data_view(request, exam_id, class_id):
+    """JSON form of the result entry grid: students, subjects and a students x subjects matrix of results"""
+    exam = get_object_or_404(Exam, pk=exam_id)
+    class_room = get_object_or_404(ClassRoom, pk=class_id)
+    if not can_enter_results(request.user, class_room):
+        return JsonResponse({'success': False, 'error': 'You do not have permission to access this class.'}, status=403)
+    return JsonResponse(load_marksheet(exam, class_room).as_json())
+
+
 @login_required
 @require_POST
 def save_results_view(request, exam_id, class_id):
-    """Save results via AJAX"""
+    """Save a subject marksheet via AJAX in one transaction"""
     import logging
     logger = logging.getLogger('django')
     try:
@@ -480,46 +445,24 @@ def save_results_view(request, exam_id, class_id):
         class_room = get_object_or_404(ClassRoom, pk=class_id)
 
         # Restrict teacher access to only their assigned classes
-        if request.user.is_teacher and not request.user.is_admin:
-            teacher = getattr(request.user, 'teacher_profile', None)
-            if teacher:
-                allowed_class_ids = set(teacher.classes_as_teacher.values_list('id', flat=True)).union(
-                    set(teacher.teaching_subjects.values_list('class_room_id', flat=True))
-                )
-                if class_room.id not in allowed_class_ids:
-                    logger.warning(f"User {request.user} tried to save results for unassigned class {class_room.id}")
-                    return JsonResponse({'success': False, 'error': 'You do not have permission to save results for this class.'})
+        if not can_enter_results(request.user, class_room):
+            logger.warning(f"User {request.user} tried to save results for unassigned class {class_room.id}")
+            return JsonResponse({'success': False, 'error': 'You do not have permission to save results for this class.'})
 
         data = json.loads(request.body)
-        logger.info(f"Received save results data: {data}")
-        subject_id = data.get('subject')
+        subject = get_object_or_404(Subject, pk=data.get('subject'))
         results_data = data.get('results', [])
 
-        subject = get_object_or_404(Subject, pk=subject_id)
+        report = save_marksheet(exam, class_room, subject, results_data, request.user)
+        if not report['success']:
+            report['error'] = f"{len(report['errors'])} row(s) have errors. Nothing was saved."
+            return JsonResponse(report, status=400)
 
-        for result_data in results_data:
-            student = Student.objects.get(pk=result_data['student'])
-            result, created = Result.objects.get_or_create(
-                student=student,
-                exam=exam,
-                subject=subject,
-                defaults={'entered_by': request.user}
-            )
-            logger.info(f"Result for student {student.id}, subject {subject.id}: created={created}")
-            # Always update all fields and save, even if unchanged
-            result.is_absent = result_data.get('is_absent', False)
-            if not result.is_absent:
-                result.marks_obtained = float(result_data.get('marks', 0))
-                result.grade = result_data.get('grade', '')
-            else:
-                result.marks_obtained = 0
-                result.grade = 'ABS'
-            result.remarks = result_data.get('remarks', '')
-            result.entered_by = request.user
-            result.save(force_update=not created)
-            logger.info(f"Saved result: {result}")
-
-        return JsonResponse({'success': True})
+        logger.info(
+            f"Saved results for exam {exam.id}, class {class_room.id}, subject {subject.id}: "
+            f"{report['created']} created, {report['updated']} updated, {report['skipped']} skipped"
+        )
+        return JsonResponse(report)
 
     except Exception as e:
         logger.error(f"Error saving results: {e}", exc_info=True)
@@ -533,15 +476,9 @@ def generate_reports_view(request, exam_id, class_id):
     exam = get_object_or_404(Exam, pk=exam_id)
     class_room = get_object_or_404(ClassRoom, pk=class_id)
     # Restrict teacher access to only their assigned classes
-    if request.user.is_teacher and not request.user.is_admin:
-        teacher = getattr(request.user, 'teacher_profile', None)
-        if teacher:
-            allowed_class_ids = set(teacher.classes_as_teacher.values_list('id', flat=True)).union(
-                set(teacher.teaching_subjects.values_list('class_room_id', flat=True))
-            )
-            if class_room.id not in allowed_class_ids:
-                messages.error(request, 'You do not have permission to access this class.')
-                return redirect('dashboard')
+    if not can_enter_results(request.user, class_room):
+        messages.error(request, 'You do not have permission to access this class.')
+        return redirect('dashboard')
     
     students = class_room.students.all().order_by('admission_number')
     report_cards = ReportCard.objects.filter(exam=exam, student__in=students)
@@ -570,26 +507,8 @@ def generate_all_reports_view(request, exam_id, class_id):
     exam = get_object_or_404(Exam, pk=exam_id)
     class_room = get_object_or_404(ClassRoom, pk=class_id)
     
-    students = class_room.students.all()
-    count = 0
-    
-    for student in students:
-        report_card, created = ReportCard.objects.get_or_create(
-            student=student,
-            exam=exam
-        )
-        report_card.calculate_totals()
-        count += 1
-    
-    # Calculate class positions
-    report_cards = ReportCard.objects.filter(
-        exam=exam,
-        student__class_assigned=class_room
-    ).order_by('-percentage')
-    
-    for index, report_card in enumerate(report_cards, start=1):
-        report_card.class_position = index
-        report_card.save()
+    # Totals, grades and class positions for the whole class in one transaction
+    count = generate_report_cards(exam, class_room)
     
     messages.success(request, f'Successfully generated {count} report cards with positions!')
     return redirect('results:generate_reports', exam_id=exam_id, class_id=class_id)
@@ -621,18 +540,10 @@ def calculate_ranks_view(request, exam_id, class_id):
     exam = get_object_or_404(Exam, pk=exam_id)
     class_room = get_object_or_404(ClassRoom, pk=class_id)
     
-    # Get all report cards for this class and exam, ordered by percentage
-    report_cards = ReportCard.objects.filter(
-        exam=exam, 
-        student__class_assigned=class_room
-    ).order_by('-percentage')
-    
-    # Assign ranks
-    for index, report_card in enumerate(report_cards, start=1):
-        report_card.rank = index
-        report_card.save()
+    # Rank the whole class in one pass
+    subject_ranks, overall = rank_class(exam, class_room)
     
-    messages.success(request, f'Ranks calculated for {report_cards.count()} students!')
+    messages.success(request, f'Ranks calculated for {len(overall)} students!')
     return redirect('results:generate_reports', exam_id=exam_id, class_id=class_id)
 
 
@@ -650,54 +561,20 @@ def report_card_view(request, student_id, exam_id):
     if created or request.GET.get('regenerate'):
         report_card.calculate_totals()
 
-    results = Result.objects.filter(student=student, exam=exam).order_by('subject__name')
+    results = list(Result.objects.filter(student=student, exam=exam).select_related('subject').order_by('subject__name'))
 
-    # Calculate class position if not set
-    if not report_card.class_position and student.class_assigned:
-        class_reports = ReportCard.objects.filter(
-            exam=exam,
-            student__class_assigned=student.class_assigned
-        ).order_by('-percentage')
-        for index, rc in enumerate(class_reports, start=1):
-            if rc.id == report_card.id:
-                report_card.class_position = index
-                report_card.save()
-                break
+    # Rank the whole class in one pass if stored positions are missing or stale
+    if student.class_assigned and ranking_is_stale(report_card, results):
+        rank_class(exam, student.class_assigned)
+        report_card.refresh_from_db()
+        results = list(Result.objects.filter(student=student, exam=exam).select_related('subject').order_by('subject__name'))
 
     total_students = student.class_assigned.students.count() if student.class_assigned else 1
 
     # School info from DB
-    from apps.config.models import SchoolInfo
-    school_info_obj = SchoolInfo.objects.order_by('-updated_at').first()
-    school_info = {
-        'name': school_info_obj.name if school_info_obj else '',
-        'address': school_info_obj.address if school_info_obj else '',
-        'phone': school_info_obj.phone if school_info_obj else '',
-        'email': school_info_obj.email if school_info_obj else '',
-        'motto': school_info_obj.motto if school_info_obj else '',
-        'logo': school_info_obj.logo if school_info_obj and school_info_obj.logo else None,
-    }
-    headmaster = school_info_obj.headmaster if school_info_obj and school_info_obj.headmaster else None
+    school_info, headmaster = school_info_context()
     class_teacher = student.class_assigned.class_teacher if student.class_assigned and student.class_assigned.class_teacher else None
 
-    # Per-subject ranking
-    subject_ranks = {}
-    for result in results:
-        subject_results = Result.objects.filter(
-            exam=exam,
-            subject=result.subject,
-            student__class_assigned=student.class_assigned
-        ).order_by('-marks_obtained')
-        rank = None
-        for idx, r in enumerate(subject_results, start=1):
-            if r.student_id == student.id:
-                rank = idx
-                break
-        subject_ranks[result.subject.id] = {
-            'rank': rank,
-            'total': subject_results.count()
-        }
-
     # Determine which template to use based on education level
     template_name = 'results/report_card.html'  # Default
     if student.class_assigned:
@@ -718,7 +595,6 @@ def report_card_view(request, student_id, exam_id):
         'school_info': school_info,
         'headmaster': headmaster,
         'class_teacher': class_teacher,
-        'subject_ranks': subject_ranks,
     }
     return render(request, template_name, context)
 
@@ -774,23 +650,25 @@ def bulk_print_reports_view(request, exam_id, class_id):
     exam = get_object_or_404(Exam, pk=exam_id)
     class_room = get_object_or_404(ClassRoom, pk=class_id)
     
-    students = class_room.students.all().order_by('roll_number', 'user__last_name')
+    students = list(class_room.students.select_related('user').order_by('roll_number', 'user__last_name'))
+    
+    # Generate any missing report cards in one batch
+    report_cards = {rc.student_id: rc for rc in ReportCard.objects.filter(exam=exam, student__in=students)}
+    if len(report_cards) < len(students):
+        generate_report_cards(exam, class_room)
+        report_cards = {rc.student_id: rc for rc in ReportCard.objects.filter(exam=exam, student__in=students)}
+    
+    results_by_student = {}
+    for result in Result.objects.filter(exam=exam, student__in=students).select_related('subject').order_by('subject__name'):
+        results_by_student.setdefault(result.student_id, []).append(result)
     
     # Prepare data for all students
     student_reports = []
     for student in students:
-        report_card, created = ReportCard.objects.get_or_create(
-            student=student,
-            exam=exam
-        )
-        if created:
-            report_card.calculate_totals()
-        
-        results = Result.objects.filter(student=student, exam=exam).order_by('subject__name')
         student_reports.append({
             'student': student,
-            'report_card': report_card,
-            'results': results,
+            'report_card': report_cards.get(student.id),
+            'results': results_by_student.get(student.id, []),
         })
     
     # Determine template based on level
@@ -802,7 +680,7 @@ def bulk_print_reports_view(request, exam_id, class_id):
     elif class_room.level == 'UNIVERSITY':
         template_name = 'results/bulk_print_university.html'
     
-    total_students = class_room.students.count()
+    total_students = len(students)
     
     context = {
         'exam': exam,
@@ -811,3 +689,53 @@ def bulk_print_reports_view(request, exam_id, class_id):
         'total_students': total_students,
     }
     return render(request, template_name, context)
+
+
+@login_required
+@admin_required
+@require_POST
+def export_report_cards_view(request, exam_id):
+    """Start a background PDF/ZIP export of every report card for an exam"""
+    exam = get_object_or_404(Exam, pk=exam_id)
+    class_id = request.POST.get('class')
+    class_room = get_object_or_404(ClassRoom, pk=class_id) if class_id else None
+    output_format = request.POST.get('format', 'pdf')
+    if output_format not in EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': f'Unknown format: {output_format}'}, status=400)
+
+    job_id = start_export_job(exam, class_room, output_format, requested_by=request.user)
+    return JsonResponse({
+        'success': True,
+        'job_id': job_id,
+        'status_url': reverse('results:export_report_cards_status', args=[job_id]),
+    })
+
+
+@login_required
+@admin_required
+def export_report_cards_status_view(request, job_id):
+    """Progress of a report card export"""
+    job = get_export_job(job_id)
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Export not found'}, status=404)
+    data = {
+        'success': True,
+        'status': job.status,
+        'done': job.done,
+        'total': job.total,
+        'error': job.error,
+    }
+    if job.status == 'COMPLETED':
+        data['download_url'] = reverse('results:export_report_cards_download', args=[job_id])
+    return JsonResponse(data)
+
+
+@login_required
+@admin_required
+def export_report_cards_download_view(request, job_id):
+    """Download a finished report card export"""
+    job = get_export_job(job_id)
+    if not job or job.status != 'COMPLETED' or not os.path.exists(job.file_path):
+        raise Http404('Export not ready')
+    content_type = 'application/zip' if job.output_format == 'zip' else 'application/pdf'
+    return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=os.path.basename(job.file_path), content_type=content_type)
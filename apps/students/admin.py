@@ -5,7 +5,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Count, Q
 from django import forms
-from .models import Student, StudentDocument
+from .models import AdmissionNumberSequence, Student, StudentDocument
+from .exports import export_response
 from apps.accounts.models import User
 
 
@@ -168,6 +169,7 @@ class StudentAdmin(admin.ModelAdmin):
     filter_horizontal = []
     inlines = [StudentDocumentInline]
     list_per_page = 25
+    list_select_related = ['user', 'class_assigned', 'parent__user']
     date_hierarchy = 'admission_date'
     
     fieldsets = (
@@ -429,7 +431,7 @@ class StudentAdmin(admin.ModelAdmin):
         )
     full_details_display.short_description = 'Student Overview'
     
-    actions = ['activate_students', 'deactivate_students', 'export_student_list']
+    actions = ['activate_students', 'deactivate_students', 'export_student_list', 'export_student_list_xlsx']
     
     def activate_students(self, request, queryset):
         """Activate selected students"""
@@ -452,35 +454,14 @@ class StudentAdmin(admin.ModelAdmin):
     deactivate_students.short_description = '✗ Deactivate selected students'
     
     def export_student_list(self, request, queryset):
-        """Export student list information"""
-        from django.http import HttpResponse
-        import csv
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="students_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Admission Number', 'Full Name', 'Email', 'Class', 
-            'Gender', 'Age', 'Blood Group', 'Contact', 'Status'
-        ])
-        
-        for student in queryset:
-            writer.writerow([
-                student.admission_number,
-                student.full_name,
-                student.user.email,
-                student.class_assigned.name if student.class_assigned else '',
-                student.get_gender_display(),
-                student.age,
-                student.blood_group,
-                student.emergency_contact_phone,
-                'Active' if student.is_active else 'Inactive'
-            ])
-        
-        self.message_user(request, f'📥 Exported {queryset.count()} student(s) to CSV.')
-        return response
+        """Stream selected students to CSV"""
+        return export_response(queryset, 'csv')
     export_student_list.short_description = '📥 Export selected students to CSV'
+    
+    def export_student_list_xlsx(self, request, queryset):
+        """Export selected students to Excel"""
+        return export_response(queryset, 'xlsx')
+    export_student_list_xlsx.short_description = '📥 Export selected students to Excel'
 
 
 @admin.register(StudentDocument)
@@ -535,3 +516,9 @@ class StudentDocumentAdmin(admin.ModelAdmin):
         )
     uploaded_display.short_description = 'Uploaded'
     uploaded_display.admin_order_field = 'uploaded_at'
+
+
+@admin.register(AdmissionNumberSequence)
+class AdmissionNumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ['year', 'last_value', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,45 @@
+"""
+REST API for Students
+"""
+import django_filters
+from rest_framework import serializers
+from config.api import OptimizedReadOnlyViewSet, SparseModelSerializer, student_scope
+from .models import Student
+
+
+class StudentSerializer(SparseModelSerializer):
+    first_name = serializers.CharField(source='user.first_name', read_only=True)
+    last_name = serializers.CharField(source='user.last_name', read_only=True)
+    email = serializers.CharField(source='user.email', read_only=True)
+    class_name = serializers.CharField(source='class_assigned.name', read_only=True, default=None)
+    academic_year_name = serializers.CharField(source='academic_year.name', read_only=True, default=None)
+
+    class Meta:
+        model = Student
+        fields = [
+            'id', 'admission_number', 'roll_number', 'first_name', 'middle_name', 'last_name', 'email',
+            'gender', 'date_of_birth', 'blood_group', 'nationality', 'class_assigned', 'class_name',
+            'academic_year', 'academic_year_name', 'parent', 'admission_date', 'is_active', 'updated_at',
+        ]
+
+
+class StudentFilter(django_filters.FilterSet):
+    class Meta:
+        model = Student
+        fields = {
+            'admission_number': ['exact'],
+            'class_assigned': ['exact'],
+            'academic_year': ['exact'],
+            'is_active': ['exact'],
+            'gender': ['exact'],
+        }
+
+
+class StudentViewSet(OptimizedReadOnlyViewSet):
+    serializer_class = StudentSerializer
+    filterset_class = StudentFilter
+
+    def get_queryset(self):
+        return Student.objects.filter(student_scope(self.request.user)).select_related(
+            'user', 'class_assigned', 'academic_year'
+        )
@@ -0,0 +1,357 @@
+"""
+Bulk Student Import
+Validates a whole roster with vectorized pandas checks, resolves classes,
+academic years and guardians from preloaded lookups, and creates users,
+parents and students with bulk_create in batched transactions
+"""
+import logging
+import os
+import time
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from apps.accounts.dashboard import invalidate_dashboard
+from apps.accounts.models import User
+from apps.classes.models import AcademicYear, ClassRoom
+from apps.parents.models import Parent
+from .models import Student, allocate_admission_numbers
+
+logger = logging.getLogger('django')
+
+REQUIRED_COLUMNS = [
+    'Registration Number', 'First Name', 'Middle Name', 'Last Name', 'Gender',
+    'Date of Birth', 'Class',
+]
+# Columns that must also have a value on every row. 'Middle Name' may be
+# blank, and rows without a 'Registration Number' are given the next
+# admission numbers.
+REQUIRED_VALUES = ['First Name', 'Last Name', 'Gender', 'Date of Birth', 'Class']
+
+GENDER_VALUES = {'M': 'M', 'MALE': 'M', 'F': 'F', 'FEMALE': 'F', 'O': 'O', 'OTHER': 'O'}
+RELATION_VALUES = {
+    'FATHER': 'FATHER', 'MOTHER': 'MOTHER', 'GUARDIAN': 'GUARDIAN',
+    'LEGAL GUARDIAN': 'GUARDIAN', 'OTHER': 'OTHER',
+}
+INACTIVE_STATUSES = {'INACTIVE', 'GRADUATED', 'TRANSFERRED'}
+ERROR_COLUMN = 'Errors'
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def read_roster(source, filename=None):
+    """Load an uploaded or on-disk roster (.xlsx, .xls or .csv) as strings"""
+    name = (filename or getattr(source, 'name', None) or str(source)).lower()
+    if name.endswith('.csv'):
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_excel(source, dtype=str, keep_default_na=False)
+    df.columns = [str(column).strip() for column in df.columns]
+    return df
+
+
+def _text(df, column):
+    if column not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[column].fillna('').astype(str).str.strip()
+
+
+def _dates(values):
+    # Excel dates arrive as 'YYYY-MM-DD 00:00:00'; CSVs usually as YYYY-MM-DD
+    return pd.to_datetime(values.str.slice(0, 10).where(values != ''), errors='coerce', format='mixed').dt.date
+
+
+def _add_error(errors, mask, message):
+    errors[mask] = errors[mask] + message + ' '
+
+
+class StudentImport:
+    """
+    One roster import. validate() builds the cleaned frame and per-row
+    errors; run() writes every valid row and returns a summary dict.
+    """
+
+    def __init__(self, df, batch_size=DEFAULT_BATCH_SIZE):
+        self.source = df
+        self.batch_size = batch_size
+        self.frame = None
+        self.errors = pd.Series('', index=df.index, dtype=object)
+        self.parents_created = 0
+        # Guardians created by earlier batches, so later rows reuse them
+        self.guardians = {}
+
+    def missing_columns(self):
+        return [column for column in REQUIRED_COLUMNS if column not in self.source.columns]
+
+    def validate(self):
+        df = self.source
+        today = timezone.now().date()
+        errors = self.errors
+        frame = pd.DataFrame({
+            'registration_number': _text(df, 'Registration Number'),
+            'first_name': _text(df, 'First Name'),
+            'middle_name': _text(df, 'Middle Name'),
+            'last_name': _text(df, 'Last Name'),
+            'nationality': _text(df, 'Nationality'),
+            'class_name': _text(df, 'Class'),
+            'stream': _text(df, 'Stream/Combination'),
+            'academic_year_name': _text(df, 'Academic Year'),
+            'status': _text(df, 'Student Status').str.upper(),
+            'guardian_name': _text(df, 'Guardian Full Name'),
+            'relationship': _text(df, 'Relationship').str.upper(),
+            'guardian_phone': _text(df, 'Guardian Phone'),
+            'guardian_email': _text(df, 'Guardian Email').str.lower(),
+            'medical_conditions': _text(df, 'Medical Conditions'),
+            'roll_number': _text(df, 'roll_number'),
+            'religion': _text(df, 'religion'),
+            'previous_school': _text(df, 'previous_school'),
+        }, index=df.index)
+
+        for column in REQUIRED_VALUES:
+            _add_error(errors, _text(df, column) == '', f'{column} is required.')
+
+        frame['gender'] = _text(df, 'Gender').str.upper().map(GENDER_VALUES)
+        _add_error(errors, frame['gender'].isna() & (_text(df, 'Gender') != ''), 'Gender must be M, F or O.')
+
+        frame['date_of_birth'] = _dates(_text(df, 'Date of Birth'))
+        _add_error(errors, frame['date_of_birth'].isna() & (_text(df, 'Date of Birth') != ''), 'Date of Birth is not a valid date.')
+        enrollment = _text(df, 'Enrollment Date')
+        frame['admission_date'] = _dates(enrollment)
+        _add_error(errors, frame['admission_date'].isna() & (enrollment != ''), 'Enrollment Date is not a valid date.')
+        frame['admission_date'] = frame['admission_date'].where(frame['admission_date'].notna(), today)
+
+        registration = frame['registration_number']
+        _add_error(errors, registration.str.len() > 20, 'Registration Number must be at most 20 characters.')
+        _add_error(errors, registration.duplicated(keep=False) & (registration != ''), 'Registration Number appears more than once in the file.')
+        taken = set(Student.objects.filter(admission_number__in=registration.unique()).values_list('admission_number', flat=True))
+        taken |= set(User.objects.filter(username__in=registration.unique()).values_list('username', flat=True))
+        _add_error(errors, registration.isin(taken), 'Registration Number already exists.')
+        for column, limit in (('first_name', 150), ('last_name', 150), ('middle_name', 50), ('nationality', 50)):
+            _add_error(errors, frame[column].str.len() > limit, f'{column.replace("_", " ").title()} must be at most {limit} characters.')
+
+        # Classes resolve by (name, stream), falling back to name alone
+        classes_by_stream, classes_by_name = {}, {}
+        for class_room in ClassRoom.objects.select_related('academic_year').order_by('-is_active', 'id'):
+            classes_by_stream.setdefault((class_room.name.lower(), (class_room.stream or '').lower()), class_room)
+            classes_by_name.setdefault(class_room.name.lower(), class_room)
+        frame['class_room'] = [
+            classes_by_stream.get((name.lower(), stream.lower())) or classes_by_name.get(name.lower())
+            for name, stream in zip(frame['class_name'], frame['stream'])
+        ]
+        _add_error(errors, frame['class_room'].isna() & (frame['class_name'] != ''), 'Class does not exist.')
+
+        years = {year.name.lower(): year for year in AcademicYear.objects.all()}
+        frame['academic_year'] = [
+            years.get(year_name.lower()) if year_name else getattr(class_room, 'academic_year', None)
+            for year_name, class_room in zip(frame['academic_year_name'], frame['class_room'])
+        ]
+        _add_error(errors, frame['academic_year'].isna() & (frame['academic_year_name'] != ''), 'Academic Year does not exist.')
+        _add_error(errors, _text(df, 'Guardian Phone').str.len() > 17, 'Guardian Phone must be at most 17 characters.')
+
+        frame['relation'] = frame['relationship'].map(RELATION_VALUES).fillna('GUARDIAN')
+        frame['is_active'] = ~frame['status'].isin(INACTIVE_STATUSES)
+        self.frame = frame
+        return self.errors
+
+    @property
+    def valid_rows(self):
+        return self.frame[self.errors == '']
+
+    def _resolve_parents(self, rows):
+        """
+        Map each row to a Parent, matching existing guardians by phone, then
+        email, and creating one parent per new guardian in the file. A
+        guardian with neither is only known by name, which is not enough to
+        tell two parents apart, so each such row gets a parent of its own.
+        Returns ({row index: parent}, {guardian key: new parent}).
+        """
+        rows = rows[rows['guardian_name'] != '']
+        if rows.empty:
+            return {}, {}
+        phones = set(rows['guardian_phone']) - {''}
+        emails = set(rows['guardian_email']) - {''}
+        by_phone, by_email = {}, {}
+        for parent in Parent.objects.select_related('user').filter(user__phone_number__in=phones) | \
+                Parent.objects.select_related('user').filter(user__email__in=emails):
+            if parent.user.phone_number:
+                by_phone.setdefault(parent.user.phone_number, parent)
+            if parent.user.email:
+                by_email.setdefault(parent.user.email.lower(), parent)
+
+        resolved, new_guardians = {}, {}
+        for index, row in zip(rows.index, rows.itertuples(index=False)):
+            key = row.guardian_phone or row.guardian_email or f'row:{index}'
+            parent = by_phone.get(row.guardian_phone) or by_email.get(row.guardian_email) or self.guardians.get(key)
+            if parent:
+                resolved[index] = parent
+                continue
+            new_guardians.setdefault(key, (row, []))[1].append(index)
+        if not new_guardians:
+            return resolved, {}
+
+        candidates = {
+            key: row.guardian_email or (f'guardian_{row.guardian_phone}' if row.guardian_phone else f'guardian_{row.registration_number}')
+            for key, (row, indexes) in new_guardians.items()
+        }
+        fallbacks = {key: f'guardian_{row.registration_number}' for key, (row, indexes) in new_guardians.items()}
+        taken = set(User.objects.filter(
+            username__in=[*candidates.values(), *fallbacks.values()]
+        ).values_list('username', flat=True))
+        users = []
+        for key, (row, indexes) in new_guardians.items():
+            username = candidates[key]
+            if username in taken:
+                username = self._unique_username(fallbacks[key], taken)
+            taken.add(username)
+            first_name, _, last_name = row.guardian_name.partition(' ')
+            users.append(User(
+                username=username[:150],
+                first_name=first_name[:150],
+                last_name=last_name[:150],
+                email=row.guardian_email,
+                phone_number=row.guardian_phone,
+                role='PARENT',
+                password=make_password(None),
+            ))
+        users = self._create_users(users)
+        parents = Parent.objects.bulk_create([
+            Parent(user=user, relation=row.relation)
+            for user, (row, indexes) in zip(users, new_guardians.values())
+        ], batch_size=self.batch_size)
+        for parent, (row, indexes) in zip(parents, new_guardians.values()):
+            for index in indexes:
+                resolved[index] = parent
+        return resolved, dict(zip(new_guardians, parents))
+
+    @staticmethod
+    def _unique_username(username, taken):
+        """username, or username_2, username_3... the first not in taken or the database"""
+        candidate, suffix = username, 1
+        while candidate in taken or User.objects.filter(username=candidate).exists():
+            taken.add(candidate)
+            suffix += 1
+            candidate = f'{username}_{suffix}'
+        return candidate
+
+    def _create_users(self, users):
+        created = User.objects.bulk_create(users, batch_size=self.batch_size)
+        if created and created[0].pk is None:
+            # Backends that cannot return ids from a bulk insert
+            ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+            for user in created:
+                user.pk = ids[user.username]
+        return created
+
+    def _write_batch(self, rows):
+        # One block of admission numbers per batch, reserved before the batch
+        # transaction so the sequence row is not held locked while it runs
+        unnumbered = rows['registration_number'] == ''
+        if unnumbered.any():
+            rows = rows.copy()
+            rows.loc[unnumbered, 'registration_number'] = allocate_admission_numbers(int(unnumbered.sum()))
+        with transaction.atomic():
+            parents, new_parents = self._resolve_parents(rows)
+            users = self._create_users([
+                User(
+                    username=row.registration_number,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    role='STUDENT',
+                    password=make_password(None),
+                )
+                for row in rows.itertuples(index=False)
+            ])
+            Student.objects.bulk_create([
+                Student(
+                    user=user,
+                    admission_number=row.registration_number,
+                    middle_name=row.middle_name,
+                    gender=row.gender,
+                    date_of_birth=row.date_of_birth,
+                    class_assigned=row.class_room,
+                    academic_year=row.academic_year,
+                    admission_date=row.admission_date,
+                    parent=parents.get(index),
+                    emergency_contact_name=row.guardian_name,
+                    emergency_contact_phone=row.guardian_phone,
+                    emergency_contact_relation=row.relationship.title(),
+                    nationality=row.nationality or 'Kenya',
+                    religion=row.religion,
+                    previous_school=row.previous_school,
+                    medical_conditions=row.medical_conditions,
+                    roll_number=row.roll_number,
+                    is_active=row.is_active,
+                )
+                for index, user, row in zip(rows.index, users, rows.itertuples(index=False))
+            ], batch_size=self.batch_size)
+        self.guardians.update(new_parents)
+        self.parents_created += len(new_parents)
+        return len(rows)
+
+    def run(self, dry_run=False):
+        """Validate and import. Returns {'total', 'imported', 'failed', 'parents_created'}."""
+        missing = self.missing_columns()
+        if missing:
+            raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+        self.validate()
+        valid = self.valid_rows
+        imported = 0
+        if not dry_run:
+            for offset in range(0, len(valid), self.batch_size):
+                batch = valid.iloc[offset:offset + self.batch_size]
+                try:
+                    imported += self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Student import batch starting at row {batch.index[0] + 2} failed: {e}", exc_info=True)
+                    self.errors[batch.index] = f'Not imported: {e}'
+        if imported:
+            invalidate_dashboard()
+        return {
+            'total': len(self.source),
+            'imported': imported,
+            'failed': int((self.errors != '').sum()),
+            'parents_created': self.parents_created,
+        }
+
+    def error_report(self):
+        """The rejected rows as uploaded, with the spreadsheet row number and an Errors column"""
+        failed = self.errors != ''
+        report = self.source[failed].copy()
+        report.insert(0, 'Row', report.index + 2)
+        report[ERROR_COLUMN] = self.errors[failed].str.strip()
+        return report
+
+
+def import_report_path(token):
+    """Where the error report of an upload is kept for download"""
+    return os.path.join(settings.MEDIA_ROOT, 'students', 'import_reports', f'{token}.xlsx')
+
+
+def purge_old_import_reports():
+    """Delete upload error reports written more than STUDENT_IMPORT_REPORT_RETENTION_HOURS ago"""
+    directory = os.path.dirname(import_report_path('-'))
+    cutoff = time.time() - settings.STUDENT_IMPORT_REPORT_RETENTION_HOURS * 3600
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def write_error_report(report, path):
+    """Save an error report DataFrame as .xlsx or .csv depending on the path"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.lower().endswith('.csv'):
+        report.to_csv(path, index=False)
+    else:
+        report.to_excel(path, index=False, sheet_name='Errors')
+    return path
@@ -0,0 +1,45 @@
+"""
+Management command to import a student roster (Excel or CSV)
+Usage: python manage.py import_students <file> [--batch-size N] [--errors <report.xlsx|.csv>] [--dry-run]
+"""
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.students.importer import DEFAULT_BATCH_SIZE, StudentImport, read_roster, write_error_report
+
+
+class Command(BaseCommand):
+    help = 'Imports students from an Excel/CSV roster in batched transactions and writes a report of rejected rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Roster in the student import template format (.xlsx, .xls or .csv)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows written per transaction')
+        parser.add_argument('--errors', help='Where to write rejected rows. Defaults to <file>_errors.xlsx')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; nothing is written to the database')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.exists(path):
+            raise CommandError(f'File {path} does not exist')
+
+        started = time.monotonic()
+        importer = StudentImport(read_roster(path), batch_size=options['batch_size'])
+        try:
+            summary = importer.run(dry_run=options['dry_run'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if summary['failed']:
+            errors_path = options['errors'] or f'{os.path.splitext(path)[0]}_errors.xlsx'
+            write_error_report(importer.error_report(), errors_path)
+            self.stdout.write(self.style.WARNING(f"{summary['failed']} row(s) rejected. See {errors_path}"))
+
+        elapsed = time.monotonic() - started
+        if options['dry_run']:
+            valid = summary['total'] - summary['failed']
+            self.stdout.write(self.style.SUCCESS(f"✅ Dry run: {valid} of {summary['total']} row(s) are valid ({elapsed:.1f}s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Imported {summary['imported']} of {summary['total']} student(s) and "
+                f"{summary['parents_created']} new guardian(s) in {elapsed:.1f}s"
+            ))
@@ -0,0 +1,14 @@
+"""
+Management command to remove old student import error reports
+Usage: python manage.py purge_import_reports
+"""
+from django.core.management.base import BaseCommand
+from apps.students.importer import purge_old_import_reports
+
+
+class Command(BaseCommand):
+    help = 'Deletes student import error reports older than STUDENT_IMPORT_REPORT_RETENTION_HOURS'
+
+    def handle(self, *args, **options):
+        removed = purge_old_import_reports()
+        self.stdout.write(self.style.SUCCESS(f'✅ Removed {removed} old error report(s)'))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_student_middle_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(unique=True)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Admission Number Sequence',
+                'verbose_name_plural': 'Admission Number Sequences',
+                'ordering': ['-year'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='admission_number',
+            field=models.CharField(blank=True, help_text='Unique student identification number (allocated on save when blank)', max_length=20, unique=True),
+        ),
+    ]
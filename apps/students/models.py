@@ -8,15 +8,19 @@ from django.utils import timezone
 from apps.accounts.models import User
 from apps.classes.models import ClassRoom, AcademicYear
 from apps.parents.models import Parent
-import random
-import string
+from config.sequences import allocate_numbers, highest_issued
+
+
+ADMISSION_PREFIX = 'ADM'
+
+
+def format_admission_number(year, value):
+    return f"{ADMISSION_PREFIX}{year}{value:06d}"
 
 
 def generate_admission_number():
-    """Generate unique admission number"""
-    year = str(timezone.now().year)
-    random_digits = ''.join(random.choices(string.digits, k=6))
-    return f"ADM{year}{random_digits}"
+    """Next admission number for the current year"""
+    return allocate_admission_numbers(1)[0]
 
 
 class Student(models.Model):
@@ -52,8 +56,8 @@ class Student(models.Model):
     admission_number = models.CharField(
         max_length=20,
         unique=True,
-        default=generate_admission_number,
-        help_text='Unique student identification number'
+        blank=True,
+        help_text='Unique student identification number (allocated on save when blank)'
     )
 
     middle_name = models.CharField(
@@ -150,6 +154,13 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.admission_number} - {self.user.get_full_name()}"
     
+    def save(self, *args, **kwargs):
+        # Allocated here rather than as a field default, so building an
+        # unsaved Student (e.g. an empty form) does not consume a number
+        if not self.admission_number:
+            self.admission_number = generate_admission_number()
+        super().save(*args, **kwargs)
+    
     @property
     def age(self):
         """Calculate student age"""
@@ -165,6 +176,39 @@ class Student(models.Model):
         return self.user.get_full_name()
 
 
+class AdmissionNumberSequence(models.Model):
+    """
+    Per-year admission number counter. Allocation locks the year's row,
+    so concurrent admissions never collide and never need to retry.
+    """
+    year = models.PositiveIntegerField(unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-year']
+        verbose_name = 'Admission Number Sequence'
+        verbose_name_plural = 'Admission Number Sequences'
+
+    def __str__(self):
+        return f"{self.year}: {format_admission_number(self.year, self.last_value)}"
+
+
+def _highest_issued(year):
+    """Largest counter value already used for a year, so a new counter starts past it"""
+    return highest_issued(Student.objects.all(), 'admission_number', f"{ADMISSION_PREFIX}{year}")
+
+
+def allocate_admission_numbers(count, year=None):
+    """
+    Reserve a contiguous block of count admission numbers for a year (the
+    current year by default) and return them. Bulk importers should take
+    one block per batch rather than one number per student. Call outside
+    long transactions: the year's row stays locked until the caller commits.
+    """
+    return allocate_numbers(AdmissionNumberSequence, count, format_admission_number, _highest_issued, year)
+
+
 class StudentDocument(models.Model):
     """
     Additional documents for students
@@ -12,6 +12,8 @@ urlpatterns = [
     path('create/', views.student_create_view, name='student_create'),
     path('<int:pk>/edit/', views.student_update_view, name='student_update'),
     path('<int:pk>/delete/', views.student_delete_view, name='student_delete'),
+    path('export/', views.student_export_view, name='student_export'),
     path('import/', views.student_import_view, name='student_import'),
+    path('import/errors/<str:token>/', views.student_import_errors_view, name='student_import_errors'),
     path('download-template/', views.student_template_download_view, name='student_template_download'),
 ]
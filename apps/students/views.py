@@ -10,11 +10,13 @@ from apps.accounts.decorators import admin_required, teacher_required
 from apps.classes.models import ClassRoom
 from .models import Student
 from .forms import StudentForm
+from config.exports import EXPORT_FORMATS
+from .exports import export_response
+from .importer import StudentImport, import_report_path, purge_old_import_reports, read_roster, write_error_report
 import os
-import pandas as pd
-from django.conf import settings
-from django.core.files.storage import FileSystemStorage
-from django.http import HttpResponseRedirect, HttpResponse
+import re
+import uuid
+from django.http import FileResponse, Http404, HttpResponseRedirect, HttpResponse
 from django.urls import reverse
 import openpyxl
 from openpyxl.worksheet.datavalidation import DataValidation
@@ -55,6 +57,39 @@ def student_list_view(request):
     return render(request, 'students/student_list.html', context)
 
 
+@login_required
+@admin_required
+def student_export_view(request):
+    """
+    Stream students as CSV or XLSX. Takes the list filters (q, class) plus
+    status=active|inactive|all, so the full student history can be exported.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        messages.error(request, f"Unknown export format '{export_format}'.")
+        return redirect('students:student_list')
+
+    students = Student.objects.all()
+    status = request.GET.get('status', 'active')
+    if status == 'active':
+        students = students.filter(is_active=True)
+    elif status == 'inactive':
+        students = students.filter(is_active=False)
+
+    query = request.GET.get('q', '')
+    if query:
+        students = students.filter(
+            Q(admission_number__icontains=query) |
+            Q(user__first_name__icontains=query) |
+            Q(user__last_name__icontains=query)
+        )
+    class_filter = request.GET.get('class', '')
+    if class_filter:
+        students = students.filter(class_assigned_id=class_filter)
+
+    return export_response(students, export_format, filename=f'students_{status}')
+
+
 @login_required
 def student_detail_view(request, pk):
     """View student details"""
@@ -151,74 +186,48 @@ def student_import_view(request):
     """Import students from Excel template (admin only)"""
     if request.method == 'POST' and request.FILES.get('file'):
         file = request.FILES['file']
-        fs = FileSystemStorage(location=os.path.join(settings.MEDIA_ROOT, 'students'))
-        filename = fs.save(file.name, file)
-        file_path = fs.path(filename)
         try:
-            df = pd.read_excel(file_path)
-            required_columns = [
-                'Registration Number', 'First Name', 'Middle Name', 'Last Name', 'Gender',
-                'Date of Birth', 'Class'
-            ]
-            for col in required_columns:
-                if col not in df.columns:
-                    messages.error(request, f"Missing required column: {col}")
-                    return redirect('students:student_import')
-            from apps.classes.models import ClassRoom
-            from apps.parents.models import Parent
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            imported, errors = 0, 0
-            for _, row in df.iterrows():
-                try:
-                    user, created = User.objects.get_or_create(
-                        username=row['Registration Number'],
-                        defaults={
-                            'first_name': row['First Name'],
-                            'last_name': row['Last Name'],
-                            'role': 'STUDENT',
-                        }
-                    )
-                    class_obj = ClassRoom.objects.filter(name=row['Class']).first()
-                    if not class_obj:
-                        errors += 1
-                        continue
-                    parent = None
-                    if pd.notna(row.get('Guardian Full Name')):
-                        parent, _ = Parent.objects.get_or_create(
-                            user__first_name=row['Guardian Full Name'].split()[0],
-                            user__last_name=' '.join(row['Guardian Full Name'].split()[1:]) if len(row['Guardian Full Name'].split()) > 1 else '',
-                        )
-                    Student.objects.get_or_create(
-                        user=user,
-                        defaults={
-                            'admission_number': row['Registration Number'],
-                            'middle_name': row.get('Middle Name', ''),
-                            'gender': row['Gender'],
-                            'date_of_birth': row['Date of Birth'],
-                            'class_assigned': class_obj,
-                            'parent': parent,
-                            'emergency_contact_name': row.get('emergency_contact', ''),
-                            'previous_school': row.get('previous_school', ''),
-                            'religion': row.get('religion', ''),
-                            'roll_number': row.get('roll_number', ''),
-                            'medical_conditions': row.get('medical_conditions', ''),
-                            'nationality': row.get('Nationality', ''),
-                            'academic_year': class_obj.academic_year if class_obj else None,
-                            'admission_date': row.get('Enrollment Date', None),
-                        }
-                    )
-                    imported += 1
-                except Exception as e:
-                    errors += 1
-            messages.success(request, f"Imported {imported} students. {errors} errors.")
-            return redirect('students:student_list')
+            importer = StudentImport(read_roster(file, file.name))
+            summary = importer.run()
         except Exception as e:
             messages.error(request, f"Import failed: {str(e)}")
             return redirect('students:student_import')
+        
+        if summary['failed']:
+            purge_old_import_reports()
+            token = uuid.uuid4().hex
+            report = importer.error_report()
+            write_error_report(report, import_report_path(token))
+            messages.warning(
+                request,
+                f"Imported {summary['imported']} of {summary['total']} students. {summary['failed']} row(s) were rejected."
+            )
+            return render(request, 'students/student_import.html', {
+                'summary': summary,
+                'error_rows': [
+                    {'row': row['Row'], 'registration_number': row.get('Registration Number', ''), 'errors': row['Errors']}
+                    for row in report.head(20).to_dict('records')
+                ],
+                'error_report_url': reverse('students:student_import_errors', args=[token]),
+            })
+        messages.success(request, f"Imported {summary['imported']} students.")
+        return redirect('students:student_list')
     return render(request, 'students/student_import.html')
 
 
+@login_required
+@admin_required
+def student_import_errors_view(request, token):
+    """Download the rejected rows of an import, with an Errors column"""
+    if not re.fullmatch(r'[0-9a-f]{32}', token) or not os.path.exists(import_report_path(token)):
+        raise Http404('Error report not found')
+    return FileResponse(
+        open(import_report_path(token), 'rb'),
+        as_attachment=True,
+        filename='student_import_errors.xlsx',
+    )
+
+
 def student_template_download_view(request):
     """Dynamically generate and return a student import Excel template with validations and two sample students."""
     from apps.classes.models import ClassRoom, AcademicYear
@@ -230,7 +239,7 @@ def student_template_download_view(request):
     ws.title = 'Student Import Template'
 
     columns = [
-        ("Registration Number", True, None),
+        ("Registration Number", False, None),
         ("First Name", True, None),
         ("Middle Name", False, None),
         ("Last Name", True, None),
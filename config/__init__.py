@@ -1 +1,9 @@
 # Config package
+
+# Celery is optional; without it background work runs in-process
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -4,15 +4,30 @@ Handles REST API endpoints for all modules
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from apps.accounts.api import sync_changes_view
+from apps.attendance.api import AttendanceViewSet, attendance_sync_view
+from apps.classes.api import ClassRoomViewSet
+from apps.exams.api import ExamViewSet
+from apps.fees.api import PaymentViewSet
+from apps.notifications.api import NotificationViewSet
+from apps.results.api import ResultViewSet, marks_sync_view
+from apps.students.api import StudentViewSet
 
 # Create router for API viewsets
 router = DefaultRouter()
-
-# Import viewsets will be added as apps are created
-# from apps.students.api import StudentViewSet
-# router.register(r'students', StudentViewSet)
+router.register(r'students', StudentViewSet, basename='student')
+router.register(r'classes', ClassRoomViewSet, basename='classroom')
+router.register(r'attendance', AttendanceViewSet, basename='attendance')
+router.register(r'results', ResultViewSet, basename='result')
+router.register(r'exams', ExamViewSet, basename='exam')
+router.register(r'payments', PaymentViewSet, basename='payment')
+router.register(r'notifications', NotificationViewSet, basename='notification')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # Offline sync for mobile clients
+    path('sync/attendance/', attendance_sync_view, name='sync_attendance'),
+    path('sync/marks/', marks_sync_view, name='sync_marks'),
+    path('sync/changes/', sync_changes_view, name='sync_changes'),
     path('auth/', include('rest_framework.urls')),
 ]
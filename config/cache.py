@@ -0,0 +1,50 @@
+"""
+Shared caching building blocks: the versioned namespaces behind the cached
+dashboard, fee analytics, exam analytics and report progress
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+
+class VersionedCache:
+    """
+    Cached values under a namespace, optionally split by scope (e.g. one
+    exam). invalidate() bumps the scope's version, which retires every value
+    cached under it without deleting keys one by one; the old entries simply
+    expire. Model signals call invalidate(), but bulk_create, bulk_update
+    and queryset updates skip signals, so code that writes in bulk calls it
+    itself.
+    """
+
+    def __init__(self, prefix, timeout_setting, default_timeout):
+        self.prefix = prefix
+        self.timeout_setting = timeout_setting
+        self.default_timeout = default_timeout
+
+    def get_timeout(self):
+        return getattr(settings, self.timeout_setting, self.default_timeout)
+
+    def _version_key(self, scope):
+        return f'{self.prefix}:{scope}:version'
+
+    def invalidate(self, scope=''):
+        cache.set(self._version_key(scope), time.time_ns(), None)
+
+    def key(self, *parts, scope=''):
+        version_key = self._version_key(scope)
+        version = cache.get(version_key)
+        if version is None:
+            version = time.time_ns()
+            cache.add(version_key, version, None)
+            version = cache.get(version_key, version)
+        return ':'.join([self.prefix, str(scope), str(version), *(str(part) for part in parts)])
+
+    def get_or_build(self, builder, *parts, scope=''):
+        """The value cached under parts, or builder() cached for the configured timeout"""
+        key = self.key(*parts, scope=scope)
+        value = cache.get(key)
+        if value is None:
+            value = builder()
+            cache.set(key, value, self.get_timeout())
+        return value
@@ -0,0 +1,12 @@
+"""
+Celery application for background tasks
+Start a worker with: celery -A config worker -l info
+"""
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
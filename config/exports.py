@@ -0,0 +1,67 @@
+"""
+Shared export building blocks: streaming CSV and constant-memory XLSX
+writers used by the per-app exports in apps/*/exports.py
+"""
+import csv
+import tempfile
+import xlsxwriter
+from django.http import FileResponse, StreamingHttpResponse
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+EXPORT_CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows):
+    """Yield CSV lines, header first"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(headers, rows, sheet_name, date_columns=(), column_width=16):
+    """
+    Write rows to a temporary XLSX file and return it, rewound. Values in
+    date_columns (indexes) are written as dates. constant_memory mode
+    flushes each row to disk as it is written.
+    """
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+    worksheet = workbook.add_worksheet(sheet_name)
+    bold = workbook.add_format({'bold': True})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    date_columns = set(date_columns)
+    worksheet.set_column(0, len(headers) - 1, column_width)
+    worksheet.write_row(0, 0, headers, bold)
+    for index, row in enumerate(rows, start=1):
+        for column, value in enumerate(row):
+            if column in date_columns and value:
+                worksheet.write_datetime(index, column, value, date_format)
+            else:
+                worksheet.write(index, column, value)
+    worksheet.freeze_panes(1, 0)
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def spreadsheet_response(headers, rows, export_format, filename, sheet_name, date_columns=(), column_width=16):
+    """A streaming CSV response or an XLSX file response; filename has no extension"""
+    if export_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(headers, rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+    return FileResponse(
+        write_xlsx(headers, rows, sheet_name, date_columns, column_width),
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type=XLSX_CONTENT_TYPE,
+    )
@@ -0,0 +1,38 @@
+"""
+Shared numbering building blocks: per-year counters locked with
+select_for_update, behind admission numbers and receipt numbers
+"""
+from django.db import transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+
+
+def highest_issued(queryset, field, prefix):
+    """Largest number following prefix in field across queryset (e.g. 12 for REC2026000012), or 0"""
+    latest = queryset.filter(**{f'{field}__regex': rf'^{prefix}[0-9]+$'}).order_by(
+        Length(field).desc(), f'-{field}'
+    ).values_list(field, flat=True).first()
+    return int(latest[len(prefix):]) if latest else 0
+
+
+def allocate_numbers(sequence_model, count, format_number, seed, year=None):
+    """
+    Reserve count consecutive values of a year's counter (a sequence_model
+    row with unique year and last_value) for a year (the current year by
+    default) and return them as format_number(year, value). seed(year)
+    gives the counter's starting value and only runs when the year's row
+    is first created. The row stays locked until the enclosing transaction
+    commits, so call this outside long-running transactions.
+    """
+    if count < 1:
+        return []
+    year = year or timezone.now().year
+    with transaction.atomic():
+        sequence = sequence_model.objects.select_for_update().filter(year=year).first()
+        if sequence is None:
+            sequence_model.objects.get_or_create(year=year, defaults={'last_value': seed(year)})
+            sequence = sequence_model.objects.select_for_update().get(year=year)
+        first = sequence.last_value + 1
+        sequence.last_value += count
+        sequence.save(update_fields=['last_value', 'updated_at'])
+    return [format_number(year, value) for value in range(first, first + count)]
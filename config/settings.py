@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework.authtoken',
+    'django_filters',
     'corsheaders',
     # Local apps
     'apps.accounts',
@@ -95,6 +96,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -154,6 +156,38 @@ USE_TZ = True
 CURRENCY_CODE = 'RWF'
 CURRENCY_SYMBOL = 'Frw'
 
+# Results ranking tie handling: 'competition' (1, 2, 2, 4) or 'dense' (1, 2, 2, 3)
+RESULT_RANKING_METHOD = config('RESULT_RANKING_METHOD', default='competition')
+
+# Worker processes for batch report card PDF exports (0 = one per CPU)
+REPORT_PDF_WORKERS = config('REPORT_PDF_WORKERS', default=0, cast=int)
+# Background report card exports: 'thread' (in the web process) or 'celery' (needs REDIS_URL and a worker)
+REPORT_EXPORT_BACKEND = config('REPORT_EXPORT_BACKEND', default='thread')
+REPORT_EXPORT_RETENTION_HOURS = config('REPORT_EXPORT_RETENTION_HOURS', default=24, cast=int)
+
+# Error reports of student roster uploads are deleted after this many hours
+STUDENT_IMPORT_REPORT_RETENTION_HOURS = config('STUDENT_IMPORT_REPORT_RETENTION_HOURS', default=24, cast=int)
+
+# Rendered report card cache: 'disk', the name of a CACHES alias, or 'none' to disable
+REPORT_CARD_CACHE = config('REPORT_CARD_CACHE', default='disk')
+REPORT_CARD_CACHE_DIR = config('REPORT_CARD_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'report_cards'))
+REPORT_CARD_CACHE_MAX_SIZE = config('REPORT_CARD_CACHE_MAX_SIZE', default=512 * 1024 * 1024, cast=int)  # bytes, disk only
+
+# Seconds a dashboard statistics snapshot is cached before being rebuilt
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=60, cast=int)
+
+# Seconds a fee analytics report is cached (payment and fee changes retire it sooner)
+FEE_ANALYTICS_CACHE_TTL = config('FEE_ANALYTICS_CACHE_TTL', default=300, cast=int)
+
+# Seconds exam statistics are cached (a result change retires them sooner)
+EXAM_ANALYTICS_CACHE_TTL = config('EXAM_ANALYTICS_CACHE_TTL', default=600, cast=int)
+
+# Seconds report processing progress is cached (new results, report cards and schedules retire it sooner)
+REPORT_PROGRESS_CACHE_TTL = config('REPORT_PROGRESS_CACHE_TTL', default=300, cast=int)
+
+# Seconds compiled grading schemes are cached (a scheme or boundary change retires them sooner)
+GRADING_SCHEME_CACHE_TTL = config('GRADING_SCHEME_CACHE_TTL', default=60, cast=int)
+
 # Date and time formats for Rwanda
 DATE_FORMAT = 'd/m/Y'
 DATETIME_FORMAT = 'd/m/Y H:i'
@@ -190,8 +224,15 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# Offline sync: rows changed in the last few seconds wait for the next pull, and a pull returns at most this many rows per type
+SYNC_SAFETY_LAG_SECONDS = config('SYNC_SAFETY_LAG_SECONDS', default=2, cast=int)
+SYNC_CHANGES_PAGE_SIZE = config('SYNC_CHANGES_PAGE_SIZE', default=500, cast=int)
+# Stored sync responses are deleted after this many hours; a retry later than that is applied again
+SYNC_REQUEST_RETENTION_HOURS = config('SYNC_REQUEST_RETENTION_HOURS', default=168, cast=int)
+
 # CORS Settings (for API access)
 CORS_ALLOWED_ORIGINS = config('CORS_ORIGINS', default='http://localhost:3000,http://127.0.0.1:3000', cast=lambda v: [s.strip() for s in v.split(',')])
 
@@ -204,6 +245,30 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@schoolsystem.com')
 
+# Cache shared by every web and Celery worker process. Notification counters,
+# grading schemes and the cached reports are kept in step through it, so a
+# deployment with more than one process must set CACHE_URL (e.g.
+# redis://localhost:6379/1); without it each process keeps its own copy.
+CACHE_URL = config('CACHE_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Celery (optional background tasks)
+CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
+
+# Notification fan-out: 'sync' creates notifications in the request, 'celery' hands them to a worker
+NOTIFICATION_DELIVERY = config('NOTIFICATION_DELIVERY', default='sync')
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=500, cast=int)
+# Seconds an unread counter lives before it is recounted from the database
+NOTIFICATION_COUNTER_TTL = config('NOTIFICATION_COUNTER_TTL', default=300, cast=int)
+
 # Login URLs
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard'